@@ -0,0 +1,254 @@
+"""Replay MQTT traffic into the integration and measure ingestion performance.
+
+Feeds a user:device:list then status:report messages through
+ThermoMavenAPI._on_mqtt_message into ThermoMavenDataUpdateCoordinator, with
+Home Assistant replaced by a minimal stub (see ha_stub.py). For each device
+count it reports:
+
+- msgs/s: status reports fed to _on_mqtt_message per second (wall clock)
+- p50/p99: latency from _on_mqtt_message to the state write of all the
+  device's sensor entities (the integration's real sensor classes), in ms
+- KiB/device: memory allocated by the integration per device (tracemalloc, separate run)
+
+No socket is involved: --mqtt-mode only changes how the callbacks reach the
+loop (directly, or with paho's thread hop). bench_mqtt.py measures the socket
+driving of both modes against a loopback broker.
+
+Usage:
+    python benchmarks/bench_ingest.py
+    python benchmarks/bench_ingest.py --devices 1 50 200 --messages 100 --rate 2000
+    python benchmarks/bench_ingest.py --capture traffic.jsonl --flush-window 0 --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components"))
+
+import ha_stub  # noqa: E402
+
+ha_stub.install()
+
+from thermomaven import ThermoMavenDataUpdateCoordinator  # noqa: E402
+from thermomaven.const import (  # noqa: E402
+    MQTT_MODE_ASYNCIO,
+    MQTT_MODE_THREAD,
+    STATUS_FLUSH_WINDOW,
+)
+from thermomaven.sensor import _create_device_sensors  # noqa: E402
+from thermomaven.thermomaven_api import ThermoMavenAPI  # noqa: E402
+from traffic import Traffic  # noqa: E402
+
+
+class _Message:
+    """paho MQTTMessage look-alike."""
+
+    __slots__ = ("topic", "payload")
+
+    def __init__(self, topic: str, payload: bytes) -> None:
+        self.topic = topic
+        self.payload = payload
+
+
+class _MqttClient:
+    """Records subscriptions instead of talking to a broker."""
+
+    def __init__(self) -> None:
+        self.subscriptions: set[str] = set()
+
+    def subscribe(self, topic, qos=0):
+        self.subscriptions.add(topic)
+        return 0, 0
+
+    def is_connected(self) -> bool:
+        return True
+
+
+class _LatencyProbe:
+    """Last listener of a device: its sensors have written their state when it runs."""
+
+    def __init__(self, pending: list[float], latencies: list[float]) -> None:
+        self._pending = pending
+        self._latencies = latencies
+
+    def handle_update(self) -> None:
+        now = time.perf_counter()
+        # Chaque rapport fusionné dans cette écriture est arrivé à l'état maintenant
+        self._latencies.extend(now - received for received in self._pending)
+        self._pending.clear()
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float | None:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    devices: int,
+    messages_per_device: int,
+    rate: float,
+    flush_window: float,
+    mqtt_mode: str,
+    capture: str | None,
+    measure_memory: bool = False,
+) -> dict:
+    """Replay one scenario and return its measurements."""
+    loop = asyncio.get_running_loop()
+    traffic = Traffic(devices, capture)
+    list_topic, list_payload = traffic.device_list()
+    reports = list(traffic.status_reports(devices * messages_per_device))
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        gc.collect()
+        if measure_memory:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        hass = ha_stub.HomeAssistant(loop, config_dir)
+        api = ThermoMavenAPI(
+            hass, "bench@example.com", "bench", "app_key", "app_id", mqtt_mode=mqtt_mode
+        )
+        api.mqtt_client = _MqttClient()
+        coordinator = ThermoMavenDataUpdateCoordinator(hass, api, "bench", flush_window=flush_window)
+        api.coordinator = coordinator
+
+        api._on_mqtt_message(None, None, _Message(list_topic, list_payload))
+        await asyncio.sleep(0)  # mode thread: laisser passer le saut vers la boucle
+        if len(coordinator.data["devices_by_id"]) != devices:
+            raise RuntimeError("Device list was not applied")
+
+        latencies: list[float] = []
+        pending: dict[str, list[float]] = {}
+        sensors = 0
+        for device_id, device in coordinator.data["devices_by_id"].items():
+            # Les vraies entités capteur, abonnées comme le fait async_added_to_hass
+            for entity in _create_device_sensors(coordinator, device, "bench"):
+                coordinator.async_add_device_listener(device_id, entity._handle_coordinator_update)
+                sensors += 1
+            pending[device_id] = []
+            probe = _LatencyProbe(pending[device_id], latencies)
+            coordinator.async_add_device_listener(device_id, probe.handle_update)
+
+        interval = 1 / rate if rate else 0.0
+        start = time.perf_counter()
+        for sequence, (topic, payload) in enumerate(reports):
+            if interval:
+                delay = start + sequence * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif sequence % devices == 0:
+                await asyncio.sleep(0)  # laisser tourner les flushs programmés
+            pending[traffic.devices[sequence % devices]["deviceId"]].append(time.perf_counter())
+            api._on_mqtt_message(None, None, _Message(topic, payload))
+        fed = time.perf_counter()
+
+        # Attendre les rapports encore en fenêtre de fusion
+        deadline = time.perf_counter() + flush_window + 1.0
+        while any(pending.values()) and time.perf_counter() < deadline:
+            await asyncio.sleep(min(0.01, flush_window or 0.01))
+
+        memory = None
+        if measure_memory:
+            gc.collect()
+            memory = (tracemalloc.get_traced_memory()[0] - baseline) / devices
+            tracemalloc.stop()
+
+        coordinator.async_cancel_pending_reports()
+        await coordinator.sessions.async_stop()
+        await hass.async_block_till_done()
+
+    latencies.sort()
+    elapsed = fed - start
+    return {
+        "devices": devices,
+        "messages": len(reports),
+        "sensors": sensors,
+        "state_writes": coordinator._reports_applied,
+        "msgs_per_s": len(reports) / elapsed if elapsed > 0 else None,
+        "p50_ms": _ms(_percentile(latencies, 0.5)),
+        "p99_ms": _ms(_percentile(latencies, 0.99)),
+        "kib_per_device": round(memory / 1024, 1) if memory is not None else None,
+        "stages": {
+            stage: {"p50_ms": summary["p50"], "p99_ms": summary["p99"], "count": summary["count"]}
+            for stage, summary in api.latency.as_dict().items()
+        },
+    }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    results = []
+    for devices in args.devices:
+        result = await run_scenario(
+            devices, args.messages, args.rate, args.flush_window, args.mqtt_mode, args.capture
+        )
+        memory = await run_scenario(
+            devices, args.messages, args.rate, args.flush_window, args.mqtt_mode, args.capture,
+            measure_memory=True,
+        )
+        result["kib_per_device"] = memory["kib_per_device"]
+        results.append(result)
+        if not args.json:
+            _print_row(result, args.stages)
+    return results
+
+
+def _print_row(result: dict, stages: bool) -> None:
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "-"
+
+    print(
+        f"{result['devices']:>7} {result['messages']:>8} {result['state_writes']:>7} "
+        f"{fmt(result['msgs_per_s'], '>10.0f')} {fmt(result['p50_ms'], '>9.3f')} "
+        f"{fmt(result['p99_ms'], '>9.3f')} {fmt(result['kib_per_device'], '>10.1f')}"
+    )
+    if stages:
+        for stage, summary in result["stages"].items():
+            print(
+                f"          {stage:<12} n={summary['count']:<8} "
+                f"p50<={fmt(summary['p50_ms'], '')} ms  p99<={fmt(summary['p99_ms'], '')} ms"
+            )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 50, 100, 200],
+                        help="simulated device counts (default: 1 10 50 100 200)")
+    parser.add_argument("--messages", type=int, default=50,
+                        help="status reports per device (default: 50)")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="total status reports per second, 0 = as fast as possible")
+    parser.add_argument("--flush-window", type=float, default=STATUS_FLUSH_WINDOW,
+                        help=f"coordinator coalescing window in s (default: {STATUS_FLUSH_WINDOW})")
+    parser.add_argument("--mqtt-mode", choices=[MQTT_MODE_ASYNCIO, MQTT_MODE_THREAD],
+                        default=MQTT_MODE_ASYNCIO,
+                        help="how MQTT callbacks reach the loop (no socket: see bench_mqtt.py)")
+    parser.add_argument("--capture", help="JSON Lines capture to replay instead of synthetic reports")
+    parser.add_argument("--stages", action="store_true", help="print the per-stage histograms")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if not arguments.json:
+        print(f"{'devices':>7} {'messages':>8} {'writes':>7} {'msgs/s':>10} "
+              f"{'p50 ms':>9} {'p99 ms':>9} {'KiB/dev':>10}")
+    output = asyncio.run(main(arguments))
+    if arguments.json:
+        print(json.dumps(output, indent=2))
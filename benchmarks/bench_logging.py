@@ -0,0 +1,166 @@
+"""Measure the cost of debug logging on the MQTT message path.
+
+Times ThermoMavenAPI._on_mqtt_message on 4-probe status reports, with debug
+logging off and on, for the current lazy path and for the eager path it
+replaced (the whole payload pretty-printed with json.dumps for every message,
+and the temperature summary built even with debug off). The coordinator is
+replaced by a no-op sink, so only the API's handling is measured: decoding,
+logging, the message trace and the dispatch.
+
+"debug on" logs to os.devnull through a StreamHandler with Home Assistant's
+log format, so records really are formatted.
+
+Usage:
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --messages 50000 --json
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components"))
+
+import ha_stub  # noqa: E402
+
+ha_stub.install()
+
+from bench_ingest import _Message  # noqa: E402
+from thermomaven import thermomaven_api  # noqa: E402
+from thermomaven.const import LATENCY_STAGE_DECODE  # noqa: E402
+from thermomaven.thermomaven_api import ThermoMavenAPI  # noqa: E402
+from traffic import Traffic  # noqa: E402
+
+PATH_LAZY = "lazy"
+PATH_EAGER = "eager"
+HA_LOG_FORMAT = "%(asctime)s %(levelname)s (%(threadName)s) [%(name)s] %(message)s"
+
+_LOGGER = thermomaven_api._LOGGER
+
+
+class _NullCoordinator:
+    """Swallows the status reports: only the API side is timed."""
+
+    def async_handle_status_report(self, data: dict, dispatch_start: float | None = None) -> None:
+        pass
+
+
+class _EagerAPI(ThermoMavenAPI):
+    """The message path before debug formatting was made lazy."""
+
+    def _on_mqtt_message(self, client, userdata, msg):
+        try:
+            decode_start = time.perf_counter()
+            data = json.loads(msg.payload.decode("utf-8"))
+            self.latency.record(LATENCY_STAGE_DECODE, time.perf_counter() - decode_start)
+            cmd_type = data.get("cmdType", "")
+
+            _LOGGER.debug("📨 MQTT: %s on %s", cmd_type, msg.topic)
+            # Sérialisé à chaque message, que le debug soit actif ou non
+            _LOGGER.debug("Full message: %s", json.dumps(data, indent=2))
+
+            self._latest_mqtt_messages[cmd_type] = data
+
+            try:
+                handler = self._mqtt_handlers[cmd_type]
+            except KeyError:
+                handler = self._resolve_mqtt_handler(cmd_type)
+            if handler is not None:
+                handler(data)
+        except Exception as err:
+            _LOGGER.error("Error processing MQTT message: %s", err)
+
+    def _handle_mqtt_status_report(self, data: dict) -> None:
+        dispatch_start = time.perf_counter()
+        _LOGGER.debug("=== TEMPERATURE UPDATE VIA MQTT ===")
+        device_id = data.get("deviceId")
+        cmd_data = data.get("cmdData", {})
+
+        temp = "N/A"
+        probes = cmd_data.get("probes", [])
+        if probes:
+            cur_temp = probes[0].get("curTemperature")
+            if cur_temp:
+                temp = f"{cur_temp / 10.0}°F"
+        _LOGGER.debug("🌡️ Temperature update: Device %s = %s (Battery: %s%%)",
+                      device_id, temp, cmd_data.get("batteryValue", "?"))
+
+        self._run_in_loop(self.coordinator.async_handle_status_report, data, dispatch_start)
+
+
+def run_case(path: str, debug: bool, messages: list[_Message], repeat: int) -> dict:
+    """Time `messages` through one path; return the best of `repeat` runs."""
+    api_class = _EagerAPI if path == PATH_EAGER else ThermoMavenAPI
+    api = api_class(None, "bench@example.com", "bench", "app_key", "app_id")
+    api.coordinator = _NullCoordinator()
+
+    handler = None
+    level, propagate = _LOGGER.level, _LOGGER.propagate
+    if debug:
+        handler = logging.StreamHandler(open(os.devnull, "w", encoding="utf-8"))
+        handler.setFormatter(logging.Formatter(HA_LOG_FORMAT))
+        _LOGGER.addHandler(handler)
+        _LOGGER.propagate = False
+    _LOGGER.setLevel(logging.DEBUG if debug else logging.WARNING)
+    try:
+        best = None
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            for msg in messages:
+                api._on_mqtt_message(None, None, msg)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        _LOGGER.setLevel(level)
+        _LOGGER.propagate = propagate
+        if handler is not None:
+            _LOGGER.removeHandler(handler)
+            handler.stream.close()
+
+    return {
+        "path": path,
+        "debug": debug,
+        "messages": len(messages),
+        "us_per_msg": round(best / len(messages) * 1e6, 2),
+    }
+
+
+def main(args: argparse.Namespace) -> list[dict]:
+    traffic = Traffic(args.devices)
+    messages = [_Message(topic, payload) for topic, payload in traffic.status_reports(args.messages)]
+    results = []
+    for debug in (False, True):
+        for path in (PATH_EAGER, PATH_LAZY):
+            result = run_case(path, debug, messages, args.repeat)
+            results.append(result)
+            if not args.json:
+                print(f"{'on' if debug else 'off':>5} {path:>6} {result['messages']:>8} "
+                      f"{result['us_per_msg']:>10.2f}")
+    return results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10000,
+                        help="status reports per run (default: 10000)")
+    parser.add_argument("--devices", type=int, default=10,
+                        help="devices the reports are spread over (default: 10)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs per case, the fastest is kept (default: 5)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    if not arguments.json:
+        print(f"{'debug':>5} {'path':>6} {'messages':>8} {'us/msg':>10}")
+    output = main(arguments)
+    if arguments.json:
+        print(json.dumps(output, indent=2))
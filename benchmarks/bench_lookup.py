@@ -0,0 +1,117 @@
+"""Measure the entity state-write cost as the number of devices grows.
+
+Entities read their device row and decoded status through the coordinator's
+deviceId index (get_device / get_status), so the cost of writing the state of
+one device's sensors should not depend on how many devices the account has.
+For each device count this writes the state of every real sensor entity of
+the last device and reports the cost per sensor. For comparison it also times
+the linear deviceId scan of coordinator.data["devices"] the entities used
+before the index.
+
+Usage:
+    python benchmarks/bench_lookup.py
+    python benchmarks/bench_lookup.py --devices 1 100 1000 --repeat 200 --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components"))
+
+import ha_stub  # noqa: E402
+
+ha_stub.install()
+
+from thermomaven import ThermoMavenDataUpdateCoordinator  # noqa: E402
+from thermomaven.sensor import _create_device_sensors  # noqa: E402
+from thermomaven.thermomaven_api import ThermoMavenAPI  # noqa: E402
+from traffic import Traffic  # noqa: E402
+
+
+def _linear_scan(coordinator, device_id: str) -> dict | None:
+    """The lookup every entity property did before the deviceId index."""
+    for device in coordinator.data["devices"]:
+        if str(device.get("deviceId")) == device_id:
+            return device
+    return None
+
+
+async def run_scenario(devices: int, repeat: int) -> dict:
+    """Time the state writes of the last device's sensors among `devices` devices."""
+    loop = asyncio.get_running_loop()
+    traffic = Traffic(devices)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = ha_stub.HomeAssistant(loop, config_dir)
+        api = ThermoMavenAPI(hass, "bench@example.com", "bench", "app_key", "app_id")
+        coordinator = ThermoMavenDataUpdateCoordinator(hass, api, "bench", flush_window=0)
+        api.coordinator = coordinator
+        coordinator.async_apply_device_list(traffic.devices)
+        for _topic, payload in traffic.status_reports(devices):
+            coordinator.async_handle_status_report(json.loads(payload))
+
+        # Dernier appareil de la table: le pire cas d'un parcours linéaire
+        device_id = traffic.devices[-1]["deviceId"]
+        device = coordinator.get_device(device_id)
+        entities = _create_device_sensors(coordinator, device, "bench")
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for entity in entities:
+                entity.async_write_ha_state()
+        write = (time.perf_counter() - start) / (repeat * len(entities))
+
+        start = time.perf_counter()
+        for _ in range(repeat * len(entities)):
+            _linear_scan(coordinator, device_id)
+        scan = (time.perf_counter() - start) / (repeat * len(entities))
+
+        coordinator.async_cancel_pending_reports()
+        await coordinator.sessions.async_stop()
+        await hass.async_block_till_done()
+
+    return {
+        "devices": devices,
+        "sensors": len(entities),
+        "write_us_per_sensor": round(write * 1e6, 2),
+        "linear_scan_us": round(scan * 1e6, 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    results = []
+    for devices in args.devices:
+        result = await run_scenario(devices, args.repeat)
+        results.append(result)
+        if not args.json:
+            print(
+                f"{result['devices']:>7} {result['sensors']:>7} "
+                f"{result['write_us_per_sensor']:>12.2f} {result['linear_scan_us']:>12.2f}"
+            )
+    return results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 50, 100, 200],
+                        help="simulated device counts (default: 1 10 50 100 200)")
+    parser.add_argument("--repeat", type=int, default=100,
+                        help="state writes of each sensor per device count (default: 100)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if not arguments.json:
+        print(f"{'devices':>7} {'sensors':>7} {'write us/sen':>12} {'scan us':>12}")
+    output = asyncio.run(main(arguments))
+    if arguments.json:
+        print(json.dumps(output, indent=2))
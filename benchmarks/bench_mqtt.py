@@ -0,0 +1,219 @@
+"""Drive the MQTT client over a real socket, in both MQTT modes.
+
+Unlike bench_ingest.py, which calls _on_mqtt_message directly, this connects
+the integration's paho client to a loopback TLS broker (mqtt_broker.py) with
+ThermoMavenAPI._async_start_mqtt, so the socket driving is measured too:
+
+- asyncio: the socket is watched by the event loop (add_reader/add_writer,
+  loop_read draining the SSL buffer, loop_misc on a timer)
+- thread: paho's network thread, each callback hopping to the loop
+
+The broker sends a user:device:list, then status:report messages. For each
+mode and device count it reports:
+
+- msgs/s: status reports per second, from the first one sent by the broker
+  to the state write of the last one
+- p50/p99: latency from the broker writing a report to the socket to the
+  state write of all the device's sensor entities, in ms
+- connect ms: _async_start_mqtt until the CONNACK is handled
+- reconnect s: the broker drops the connection, until the client is connected
+  again (asyncio: _async_mqtt_reconnect backoff, thread: paho's own)
+
+Usage:
+    python benchmarks/bench_mqtt.py
+    python benchmarks/bench_mqtt.py --devices 1 50 --messages 100 --rate 2000 --modes asyncio
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components"))
+
+import ha_stub  # noqa: E402
+
+ha_stub.install()
+
+from bench_ingest import _ms, _percentile  # noqa: E402
+from mqtt_broker import LoopbackBroker  # noqa: E402
+from thermomaven import ThermoMavenDataUpdateCoordinator  # noqa: E402
+from thermomaven import thermomaven_api  # noqa: E402
+from thermomaven.const import MQTT_MODE_ASYNCIO, MQTT_MODE_THREAD  # noqa: E402
+from thermomaven.sensor import _create_device_sensors  # noqa: E402
+from thermomaven.thermomaven_api import ThermoMavenAPI  # noqa: E402
+from traffic import Traffic  # noqa: E402
+
+
+class _LatencyProbe:
+    """Last listener of a device: its sensors have written their state when it runs.
+
+    Send times are appended by the broker's thread, hence the deque. Reports
+    still in the socket or the loop's queue are not matched to this write:
+    `received` counts the ones the coordinator got.
+    """
+
+    def __init__(self, sent: collections.deque, latencies: list[float]) -> None:
+        self._sent = sent
+        self._latencies = latencies
+        self.received = 0
+        self.last_write = 0.0
+
+    def handle_update(self) -> None:
+        now = self.last_write = time.perf_counter()
+        # Chaque rapport fusionné dans cette écriture est arrivé à l'état maintenant
+        while self.received:
+            self.received -= 1
+            self._latencies.append(now - self._sent.popleft())
+
+
+async def _wait_for(predicate, timeout: float, what: str) -> None:
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"Timed out waiting for {what}")
+        await asyncio.sleep(0.001)
+
+
+async def run_scenario(
+    broker: LoopbackBroker,
+    mqtt_mode: str,
+    devices: int,
+    messages_per_device: int,
+    rate: float,
+    flush_window: float,
+) -> dict:
+    """Connect a client in `mqtt_mode`, replay one scenario and return its measurements."""
+    loop = asyncio.get_running_loop()
+    traffic = Traffic(devices)
+    list_topic, list_payload = traffic.device_list()
+    reports = list(traffic.status_reports(devices * messages_per_device))
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = ha_stub.HomeAssistant(loop, config_dir)
+        api = ThermoMavenAPI(
+            hass, "bench@example.com", "bench", "app_key", "app_id", mqtt_mode=mqtt_mode
+        )
+        api.mqtt_config = {"clientId": "bench", "subTopics": [list_topic]}
+        # La liste d'appareils vient du broker: pas de synchro REST à la connexion
+        api._mqtt_device_list_received = True
+        coordinator = ThermoMavenDataUpdateCoordinator(hass, api, "bench", flush_window=flush_window)
+        api.coordinator = coordinator
+
+        connects = broker.connects
+        start = time.perf_counter()
+        await api._async_start_mqtt(broker.client_material)
+        await _wait_for(api.mqtt_client.is_connected, 5, "the CONNACK")
+        connect = time.perf_counter() - start
+
+        await broker.async_publish(list_topic, list_payload)
+        await _wait_for(
+            lambda: coordinator.data is not None and len(coordinator.data["devices_by_id"]) == devices,
+            5, "the device list",
+        )
+
+        latencies: list[float] = []
+        sent: dict[str, collections.deque] = {}
+        probes: dict[str, _LatencyProbe] = {}
+        sensors = 0
+        for device_id, device in coordinator.data["devices_by_id"].items():
+            for entity in _create_device_sensors(coordinator, device, "bench"):
+                coordinator.async_add_device_listener(device_id, entity._handle_coordinator_update)
+                sensors += 1
+            sent[device_id] = collections.deque()
+            probes[device_id] = _LatencyProbe(sent[device_id], latencies)
+            coordinator.async_add_device_listener(device_id, probes[device_id].handle_update)
+
+        handle_status_report = coordinator.async_handle_status_report
+
+        def counting_handle_status_report(data: dict, *args) -> None:
+            probes[str(data["deviceId"])].received += 1
+            handle_status_report(data, *args)
+
+        coordinator.async_handle_status_report = counting_handle_status_report
+
+        def on_send(index: int) -> None:
+            sent[traffic.devices[index % devices]["deviceId"]].append(time.perf_counter())
+
+        start = time.perf_counter()
+        await broker.async_publish_many(reports, rate, on_send)
+        await _wait_for(lambda: len(latencies) == len(reports), flush_window + 10, "the state writes")
+        elapsed = max(probe.last_write for probe in probes.values()) - start
+
+        await broker.async_drop_clients()
+        start = time.perf_counter()
+        await _wait_for(
+            lambda: broker.connects == connects + 2 and api.mqtt_client.is_connected(), 10, "the reconnection"
+        )
+        reconnect = time.perf_counter() - start
+
+        await api.async_disconnect_mqtt()
+        coordinator.async_cancel_pending_reports()
+        await coordinator.sessions.async_stop()
+        await hass.async_block_till_done()
+
+    latencies.sort()
+    return {
+        "mode": mqtt_mode,
+        "devices": devices,
+        "messages": len(reports),
+        "sensors": sensors,
+        "msgs_per_s": len(reports) / elapsed if elapsed > 0 else None,
+        "p50_ms": _ms(_percentile(latencies, 0.5)),
+        "p99_ms": _ms(_percentile(latencies, 0.99)),
+        "connect_ms": _ms(connect),
+        "reconnect_s": round(reconnect, 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    results = []
+    with LoopbackBroker() as broker:
+        broker.patch_api(thermomaven_api)
+        for mode in args.modes:
+            for devices in args.devices:
+                result = await run_scenario(
+                    broker, mode, devices, args.messages, args.rate, args.flush_window
+                )
+                results.append(result)
+                if not args.json:
+                    print(
+                        f"{result['mode']:>8} {result['devices']:>7} {result['messages']:>8} "
+                        f"{result['msgs_per_s']:>10.0f} {result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+                        f"{result['connect_ms']:>10.1f} {result['reconnect_s']:>12.2f}"
+                    )
+    return results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 50],
+                        help="simulated device counts (default: 1 10 50)")
+    parser.add_argument("--messages", type=int, default=50,
+                        help="status reports per device (default: 50)")
+    parser.add_argument("--rate", type=float, default=1000,
+                        help="status reports per second sent by the broker, 0 = as fast as possible "
+                             "(default: 1000)")
+    parser.add_argument("--flush-window", type=float, default=0,
+                        help="coordinator coalescing window in s (default: 0, one write per report)")
+    parser.add_argument("--modes", nargs="+", choices=[MQTT_MODE_ASYNCIO, MQTT_MODE_THREAD],
+                        default=[MQTT_MODE_ASYNCIO, MQTT_MODE_THREAD], help="MQTT modes to run")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if not arguments.json:
+        print(f"{'mode':>8} {'devices':>7} {'messages':>8} {'msgs/s':>10} {'p50 ms':>9} "
+              f"{'p99 ms':>9} {'connect ms':>10} {'reconnect s':>12}")
+    output = asyncio.run(main(arguments))
+    if arguments.json:
+        print(json.dumps(output, indent=2))
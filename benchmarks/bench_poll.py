@@ -0,0 +1,212 @@
+"""Compare REST poll latency with a pooled session and a session per request.
+
+Runs the coordinator's poll (device lists + user info, requested concurrently)
+through the real ThermoMavenAPI against a local aiohttp stub of the cloud API,
+served over TLS like the real one. Two modes:
+
+- pooled: one ClientSession for the entry, connections kept alive (current code)
+- per-request: a new ClientSession, hence a new TCP + TLS connection, for every
+  request (the behaviour before sessions were pooled)
+
+For each mode it reports p50/p99 poll latency, polls/s and how many TCP
+connections the stub accepted. Localhost has no network round trip, so the
+real-world gap (one extra RTT for TCP, one or two for TLS) is larger.
+
+Usage:
+    python benchmarks/bench_poll.py
+    python benchmarks/bench_poll.py --polls 500 --devices 4 --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import ssl
+import sys
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "custom_components"))
+
+import ha_stub  # noqa: E402
+
+ha_stub.install()
+
+from selfsigned import self_signed_certificate  # noqa: E402
+from thermomaven.thermomaven_api import ThermoMavenAPI  # noqa: E402
+from traffic import Traffic  # noqa: E402
+
+MODE_POOLED = "pooled"
+MODE_PER_REQUEST = "per-request"
+
+_request_sessions: contextvars.ContextVar[list] = contextvars.ContextVar("request_sessions")
+
+
+def _ssl_contexts(directory: str) -> tuple[ssl.SSLContext, ssl.SSLContext]:
+    """Return (server, client) TLS contexts for a throwaway 127.0.0.1 certificate."""
+    cert_pem, key_pem = self_signed_certificate()
+    path = os.path.join(directory, "server.pem")
+    with open(path, "w") as file:
+        file.write(cert_pem + key_pem)
+
+    server = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server.load_cert_chain(path)
+    client = ssl.create_default_context(cadata=cert_pem)
+    return server, client
+
+
+class _CloudStub:
+    """Answers the poll endpoints and counts accepted connections."""
+
+    def __init__(self, devices: int) -> None:
+        self.connections = 0
+        self._devices = Traffic(devices).devices
+        self._transports: set = set()  # références fortes: un id() serait réutilisé
+
+    def _count(self, request: web.Request) -> None:
+        transport = request.transport
+        if transport not in self._transports:
+            self._transports.add(transport)
+            self.connections += 1
+
+    async def device_list(self, request: web.Request) -> web.Response:
+        self._count(request)
+        shared = request.path.endswith("/shared/device/list")
+        return web.json_response({"code": "0", "data": [] if shared else self._devices})
+
+    async def user_info(self, request: web.Request) -> web.Response:
+        self._count(request)
+        return web.json_response({"code": "0", "data": {"userId": 1, "nickName": "bench"}})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/app/device/share/my/device/list", self.device_list)
+        app.router.add_post("/app/device/share/shared/device/list", self.device_list)
+        app.router.add_post("/app/user/get", self.user_info)
+        return app
+
+
+class _PerRequestAPI(ThermoMavenAPI):
+    """ThermoMavenAPI opening a new session for every request, as before pooling."""
+
+    def __init__(self, *args, client_ssl: ssl.SSLContext, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._client_ssl = client_ssl
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=self._client_ssl))
+        _request_sessions.get().append(session)
+        return session
+
+    async def _async_request(self, *args, **kwargs) -> dict:
+        # Chaque requête tourne dans sa propre tâche (gather): sessions propres à la tâche
+        sessions: list[aiohttp.ClientSession] = []
+        _request_sessions.set(sessions)
+        try:
+            return await super()._async_request(*args, **kwargs)
+        finally:
+            for session in sessions:
+                await session.close()
+
+
+async def _poll(api: ThermoMavenAPI) -> None:
+    """The coordinator's REST poll."""
+    await asyncio.gather(api.async_get_devices(), api.async_get_user_info())
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float | None:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_mode(mode: str, polls: int, devices: int, url: str, stub: _CloudStub,
+                   client_ssl: ssl.SSLContext) -> dict:
+    """Run `polls` sequential polls in one mode and return the measurements."""
+    loop = asyncio.get_running_loop()
+    hass = ha_stub.HomeAssistant(loop, tempfile.gettempdir())
+    session = None
+    if mode == MODE_POOLED:
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=client_ssl))
+        api = ThermoMavenAPI(hass, "bench@example.com", "bench", "app_key", "app_id", session=session)
+    else:
+        api = _PerRequestAPI(hass, "bench@example.com", "bench", "app_key", "app_id", client_ssl=client_ssl)
+    api.api_base_url = url
+    api.token = "token"
+
+    connections_before = stub.connections
+    await _poll(api)  # premier poll hors mesure
+    durations = []
+    start = time.perf_counter()
+    for _ in range(polls):
+        poll_start = time.perf_counter()
+        await _poll(api)
+        durations.append(time.perf_counter() - poll_start)
+    elapsed = time.perf_counter() - start
+    if session is not None:
+        await session.close()
+
+    durations.sort()
+    return {
+        "mode": mode,
+        "polls": polls,
+        "devices": devices,
+        "p50_ms": round(_percentile(durations, 0.5) * 1000, 3),
+        "p99_ms": round(_percentile(durations, 0.99) * 1000, 3),
+        "polls_per_s": round(polls / elapsed, 1),
+        "connections": stub.connections - connections_before,
+    }
+
+
+async def main(args: argparse.Namespace) -> list[dict]:
+    with tempfile.TemporaryDirectory() as directory:
+        server_ssl, client_ssl = _ssl_contexts(directory)
+        stub = _CloudStub(args.devices)
+        runner = web.AppRunner(stub.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=server_ssl)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            results = []
+            for mode in args.modes:
+                result = await run_mode(
+                    mode, args.polls, args.devices, f"https://127.0.0.1:{port}", stub, client_ssl
+                )
+                results.append(result)
+                if not args.json:
+                    print(
+                        f"{result['mode']:>12} {result['polls']:>6} {result['p50_ms']:>9.3f} "
+                        f"{result['p99_ms']:>9.3f} {result['polls_per_s']:>9.1f} {result['connections']:>12}"
+                    )
+            return results
+        finally:
+            await runner.cleanup()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=200, help="polls per mode (default: 200)")
+    parser.add_argument("--devices", type=int, default=2,
+                        help="devices in the stub's device list (default: 2)")
+    parser.add_argument("--modes", nargs="+", choices=[MODE_POOLED, MODE_PER_REQUEST],
+                        default=[MODE_POOLED, MODE_PER_REQUEST], help="modes to run")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if not arguments.json:
+        print(f"{'mode':>12} {'polls':>6} {'p50 ms':>9} {'p99 ms':>9} {'polls/s':>9} {'connections':>12}")
+    output = asyncio.run(main(arguments))
+    if arguments.json:
+        print(json.dumps(output, indent=2))
@@ -0,0 +1,341 @@
+"""Minimal stand-in for the parts of Home Assistant the integration imports.
+
+Only what the MQTT ingestion path touches is implemented: an event loop
+holder, callbacks, timers, a no-op Store, a bare DataUpdateCoordinator and
+entity base classes whose state write reads the entity's state properties
+like Home Assistant does. Call `install()` before importing the integration.
+"""
+from __future__ import annotations
+
+import asyncio
+import enum
+import os
+import sys
+import types
+
+
+class HomeAssistant:
+    """Event loop holder with the job helpers used by the integration."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, config_dir: str) -> None:
+        self.loop = loop
+        self.data: dict = {}
+        self.config = types.SimpleNamespace(
+            path=lambda *parts: os.path.join(config_dir, *parts)
+        )
+        self._tasks: set[asyncio.Task] = set()
+
+    def async_create_task(self, target):
+        task = self.loop.create_task(target)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def add_job(self, target, *args):
+        if asyncio.iscoroutine(target):
+            self.loop.call_soon_threadsafe(self.async_create_task, target)
+        else:
+            self.loop.call_soon_threadsafe(target, *args)
+
+    async def async_add_executor_job(self, target, *args):
+        return await self.loop.run_in_executor(None, target, *args)
+
+    async def async_block_till_done(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+def callback(func):
+    """Mark a function as safe to run in the event loop."""
+    return func
+
+
+class Store:
+    """Storage helper that never touches the disk."""
+
+    def __init__(self, hass, version, key, private=False):
+        self.key = key
+
+    async def async_load(self):
+        return None
+
+    async def async_save(self, data) -> None:
+        return None
+
+    def async_delay_save(self, data_func, delay=0) -> None:
+        return None
+
+    async def async_remove(self) -> None:
+        return None
+
+
+class UpdateFailed(Exception):
+    """Error raised by _async_update_data."""
+
+
+class DataUpdateCoordinator:
+    """Coordinator without scheduling: data, listeners and manual refresh."""
+
+    def __init__(self, hass, logger, *, name, update_interval=None) -> None:
+        self.hass = hass
+        self.logger = logger
+        self.name = name
+        self.update_interval = update_interval
+        self.data = None
+        self.last_update_success = True
+        self._listeners: list = []
+
+    def __class_getitem__(cls, item):
+        return cls
+
+    def async_add_listener(self, update_callback, context=None):
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    def async_update_listeners(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def async_set_updated_data(self, data) -> None:
+        self.data = data
+        self.last_update_success = True
+        self.async_update_listeners()
+
+    async def async_refresh(self) -> None:
+        try:
+            self.data = await self._async_update_data()
+            self.last_update_success = True
+        except UpdateFailed:
+            self.last_update_success = False
+        self.async_update_listeners()
+
+    async def async_request_refresh(self) -> None:
+        await self.async_refresh()
+
+    async def async_config_entry_first_refresh(self) -> None:
+        await self.async_refresh()
+
+
+class Entity:
+    """Entity base: a state write reads the state properties, nothing is stored."""
+
+    _attr_available = True
+    _attr_device_class = None
+    _attr_device_info = None
+    _attr_entity_category = None
+    _attr_entity_registry_enabled_default = True
+    _attr_extra_state_attributes = None
+    _attr_has_entity_name = False
+    _attr_icon = None
+    _attr_name = None
+    _attr_translation_key = None
+    _attr_unique_id = None
+
+    hass = None
+    state = None
+
+    @property
+    def unique_id(self):
+        return self._attr_unique_id
+
+    @property
+    def available(self) -> bool:
+        return self._attr_available
+
+    @property
+    def icon(self):
+        return self._attr_icon
+
+    @property
+    def extra_state_attributes(self):
+        return self._attr_extra_state_attributes
+
+    def _state_value(self):
+        return None
+
+    def async_on_remove(self, func) -> None:
+        return None
+
+    def async_write_ha_state(self) -> None:
+        # Home Assistant lit ces propriétés à chaque écriture d'état
+        available = self.available
+        self.state = {
+            "state": self._state_value() if available else "unavailable",
+            "attributes": self.extra_state_attributes,
+            "icon": self.icon,
+        }
+
+
+class SensorEntity(Entity):
+    """Sensor base: the state is `native_value`."""
+
+    _attr_native_unit_of_measurement = None
+    _attr_native_value = None
+    _attr_state_class = None
+
+    @property
+    def native_value(self):
+        return self._attr_native_value
+
+    def _state_value(self):
+        return self.native_value
+
+
+class CoordinatorEntity(Entity):
+    """Entity refreshed by its coordinator's listeners."""
+
+    def __init__(self, coordinator, context=None) -> None:
+        self.coordinator = coordinator
+
+    def __class_getitem__(cls, item):
+        return cls
+
+    @property
+    def available(self) -> bool:
+        return self.coordinator.last_update_success
+
+    async def async_added_to_hass(self) -> None:
+        return None
+
+    def _handle_coordinator_update(self) -> None:
+        self.async_write_ha_state()
+
+
+def async_call_later(hass, delay, action):
+    """Run `action(now)` after `delay` seconds; return the cancel callback."""
+    handle = hass.loop.call_later(delay, action, None)
+    return handle.cancel
+
+
+def async_track_time_interval(hass, action, interval):
+    """Run `action(now)` every `interval`; return the cancel callback."""
+    seconds = interval.total_seconds()
+    handle = None
+
+    def run() -> None:
+        nonlocal handle
+        handle = hass.loop.call_later(seconds, run)
+        action(None)
+
+    handle = hass.loop.call_later(seconds, run)
+    return lambda: handle.cancel()
+
+
+def _not_available(*args, **kwargs):
+    raise RuntimeError("Not available in the benchmark stub")
+
+
+class Platform(str, enum.Enum):
+    SENSOR = "sensor"
+    CLIMATE = "climate"
+
+
+class SensorDeviceClass(str, enum.Enum):
+    TEMPERATURE = "temperature"
+    BATTERY = "battery"
+    DURATION = "duration"
+    SIGNAL_STRENGTH = "signal_strength"
+
+
+class SensorStateClass(str, enum.Enum):
+    MEASUREMENT = "measurement"
+    TOTAL = "total"
+
+
+class UnitOfTemperature(str, enum.Enum):
+    CELSIUS = "°C"
+    FAHRENHEIT = "°F"
+
+
+class UnitOfTime(str, enum.Enum):
+    MILLISECONDS = "ms"
+    SECONDS = "s"
+
+
+class EntityCategory(str, enum.Enum):
+    CONFIG = "config"
+    DIAGNOSTIC = "diagnostic"
+
+
+class DeviceEntryType(str, enum.Enum):
+    SERVICE = "service"
+
+
+class HomeAssistantError(Exception):
+    """Base Home Assistant error."""
+
+
+def _module(name: str, **attributes) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+def install() -> None:
+    """Register the stub modules in sys.modules."""
+    if "homeassistant" in sys.modules:
+        return
+    import voluptuous as vol
+
+    homeassistant = _module("homeassistant", __path__=[])
+    helpers = _module("homeassistant.helpers", __path__=[])
+    homeassistant.helpers = helpers
+    _module(
+        "homeassistant.core",
+        HomeAssistant=HomeAssistant,
+        ServiceCall=object,
+        CALLBACK_TYPE=object,
+        callback=callback,
+    )
+    _module(
+        "homeassistant.const",
+        ATTR_TEMPERATURE="temperature",
+        CONF_EMAIL="email",
+        CONF_PASSWORD="password",
+        SIGNAL_STRENGTH_DECIBELS_MILLIWATT="dBm",
+        EntityCategory=EntityCategory,
+        Platform=Platform,
+        UnitOfTemperature=UnitOfTemperature,
+        UnitOfTime=UnitOfTime,
+    )
+    components = _module("homeassistant.components", __path__=[])
+    homeassistant.components = components
+    components.sensor = _module(
+        "homeassistant.components.sensor",
+        SensorDeviceClass=SensorDeviceClass,
+        SensorEntity=SensorEntity,
+        SensorStateClass=SensorStateClass,
+    )
+    _module("homeassistant.config_entries", ConfigEntry=object)
+    _module("homeassistant.exceptions", HomeAssistantError=HomeAssistantError)
+    helpers.config_validation = _module(
+        "homeassistant.helpers.config_validation",
+        ensure_list=lambda value: value if isinstance(value, list) else [value],
+        string=vol.Coerce(str),
+    )
+    _module(
+        "homeassistant.helpers.aiohttp_client",
+        async_create_clientsession=_not_available,
+        async_get_clientsession=_not_available,
+    )
+    _module(
+        "homeassistant.helpers.event",
+        async_call_later=async_call_later,
+        async_track_time_interval=async_track_time_interval,
+    )
+    _module("homeassistant.helpers.storage", Store=Store)
+    _module(
+        "homeassistant.helpers.update_coordinator",
+        CoordinatorEntity=CoordinatorEntity,
+        DataUpdateCoordinator=DataUpdateCoordinator,
+        UpdateFailed=UpdateFailed,
+    )
+    _module("homeassistant.helpers.device_registry", DeviceEntryType=DeviceEntryType)
+    _module("homeassistant.helpers.entity", DeviceInfo=dict, Entity=Entity)
+    _module("homeassistant.helpers.entity_platform", AddEntitiesCallback=object)
+    helpers.entity_registry = _module(
+        "homeassistant.helpers.entity_registry",
+        async_get=_not_available,
+        async_entries_for_config_entry=_not_available,
+    )
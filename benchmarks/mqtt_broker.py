@@ -0,0 +1,251 @@
+"""Loopback MQTT 3.1.1 broker for the benchmarks and tests.
+
+Just enough of a broker for the integration's paho client: CONNECT, SUBSCRIBE,
+UNSUBSCRIBE, PUBLISH from the client (QoS 0/1), PINGREQ and DISCONNECT. Every
+message published by the broker goes to every connected client, whatever it
+subscribed to. It listens on 127.0.0.1 over TLS, like the ThermoMaven brokers,
+and runs its own event loop in a thread, so the client under test is driven
+over a real socket whichever MQTT mode it uses.
+
+`patch_api(module)` points an imported thermomaven_api module at the broker:
+the US broker becomes 127.0.0.1 on the broker's port, and the client TLS
+context trusts the broker's certificate.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import ssl
+import struct
+import tempfile
+import threading
+import time
+
+from selfsigned import LOOPBACK, self_signed_certificate
+
+CONNECT = 0x10
+CONNACK = 0x20
+PUBLISH = 0x30
+PUBACK = 0x40
+SUBSCRIBE = 0x80
+SUBACK = 0x90
+UNSUBSCRIBE = 0xA0
+UNSUBACK = 0xB0
+PINGREQ = 0xC0
+PINGRESP = 0xD0
+DISCONNECT = 0xE0
+
+
+def _remaining_length(length: int) -> bytes:
+    encoded = bytearray()
+    while True:
+        length, digit = divmod(length, 128)
+        encoded.append(digit | (0x80 if length else 0))
+        if not length:
+            return bytes(encoded)
+
+
+def _packet(header: int, body: bytes) -> bytes:
+    return bytes((header,)) + _remaining_length(len(body)) + body
+
+
+def publish_packet(topic: str, payload: bytes) -> bytes:
+    """Encode a QoS 0 PUBLISH."""
+    topic_bytes = topic.encode()
+    return _packet(PUBLISH, struct.pack("!H", len(topic_bytes)) + topic_bytes + payload)
+
+
+class LoopbackBroker:
+    """TLS MQTT broker on 127.0.0.1, running in its own thread."""
+
+    def __init__(self) -> None:
+        self.port: int | None = None
+        self.connects = 0
+        self.disconnects = 0  # DISCONNECT reçus du client (arrêt propre)
+        self.pings = 0
+        self.subscriptions: set[str] = set()
+        self.published: list[tuple[str, bytes]] = []  # PUBLISH reçus du client
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._thread: threading.Thread | None = None
+        self.cert_pem, self._key_pem = self_signed_certificate()
+        # Le certificat client n'est pas vérifié: seul le chargement par paho compte
+        cert_pem, key_pem = self_signed_certificate("thermomaven-client")
+        self.client_material = {"cert_pem": cert_pem, "key_pem": key_pem}
+
+    def start(self) -> LoopbackBroker:
+        """Start listening; return once the port is known."""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="loopback-broker", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self) -> None:
+        """Close every connection and stop the broker's loop."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._async_close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+    def __enter__(self) -> LoopbackBroker:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def clients(self) -> int:
+        """Connections currently open."""
+        return len(self._writers)
+
+    def _submit(self, coro) -> asyncio.Future:
+        """Run `coro` in the broker's loop; await the result from the caller's loop."""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    async def async_publish(self, topic: str, payload: bytes) -> None:
+        """Send a message to every client."""
+        await self._submit(self._async_send(publish_packet(topic, payload)))
+
+    async def async_publish_many(self, messages, rate: float = 0, on_send=None) -> None:
+        """Send `messages` (topic, payload) in order, at `rate` messages/s (0 = as fast as possible).
+
+        `on_send(index)` runs in the broker's thread just before each message is written.
+        """
+        await self._submit(self._async_send_many(messages, rate, on_send))
+
+    async def async_drop_clients(self) -> None:
+        """Abort every connection, as a broker restart or a network cut would."""
+        await self._submit(self._async_drop())
+
+    def _run(self, ready: threading.Event) -> None:
+        self._loop = asyncio.new_event_loop()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "broker.pem")
+            with open(path, "w") as file:
+                file.write(self.cert_pem + self._key_pem)
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(path)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle_client, LOOPBACK, 0, ssl=context)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _async_close(self) -> None:
+        self._server.close()
+        await self._async_drop()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _async_drop(self) -> None:
+        for writer in list(self._writers):
+            writer.transport.abort()
+        self._writers.clear()
+
+    async def _async_send(self, packet: bytes) -> None:
+        for writer in list(self._writers):
+            # Client parti sans que son handler l'ait encore vu: ne plus lui écrire
+            if writer.transport.is_closing():
+                self._writers.discard(writer)
+                continue
+            writer.write(packet)
+            await writer.drain()
+
+    async def _async_send_many(self, messages, rate: float, on_send) -> None:
+        interval = 1 / rate if rate else 0.0
+        start = time.perf_counter()
+        for index, (topic, payload) in enumerate(messages):
+            if interval:
+                delay = start + index * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if on_send is not None:
+                on_send(index)
+            await self._async_send(publish_packet(topic, payload))
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            while True:
+                header = (await reader.readexactly(1))[0]
+                length, multiplier = 0, 1
+                while True:
+                    digit = (await reader.readexactly(1))[0]
+                    length += (digit & 0x7F) * multiplier
+                    multiplier *= 128
+                    if not digit & 0x80:
+                        break
+                body = await reader.readexactly(length)
+                if not self._handle_packet(header, body, writer):
+                    break
+                # readexactly() ne suspend pas si les octets sont déjà là: céder la main
+                # pour que la perte de la connexion soit vue avant de répondre au suivant
+                await asyncio.sleep(0)
+        except (asyncio.IncompleteReadError, ConnectionError, ssl.SSLError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._handlers.discard(handler)
+            # abort() plutôt que close(): rien à vider vers un client parti, la fermeture
+            # TLS écrirait chaque message en attente dans un socket déjà perdu
+            writer.transport.abort()
+
+    def _handle_packet(self, header: int, body: bytes, writer: asyncio.StreamWriter) -> bool:
+        """Answer one client packet; return False when the connection ends."""
+        kind = header & 0xF0
+        # Paquets déjà reçus d'un client parti: les compter, ne plus y répondre
+        reply = writer.write if not writer.transport.is_closing() else (lambda packet: None)
+        if kind == CONNECT:
+            self.connects += 1
+            reply(_packet(CONNACK, b"\x00\x00"))
+        elif kind == SUBSCRIBE:
+            packet_id, offset, granted = body[:2], 2, bytearray()
+            while offset < len(body):
+                (size,) = struct.unpack_from("!H", body, offset)
+                self.subscriptions.add(body[offset + 2:offset + 2 + size].decode())
+                granted.append(body[offset + 2 + size])
+                offset += size + 3
+            reply(_packet(SUBACK, packet_id + bytes(granted)))
+        elif kind == UNSUBSCRIBE:
+            reply(_packet(UNSUBACK, body[:2]))
+        elif kind == PUBLISH:
+            (size,) = struct.unpack_from("!H", body)
+            topic = body[2:2 + size].decode()
+            qos = (header >> 1) & 0x03
+            payload_start = 2 + size + (2 if qos else 0)
+            self.published.append((topic, body[payload_start:]))
+            if qos:
+                reply(_packet(PUBACK, body[2 + size:payload_start]))
+        elif kind == PINGREQ:
+            self.pings += 1
+            reply(_packet(PINGRESP, b""))
+        elif kind == DISCONNECT:
+            self.disconnects += 1
+            return False
+        return True
+
+    def patch_api(self, api_module, setattr=setattr) -> None:
+        """Point an imported thermomaven_api module at this broker.
+
+        Pass pytest's `monkeypatch.setattr` to have the patches undone after a test.
+        """
+        build_ssl_context = api_module.build_ssl_context
+        cert_pem = self.cert_pem
+
+        def loopback_ssl_context(material: dict) -> ssl.SSLContext:
+            context = build_ssl_context(material)
+            context.load_verify_locations(cadata=cert_pem)
+            return context
+
+        setattr(api_module, "MQTT_BROKERS", {"US": LOOPBACK})
+        setattr(api_module, "MQTT_PORT", self.port)
+        setattr(api_module, "build_ssl_context", loopback_ssl_context)
@@ -0,0 +1,137 @@
+"""Recorded or synthetic ThermoMaven MQTT traffic for the benchmarks.
+
+A capture is either a JSON Lines file, one received message per line:
+
+    {"topic": "app/WT10/2165.../sub", "payload": {...}}
+
+(`payload` may also be the raw payload string), or a diagnostics file
+downloaded from Home Assistant, whose `recent_messages` are replayed. The
+first `user:device:list` and the `status:report` messages are used as
+templates and cloned for every simulated device.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import random
+
+DEVICE_MODEL = "WT09"  # 4 sondes: le cas le plus lourd
+PROBES = 4
+AREAS = 5
+
+
+def _synthetic_device(index: int) -> dict:
+    device_id = str(216510650012434433 + index)
+    return {
+        "deviceId": device_id,
+        "deviceName": f"Bench {index:03d}",
+        "deviceModel": DEVICE_MODEL,
+        "deviceSn": f"SN{index:010d}",
+        "firmwareVersion": "1.0.7",
+        "subTopics": [f"app/{DEVICE_MODEL}/{device_id}/sub"],
+        "pubTopics": [f"app/{DEVICE_MODEL}/{device_id}/pub"],
+    }
+
+
+def _synthetic_report(device: dict, step: int, rng: random.Random) -> dict:
+    probes = []
+    for probe in range(PROBES):
+        tip = 700 + step * 3 + probe * 20 + rng.randint(-2, 2)  # dixièmes de °F
+        probes.append({
+            "probeColor": "bright" if probe % 2 == 0 else "dark",
+            "curTemperature": tip,
+            "curAmbientTemperature": 2250 + rng.randint(-15, 15),
+            "areaTemperature": [tip + area * 90 for area in range(AREAS)],
+            "batteryValue": 90,
+            "cookingState": "cooking",
+            "cookingMode": "targetTemperature",
+            "setParams": [{"setTemperature": 1650}],
+            "curCookSec": step * 5,
+        })
+    return {
+        "cmdType": f"{device['deviceModel']}:status:report",
+        "deviceId": device["deviceId"],
+        "cmdData": {
+            "globalStatus": "online",
+            "connectStatus": "online",
+            "batteryValue": 88,
+            "batteryStatus": "normal",
+            "wifiRssi": -58,
+            "probes": probes,
+        },
+    }
+
+
+def load_capture(path: str) -> tuple[dict | None, list[dict]]:
+    """Return (first device list payload, status report payloads) of a capture."""
+    with open(path, encoding="utf-8") as file:
+        text = file.read()
+    try:
+        diagnostics = json.loads(text)
+    except ValueError:
+        diagnostics = None
+    recent = None
+    if isinstance(diagnostics, dict):
+        recent = diagnostics.get("data", diagnostics).get("recent_messages")
+    if recent is not None:
+        messages = [message for entries in recent.values() for message in entries]
+        messages.sort(key=lambda message: message.get("received", 0))
+    else:
+        messages = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    device_list = None
+    reports = []
+    for message in messages:
+        payload = message["payload"]
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        cmd_type = payload.get("cmdType", "")
+        if cmd_type == "user:device:list" and device_list is None:
+            device_list = payload
+        elif cmd_type.endswith(":status:report"):
+            reports.append(payload)
+    return device_list, reports
+
+
+class Traffic:
+    """Device list and status report stream for `devices` simulated devices."""
+
+    def __init__(self, devices: int, capture: str | None = None, seed: int = 0) -> None:
+        self._rng = random.Random(seed)
+        self._templates: list[dict] = []
+        template_device = None
+        if capture:
+            device_list, self._templates = load_capture(capture)
+            listed = (device_list or {}).get("cmdData", {}).get("devices") or []
+            template_device = listed[0] if listed else None
+        self.devices = [self._clone_device(template_device, index) for index in range(devices)]
+
+    def _clone_device(self, template: dict | None, index: int) -> dict:
+        synthetic = _synthetic_device(index)
+        if template is None:
+            return synthetic
+        device = copy.deepcopy(template)
+        old_id = str(template.get("deviceId"))
+        device.update({key: synthetic[key] for key in ("deviceId", "deviceName", "deviceSn")})
+        for key in ("subTopics", "pubTopics"):
+            if device.get(key):
+                device[key] = [topic.replace(old_id, synthetic["deviceId"]) for topic in device[key]]
+        return device
+
+    def device_list(self) -> tuple[str, bytes]:
+        """Return the (topic, payload) of the user:device:list message."""
+        payload = {"cmdType": "user:device:list", "cmdData": {"devices": self.devices}}
+        return "app/user/sub", json.dumps(payload).encode()
+
+    def status_reports(self, count: int):
+        """Yield `count` (topic, payload) status reports, round-robin over the devices."""
+        for sequence in range(count):
+            device = self.devices[sequence % len(self.devices)]
+            step = sequence // len(self.devices)
+            if self._templates:
+                report = copy.deepcopy(self._templates[step % len(self._templates)])
+                report["deviceId"] = device["deviceId"]
+            else:
+                report = _synthetic_report(device, step, self._rng)
+            topic = (device.get("subTopics") or [f"app/{device.get('deviceModel')}/{device['deviceId']}/sub"])[0]
+            yield topic, json.dumps(report).encode()
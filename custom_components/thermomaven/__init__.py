@@ -5,39 +5,105 @@ import asyncio
 import logging
 import time
 from datetime import timedelta
+from types import MappingProxyType
+
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_TEMPERATURE, Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN, CONF_REGION
+from .certificates import ThermoMavenCertificateCache
+from .cook_history import CookHistoryStore
+from .const import (
+    API_DEVICE_METADATA,
+    CONF_REGION,
+    DOMAIN,
+    HISTORY_SYNC_INTERVAL,
+    LATENCY_STAGE_DISPATCH,
+    LATENCY_STAGE_FANOUT,
+    LATENCY_STAGE_MERGE,
+    PROBE_ACTION_STOP,
+    PROBE_ACTIONS,
+    PROBE_COLORS,
+    PROBE_MAX_TEMP_F,
+    PROBE_MIN_TEMP_F,
+    RECONCILE_RETRY_DELAY,
+    RECONCILE_RETRY_MAX_DELAY,
+    STATUS_FLUSH_WINDOW,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    UNKNOWN_DEVICE_SYNC_COOLDOWN,
+)
+from .history import TemperatureHistory
+from .models import DeviceStatus, merge_status_reports
+from .sessions import CookSessionRecorder
 from .thermomaven_api import ThermoMavenAPI
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.SENSOR, Platform.CLIMATE]
 
+SERVICE_SET_PROBES = "set_probes"
+ATTR_COMMANDS = "commands"
+ATTR_DEVICE_ID = "device_id"
+ATTR_PROBE_COLOR = "probe_color"
+ATTR_ACTION = "action"
+
+
+def _require_temperature(command: dict) -> dict:
+    """Start/set commands need a target temperature."""
+    if command[ATTR_ACTION] != PROBE_ACTION_STOP and ATTR_TEMPERATURE not in command:
+        raise vol.Invalid(f"{ATTR_TEMPERATURE} is required for action {command[ATTR_ACTION]}")
+    return command
+
+
+SET_PROBES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_COMMANDS): vol.All(
+            cv.ensure_list,
+            [
+                vol.All(
+                    {
+                        vol.Required(ATTR_DEVICE_ID): cv.string,
+                        vol.Required(ATTR_PROBE_COLOR): vol.In(PROBE_COLORS),
+                        vol.Required(ATTR_ACTION): vol.In(list(PROBE_ACTIONS)),
+                        vol.Optional(ATTR_TEMPERATURE): vol.All(  # °F
+                            vol.Coerce(float),
+                            vol.Range(min=PROBE_MIN_TEMP_F, max=PROBE_MAX_TEMP_F),
+                        ),
+                    },
+                    _require_temperature,
+                )
+            ],
+        )
+    }
+)
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up ThermoMaven from a config entry."""
+    setup_start = time.monotonic()
     email = entry.data["email"]
     password = entry.data["password"]
     app_key = entry.data.get("app_key", "bcd4596f1bb8419a92669c8017bf25e8")
     app_id = entry.data.get("app_id", "ap4060eff28137181bd")
     region = entry.data.get(CONF_REGION, "US")
 
-    # Créer l'API client
-    api = ThermoMavenAPI(hass, email, password, app_key, app_id, region)
+    # Créer l'API client avec une session HTTP dédiée (keep-alive, réutilisée par tous les appels REST)
+    api = ThermoMavenAPI(
+        hass, email, password, app_key, app_id, region,
+        session=async_create_clientsession(hass),
+        cert_cache=ThermoMavenCertificateCache(hass, entry.entry_id),
+    )
     
-    # Se connecter
-    try:
-        await api.async_login()
-    except Exception as err:
-        _LOGGER.error("Failed to login to ThermoMaven: %s", err)
-        return False
-
     # Créer le coordinator pour les mises à jour
-    coordinator = ThermoMavenDataUpdateCoordinator(hass, api)
+    coordinator = ThermoMavenDataUpdateCoordinator(hass, api, entry.entry_id)
     
     # Stocker l'API et le coordinator AVANT le setup
     hass.data.setdefault(DOMAIN, {})
@@ -46,21 +112,37 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "coordinator": coordinator,
     }
 
-    # Setup MQTT AVANT le premier refresh pour avoir les données MQTT disponibles
-    _LOGGER.debug("⏳ Setting up MQTT before first data refresh...")
-    await api.async_setup_mqtt(coordinator)
-    
-    # Attendre que MQTT reçoive la liste des appareils (max 10 secondes)
-    mqtt_ready = await api.async_wait_for_mqtt_device_list(timeout=10)
+    # Démarrage à chaud: les entités sont créées depuis le cache disque,
+    # la connexion au cloud se fait en arrière-plan
+    warm_start = await coordinator.async_load_cache()
     
-    if mqtt_ready:
-        _LOGGER.debug("✅ MQTT device list ready, proceeding with data refresh")
+    if warm_start:
+        _LOGGER.debug("💾 Restored %d device(s) from cache, connecting to the cloud in background",
+                     len(coordinator.data["devices"]))
+        hass.data[DOMAIN][entry.entry_id]["startup_task"] = hass.async_create_task(
+            _async_reconcile_with_cloud(api, coordinator, setup_start)
+        )
     else:
-        _LOGGER.warning("⚠️ Proceeding without MQTT device list (timeout)")
-    
-    # Maintenant faire le premier refresh avec les données MQTT disponibles
-    _LOGGER.debug("🔄 Performing first data refresh with MQTT data...")
-    await coordinator.async_config_entry_first_refresh()
+        # Se connecter
+        try:
+            await api.async_login()
+        except Exception as err:
+            _LOGGER.error("Failed to login to ThermoMaven: %s", err)
+            await _async_abort_setup(hass, entry, api, coordinator)
+            return False
+        _LOGGER.debug("⏱️ Startup: logged in after %.2fs", time.monotonic() - setup_start)
+
+        try:
+            await _async_setup_mqtt_and_wait(api, coordinator, setup_start)
+            
+            # Maintenant faire le premier refresh avec les données MQTT disponibles
+            _LOGGER.debug("🔄 Performing first data refresh with MQTT data...")
+            await coordinator.async_config_entry_first_refresh()
+        except BaseException:
+            # ConfigEntryNotReady compris: HA relancera le setup, rien ne doit rester ouvert
+            await _async_abort_setup(hass, entry, api, coordinator)
+            raise
+        _LOGGER.debug("⏱️ Startup: first refresh done after %.2fs", time.monotonic() - setup_start)
 
     # Register services
     async def handle_sync_devices(call):
@@ -72,45 +154,227 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         await coordinator.async_request_refresh()
     
     hass.services.async_register(DOMAIN, "sync_devices", handle_sync_devices)
+    
+    async def handle_set_probes(call):
+        """Handle the set_probes service call."""
+        await _async_handle_set_probes(hass, call)
+    
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_PROBES, handle_set_probes, schema=SET_PROBES_SCHEMA
+    )
+
+    # Historique des cuissons du cloud: synchronisation incrémentale en arrière-plan
+    history_store = CookHistoryStore(hass, entry.entry_id)
+    hass.data[DOMAIN][entry.entry_id]["history_store"] = history_store
+    
+    async def _async_sync_history(_now=None):
+        """Fetch the new cloud history pages."""
+        startup_task = hass.data[DOMAIN][entry.entry_id].get("startup_task")
+        if startup_task is not None and not startup_task.done():
+            await asyncio.shield(startup_task)  # Le login doit être fait
+        try:
+            await history_store.async_sync(api)
+        except Exception as err:
+            _LOGGER.warning("Cooking history sync failed: %s", err)
+    
+    hass.data[DOMAIN][entry.entry_id]["history_task"] = hass.async_create_task(_async_sync_history())
+    hass.data[DOMAIN][entry.entry_id]["history_unsub"] = async_track_time_interval(
+        hass, _async_sync_history, timedelta(seconds=HISTORY_SYNC_INTERVAL)
+    )
 
     # Forward entry setup to platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    _LOGGER.debug("⏱️ Startup: entities ready after %.2fs", time.monotonic() - setup_start)
+
+    return True
+
+
+async def _async_abort_setup(hass: HomeAssistant, entry: ConfigEntry, api: ThermoMavenAPI, coordinator) -> None:
+    """Release what a failed setup opened: MQTT client, HTTP session, hass.data entry."""
+    hass.data[DOMAIN].pop(entry.entry_id, None)
+    try:
+        await api.async_disconnect_mqtt()
+    except Exception as err:
+        _LOGGER.debug("MQTT disconnect after failed setup: %s", err)
+    coordinator.async_cancel_pending_reports()
+    await coordinator.sessions.async_stop()
+    await api.async_close()
 
-    # NOUVEAU: Forcer une mise à jour après setup des platforms pour réveiller les entités
-    await asyncio.sleep(2)
-    _LOGGER.debug("🔄 Post-setup refresh to ensure entities are updated...")
-    await coordinator.async_request_refresh()
 
+async def _async_setup_mqtt_and_wait(api: ThermoMavenAPI, coordinator, setup_start: float) -> bool:
+    """Connect MQTT and wait for the device list.
+    
+    Returns False if the MQTT client could not be set up. A device list that
+    does not arrive in time is not a failure: it is applied when it comes.
+    """
+    # Setup MQTT AVANT le premier refresh pour avoir les données MQTT disponibles
+    _LOGGER.debug("⏳ Setting up MQTT before first data refresh...")
+    if not await api.async_setup_mqtt(coordinator):
+        _LOGGER.warning("⚠️ MQTT setup failed")
+        return False
+    
+    # Attendre que MQTT reçoive la liste des appareils (max 10 secondes)
+    mqtt_ready = await api.async_wait_for_mqtt_device_list(timeout=10)
+    
+    if mqtt_ready:
+        _LOGGER.debug("✅ MQTT device list ready, proceeding with data refresh")
+    else:
+        _LOGGER.warning("⚠️ Proceeding without MQTT device list (timeout)")
+    _LOGGER.debug("⏱️ Startup: MQTT ready after %.2fs", time.monotonic() - setup_start)
     return True
 
 
+async def _async_reconcile_with_cloud(api: ThermoMavenAPI, coordinator, setup_start: float) -> None:
+    """Login, connect MQTT and refresh live data after a warm start from cache.
+    
+    Retried with exponential backoff until it succeeds; meanwhile the cached
+    devices are marked unavailable.
+    """
+    delay = RECONCILE_RETRY_DELAY
+    while not await _async_try_reconcile(api, coordinator, setup_start):
+        # Le cache n'est pas confirmé par le cloud: ne pas afficher ses valeurs comme actuelles
+        coordinator.async_mark_stale()
+        _LOGGER.warning("☁️ Cloud not reachable, cached devices unavailable, retrying in %ds", delay)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, RECONCILE_RETRY_MAX_DELAY)
+    _LOGGER.debug("⏱️ Startup: live data reconciled after %.2fs", time.monotonic() - setup_start)
+
+
+async def _async_try_reconcile(api: ThermoMavenAPI, coordinator, setup_start: float) -> bool:
+    """Make one login + MQTT + refresh attempt, return True on success."""
+    try:
+        await api.async_login()
+    except Exception as err:
+        _LOGGER.error("Failed to login to ThermoMaven: %s", err)
+        return False
+    _LOGGER.debug("⏱️ Startup: logged in after %.2fs", time.monotonic() - setup_start)
+    
+    # Relance avec MQTT déjà connecté (seul le refresh avait échoué): ne pas
+    # réarmer l'attente de la liste d'appareils, qui ne serait pas renvoyée
+    if api.mqtt_client is not None and api.mqtt_client.is_connected():
+        _LOGGER.debug("♻️ MQTT already connected, retrying the refresh only")
+    else:
+        try:
+            if not await _async_setup_mqtt_and_wait(api, coordinator, setup_start):
+                return False
+        except Exception as err:
+            _LOGGER.error("Failed to connect to the ThermoMaven MQTT broker: %s", err)
+            return False
+    # Le refresh réussi remet last_update_success à True: entités de nouveau disponibles
+    await coordinator.async_refresh()
+    return coordinator.last_update_success
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
+        startup_task = hass.data[DOMAIN][entry.entry_id].get("startup_task")
+        if startup_task and not startup_task.done():
+            startup_task.cancel()
+        history_task = hass.data[DOMAIN][entry.entry_id].get("history_task")
+        if history_task and not history_task.done():
+            history_task.cancel()
+        hass.data[DOMAIN][entry.entry_id]["history_unsub"]()
+        
         # Disconnect MQTT
         api = hass.data[DOMAIN][entry.entry_id]["api"]
         await api.async_disconnect_mqtt()
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        coordinator.async_cancel_pending_reports()
+        await coordinator.sessions.async_stop()
+        await api.async_close()
         
         hass.data[DOMAIN].pop(entry.entry_id)
         
         # Unregister services if no more entries
         if not hass.data[DOMAIN]:
             hass.services.async_remove(DOMAIN, "sync_devices")
+            hass.services.async_remove(DOMAIN, SERVICE_SET_PROBES)
 
     return unload_ok
 
 
+async def _async_handle_set_probes(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Handle the set_probes service: one command burst per account."""
+    batches: dict[str, list] = {}  # entry_id -> commandes de ce compte
+    for command in call.data[ATTR_COMMANDS]:
+        device_id = command[ATTR_DEVICE_ID]
+        entry_id = next(
+            (
+                entry_id
+                for entry_id, entry_data in hass.data[DOMAIN].items()
+                if entry_data["coordinator"].get_device(device_id) is not None
+            ),
+            None,
+        )
+        if entry_id is None:
+            raise HomeAssistantError(f"Unknown ThermoMaven device: {device_id}")
+        temperature = command.get(ATTR_TEMPERATURE)
+        batches.setdefault(entry_id, []).append((
+            device_id,
+            command[ATTR_PROBE_COLOR],
+            command[ATTR_ACTION],
+            int(temperature * 10) if temperature is not None else None,
+        ))
+    
+    results = await asyncio.gather(*(
+        hass.data[DOMAIN][entry_id]["api"].async_send_probe_commands(commands)
+        for entry_id, commands in batches.items()
+    ))
+    failed = sum(result.count(False) for result in results)
+    if failed:
+        raise HomeAssistantError(f"{failed} probe command(s) were not acknowledged")
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the persistent caches and recorded cook sessions when the entry is deleted."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}", private=True).async_remove()
+    await ThermoMavenCertificateCache(hass, entry.entry_id).async_remove()
+    await hass.async_add_executor_job(CookHistoryStore(hass, entry.entry_id).remove)
+    await hass.async_add_executor_job(CookSessionRecorder(hass, entry.entry_id).remove)
+
+
 class ThermoMavenDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching ThermoMaven data."""
 
-    def __init__(self, hass: HomeAssistant, api: ThermoMavenAPI):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: ThermoMavenAPI,
+        entry_id: str,
+        flush_window: float = STATUS_FLUSH_WINDOW,
+    ):
         """Initialize."""
         self.api = api
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}", private=True)
         self._auto_sync_attempts = 0
         self._max_auto_sync_attempts = 3  # Limite pour éviter de spammer l'API
-        self._merged_devices_cache = {}  # Cache des devices fusionnés (deviceName -> device)
+        self._status_cache = {}  # deviceId -> (lastStatusCmd brut, DeviceStatus décodé)
+        # Table persistante des appareils fusionnés (API + MQTT), publiée via MappingProxyType
+        self._devices_by_id = {}
+        self._status_by_id = {}
+        self._id_by_name = {}  # deviceName -> deviceId (appareils API sans deviceId)
+        self._api_metadata_by_name = {}  # deviceName -> métadonnées de partage de l'API
+        self._pushed_ids = set()  # Appareils dont le lastStatusCmd vient d'un status:report direct
+        self._user_info = {}
+        self._next_device_sync = 0.0  # Horloge de boucle: prochaine sync pour appareil inconnu
+        self._mqtt_list_received = False
+        self._data_dirty = True  # La liste "devices" doit être reconstruite
+        self._device_listeners = {}  # deviceId -> [callbacks] pour les mises à jour push
+        self._flush_window = flush_window  # secondes entre deux écritures d'état d'un appareil
+        self._pending_reports = {}  # deviceId -> status:report fusionné en attente
+        self._flush_handles = {}  # deviceId -> TimerHandle du flush programmé
+        self._last_flush = {}  # deviceId -> loop.time() du dernier flush
+        self.history = TemperatureHistory()  # Tendances par sonde, sans requête au recorder
+        # Statistiques de fonctionnement (diagnostics)
+        self._update_count = 0
+        self._last_update_duration = None  # secondes
+        self._reports_received = 0
+        self._reports_applied = 0  # < reçus quand des rafales sont fusionnées
+        self.latency = api.latency  # Histogrammes partagés avec l'API (décodage MQTT)
+        self.sessions = CookSessionRecorder(hass, entry_id)  # Fichiers binaires par cookUuid
         super().__init__(
             hass,
             _LOGGER,
@@ -118,8 +382,332 @@ class ThermoMavenDataUpdateCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=300),  # 5 minutes (MQTT is primary)
         )
 
+    def get_device(self, device_id: str) -> dict | None:
+        """Return the merged device record for a deviceId (O(1) lookup)."""
+        if not self.data:
+            return None
+        return self.data["devices_by_id"].get(device_id)
+
+    def get_status(self, device_id: str) -> DeviceStatus | None:
+        """Return the decoded status snapshot for a deviceId (O(1) lookup)."""
+        if not self.data:
+            return None
+        return self.data["status_by_id"].get(device_id)
+
+    @callback
+    def async_add_device_listener(self, device_id: str, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for push updates of a single device."""
+        listeners = self._device_listeners.setdefault(device_id, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+            if not listeners:
+                self._device_listeners.pop(device_id, None)
+
+        return remove_listener
+
+    @callback
+    def async_mark_stale(self) -> None:
+        """Mark the cached devices unavailable until a refresh confirms them."""
+        if self.last_update_success:
+            self.last_update_success = False
+            self.async_update_listeners()
+
+    @callback
+    def async_handle_status_report(self, report: dict, dispatch_start: float | None = None) -> None:
+        """Apply an MQTT status:report to its device and notify only that device's entities.
+        
+        Bursts are coalesced: a device is flushed at most once per flush window,
+        reports received in between are merged so the latest value of every field is kept.
+        `dispatch_start` is the perf_counter() value when the MQTT handler got the report.
+        """
+        merge_start = time.perf_counter()
+        if dispatch_start is not None:
+            self.latency.record(LATENCY_STAGE_DISPATCH, merge_start - dispatch_start)
+        device_id = str(report.get("deviceId"))
+        self._reports_received += 1
+        # Confirmer les commandes en attente sur le rapport brut, sans attendre le flush
+        self.api.async_confirm_probe_commands(device_id, report)
+        
+        if device_id not in self._devices_by_id:
+            # Appareil inconnu: la liste d'appareils (REST + user:device:list) ajoutera sa ligne
+            self._async_request_device_sync(device_id)
+            return
+        
+        # Historique alimenté par chaque rapport brut (avant fusion des rafales)
+        self.history.record(device_id, self.hass.loop.time(), report)
+        self.sessions.async_record(device_id, report)
+        
+        pending = self._pending_reports.get(device_id)
+        if pending is not None:
+            self._pending_reports[device_id] = merge_status_reports(pending, report)
+            self.latency.record(LATENCY_STAGE_MERGE, time.perf_counter() - merge_start)
+            return
+        
+        now = self.hass.loop.time()
+        next_flush = self._last_flush.get(device_id, 0) + self._flush_window
+        if now >= next_flush:
+            self._async_apply_status_report(device_id, report, merge_start)
+            return
+        
+        self._pending_reports[device_id] = report
+        self._flush_handles[device_id] = self.hass.loop.call_at(
+            next_flush, self._async_flush_status_report, device_id
+        )
+        self.latency.record(LATENCY_STAGE_MERGE, time.perf_counter() - merge_start)
+
+    @callback
+    def _async_request_device_sync(self, device_id: str) -> None:
+        """Sync the device list for an unknown device, at most once per cooldown."""
+        now = self.hass.loop.time()
+        if now < self._next_device_sync:
+            return
+        self._next_device_sync = now + UNKNOWN_DEVICE_SYNC_COOLDOWN
+        _LOGGER.debug("Status report for unknown device %s, syncing the device list", device_id)
+        self.hass.async_create_task(self._async_sync_device_list())
+
+    async def _async_sync_device_list(self) -> None:
+        """Fetch the devices from the REST API.
+        
+        The request also makes the broker publish user:device:list, which adds
+        the rows and topics of new devices through async_apply_device_list.
+        """
+        try:
+            devices = await self.api.async_get_devices()
+        except Exception as err:
+            _LOGGER.warning("Device list sync failed: %s", err)
+            return
+        self._apply_api_devices(devices)
+        self._async_publish()
+
+    @callback
+    def _async_flush_status_report(self, device_id: str) -> None:
+        """Apply the report buffered for a device at the end of its flush window."""
+        self._flush_handles.pop(device_id, None)
+        report = self._pending_reports.pop(device_id, None)
+        if report is not None:
+            self._async_apply_status_report(device_id, report)
+
+    @callback
+    def _async_apply_status_report(
+        self, device_id: str, report: dict, merge_start: float | None = None
+    ) -> None:
+        """Patch one device with a status report and notify its entities."""
+        if merge_start is None:
+            merge_start = time.perf_counter()
+        self._last_flush[device_id] = self.hass.loop.time()
+        device = self._devices_by_id.get(device_id)
+        if device is None:
+            return
+        
+        device["lastStatusCmd"] = report
+        self._pushed_ids.add(device_id)
+        self._reports_applied += 1
+        status = self._decode_status(device_id, report)
+        if status is not None:
+            self._status_by_id[device_id] = status
+        
+        fanout_start = time.perf_counter()
+        self.latency.record(LATENCY_STAGE_MERGE, fanout_start - merge_start)
+        for update_callback in list(self._device_listeners.get(device_id, ())):
+            update_callback()
+        self.latency.record(LATENCY_STAGE_FANOUT, time.perf_counter() - fanout_start)
+        
+        self._async_schedule_save()
+
+    @callback
+    def async_cancel_pending_reports(self) -> None:
+        """Drop buffered status reports (on unload)."""
+        for handle in self._flush_handles.values():
+            handle.cancel()
+        self._flush_handles.clear()
+        self._pending_reports.clear()
+
+    def _build_data(self) -> dict:
+        """Build coordinator data from the device table.
+        
+        The indexes are read-only views of the live table: patching a row is
+        visible to the entities without rebuilding anything. Only the `devices`
+        list is rebuilt, when devices are added or removed.
+        """
+        if self._data_dirty or self.data is None:
+            self._data_dirty = False
+            return {
+                "devices": list(self._devices_by_id.values()),
+                "devices_by_id": MappingProxyType(self._devices_by_id),
+                "status_by_id": MappingProxyType(self._status_by_id),
+                "user_info": self._user_info,
+            }
+        return self.data
+
+    @callback
+    def _async_publish(self) -> None:
+        """Notify entities after rows of the device table changed."""
+        data = self._build_data()
+        if data is not self.data:
+            self.async_set_updated_data(data)
+        else:
+            self.async_update_listeners()
+        self._async_schedule_save()
+
+    def _upsert_device(self, fields: dict) -> str | None:
+        """Merge one device entry into its row of the table, return its deviceId."""
+        device_id = fields.get("deviceId")
+        if device_id in (None, "None", ""):
+            # Appareil API sans deviceId: le retrouver par son nom
+            device_id = self._id_by_name.get(fields.get("deviceName"))
+            if device_id is None:
+                _LOGGER.warning("⚠️ No cache found for device: %s", fields.get("deviceName"))
+                return None
+            fields = {key: value for key, value in fields.items() if key not in ("deviceId", "deviceSn")}
+        device_id = str(device_id)
+        
+        row = self._devices_by_id.get(device_id)
+        if row is None:
+            row = self._devices_by_id[device_id] = {}
+            self._data_dirty = True
+        elif device_id in self._pushed_ids and "lastStatusCmd" in fields:
+            # Le status:report reçu en direct est plus récent que celui de la liste
+            fields = {key: value for key, value in fields.items() if key != "lastStatusCmd"}
+        row.update(fields)
+        
+        device_name = row.get("deviceName")
+        if device_name:
+            self._id_by_name[device_name] = device_id
+        status = self._decode_status(device_id, row.get("lastStatusCmd"))
+        if status is not None:
+            self._status_by_id[device_id] = status
+        else:
+            self._status_by_id.pop(device_id, None)
+        return device_id
+
+    def _remove_device(self, device_id: str) -> None:
+        """Drop a row of the device table."""
+        row = self._devices_by_id.pop(device_id)
+        self._status_by_id.pop(device_id, None)
+        self._status_cache.pop(device_id, None)
+        self._pushed_ids.discard(device_id)
+        self.history.forget(device_id)
+        if self._id_by_name.get(row.get("deviceName")) == device_id:
+            del self._id_by_name[row["deviceName"]]
+        self._data_dirty = True
+
+    @callback
+    def async_apply_device_list(self, mqtt_devices: list[dict]) -> None:
+        """Apply an MQTT user:device:list to the device table.
+        
+        Listed devices are merged into their rows (API metadata is kept), devices
+        no longer listed are dropped.
+        """
+        if not mqtt_devices:
+            _LOGGER.warning("MQTT device list is empty")
+            return
+        
+        listed = set()
+        for mqtt_device in mqtt_devices:
+            device_id = self._upsert_device(mqtt_device)
+            if device_id is None:
+                continue
+            listed.add(device_id)
+            # Métadonnées API de la dernière requête, pour un appareil qui vient d'apparaître
+            api_metadata = self._api_metadata_by_name.get(mqtt_device.get("deviceName"))
+            if api_metadata:
+                self._devices_by_id[device_id].update(api_metadata)
+        
+        for device_id in self._devices_by_id.keys() - listed:
+            _LOGGER.debug("Device %s no longer in the MQTT device list", device_id)
+            self._remove_device(device_id)
+        
+        self._mqtt_list_received = True
+        _LOGGER.debug("✅ Device table updated from MQTT list: %d device(s)", len(self._devices_by_id))
+        self._async_publish()
+
+    def _apply_api_devices(self, api_devices: list[dict]) -> None:
+        """Merge the devices returned by the REST API into the device table."""
+        self._api_metadata_by_name = {
+            api_device["deviceName"]: {key: api_device.get(key) for key in API_DEVICE_METADATA}
+            for api_device in api_devices
+            if api_device.get("deviceName")
+        }
+        for api_device in api_devices:
+            device_name = api_device.get("deviceName")
+            if self._mqtt_list_received:
+                # La liste MQTT fait foi: n'ajouter que les métadonnées API
+                device_id = self._id_by_name.get(device_name)
+                if device_id is not None:
+                    self._devices_by_id[device_id].update(self._api_metadata_by_name[device_name])
+                continue
+            self._upsert_device(api_device)
+
+    async def async_load_cache(self) -> bool:
+        """Restore the devices saved by a previous run.
+        
+        Returns True if cached devices were published as coordinator data.
+        """
+        stored = await self._store.async_load()
+        devices = stored.get("devices") if stored else None
+        if not devices:
+            return False
+        
+        for device in devices:
+            self._upsert_device(device)
+        
+        self.api.restore_device_topics(devices)
+        self.async_set_updated_data(self._build_data())
+        return True
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the device table to disk (debounced)."""
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_store(self) -> dict:
+        """Return the data to persist: merged devices with topics and lastStatusCmd."""
+        return {"devices": list(self._devices_by_id.values())}
+
+    def _decode_status(self, device_id: str, last_status: dict | None) -> DeviceStatus | None:
+        """Decode a lastStatusCmd once; reuse the snapshot while the payload is unchanged."""
+        if not last_status:
+            self._status_cache.pop(device_id, None)
+            return None
+        cached = self._status_cache.get(device_id)
+        if cached is not None and cached[0] is last_status:
+            return cached[1]
+        status = DeviceStatus.from_payload(last_status)
+        self._status_cache[device_id] = (last_status, status)
+        return status
+
+    def user_info(self) -> dict:
+        """Return the account information last fetched from the API."""
+        return dict(self._user_info)
+
+    def timing_stats(self) -> dict:
+        """Return the refresh and status report counters (for diagnostics)."""
+        return {
+            "update_count": self._update_count,
+            "last_update_duration": self._last_update_duration,
+            "last_update_success": self.last_update_success,
+            "update_interval": self.update_interval.total_seconds() if self.update_interval else None,
+            "status_reports_received": self._reports_received,
+            "status_reports_applied": self._reports_applied,
+            "status_reports_pending": len(self._pending_reports),
+            "flush_window": self._flush_window,
+        }
+
     async def _async_update_data(self):
         """Update data via library."""
+        update_start = time.monotonic()
+        try:
+            return await self._async_fetch_data()
+        finally:
+            self._update_count += 1
+            self._last_update_duration = round(time.monotonic() - update_start, 4)
+
+    async def _async_fetch_data(self):
+        """Refresh the device table from the REST API."""
         try:
             _LOGGER.debug("=== COORDINATOR UPDATE START ===")
             
@@ -133,21 +721,29 @@ class ThermoMavenDataUpdateCoordinator(DataUpdateCoordinator):
             if should_fetch_api:
                 _LOGGER.debug("📡 Fetching fresh API data (last fetch: %s)", 
                            getattr(self, '_last_api_fetch', 'never'))
-                devices = await self.api.async_get_devices()
-                user_info = await self.api.async_get_user_info()
+                # Requêtes indépendantes en parallèle: la latence = l'appel le plus lent
+                devices, user_info = await asyncio.gather(
+                    self.api.async_get_devices(),
+                    self.api.async_get_user_info(),
+                    return_exceptions=True,
+                )
+                if isinstance(devices, Exception):
+                    raise devices
+                if isinstance(user_info, Exception):
+                    _LOGGER.warning("Failed to fetch user info: %s", user_info)
+                else:
+                    self._user_info = user_info
+                    self._data_dirty = True
                 self._last_api_fetch = current_time
-                self._api_devices = devices  # Stocker les données API
-                _LOGGER.debug("API devices: %s", [{"name": d.get("deviceName"), "id": d.get("deviceId")} for d in devices] if devices else [])
+                self._apply_api_devices(devices)
             else:
                 _LOGGER.debug("🔄 Using cached API data (last fetch: %s ago)", 
                            int(current_time - self._last_api_fetch))
-                devices = getattr(self, '_api_devices', [])
-                user_info = {}  # Pas besoin de user_info pour les mises à jour de température
             
-            # If no devices are returned and MQTT client exists, trigger a sync
+            # If no devices are known and MQTT client exists, trigger a sync
             # Limited to prevent API spam if thermometer is offline
             # IMPORTANT: Ne sync que si on n'a JAMAIS eu de devices (premier démarrage)
-            if not devices and self.api.mqtt_client and not hasattr(self, '_ever_had_devices'):
+            if not self._devices_by_id and self.api.mqtt_client and not hasattr(self, '_ever_had_devices'):
                 if self._auto_sync_attempts < self._max_auto_sync_attempts:
                     self._auto_sync_attempts += 1
                     _LOGGER.debug(
@@ -161,243 +757,15 @@ class ThermoMavenDataUpdateCoordinator(DataUpdateCoordinator):
                         "Max auto-sync attempts reached. Use 'thermomaven.sync_devices' service to retry manually."
                     )
             
-            # Utiliser les données précédentes si disponibles
-            if hasattr(self, 'data') and self.data:
-                previous_devices = self.data.get("devices", [])
-            else:
-                previous_devices = []
-            
-            # Enrichir les données API avec le cache si deviceId est manquant
-            if devices and self._merged_devices_cache:
-                _LOGGER.debug("🔍 Checking for devices with missing deviceId...")
-                for device in devices:
-                    if not device.get("deviceId") or device.get("deviceId") == "None":
-                        device_name = device.get("deviceName")
-                        if device_name and device_name in self._merged_devices_cache:
-                            cached_device = self._merged_devices_cache[device_name]
-                            device["deviceId"] = cached_device.get("deviceId")
-                            device["deviceSn"] = cached_device.get("deviceSn")
-                            _LOGGER.debug("✅ Restored deviceId from cache for: %s (ID: %s)", 
-                                       device_name, device.get("deviceId"))
-                        else:
-                            _LOGGER.warning("⚠️ No cache found for device: %s", device_name)
-            
-            # Fusionner les données API et MQTT en utilisant deviceName comme clé
-            if self.api._latest_mqtt_data:
-                mqtt_data = self.api._latest_mqtt_data
-                _LOGGER.debug("=== FUSION API + MQTT DATA ===")
-                _LOGGER.debug("MQTT cmdType: %s", mqtt_data.get("cmdType"))
-                
-                if mqtt_data.get("cmdType") == "user:device:list":
-                    mqtt_devices = mqtt_data.get("cmdData", {}).get("devices", [])
-                    _LOGGER.debug("MQTT device list: %d devices", len(mqtt_devices))
-                    _LOGGER.debug("MQTT devices: %s", [{"name": d.get("deviceName"), "id": d.get("deviceId")} for d in mqtt_devices] if mqtt_devices else [])
-                    
-                    if mqtt_devices:
-                        # Fusionner les données API et MQTT
-                        merged_devices = []
-                        
-                        # Créer un dictionnaire des appareils API par nom
-                        api_devices_by_name = {}
-                        for api_device in devices:
-                            device_name = api_device.get("deviceName")
-                            if device_name:
-                                api_devices_by_name[device_name] = api_device
-                        
-                        _LOGGER.debug("API devices by name: %s", list(api_devices_by_name.keys()))
-                        
-                        # Fusionner chaque appareil MQTT avec les données API correspondantes
-                        for mqtt_device in mqtt_devices:
-                            device_name = mqtt_device.get("deviceName")
-                            _LOGGER.debug("Processing MQTT device: %s", device_name)
-                            
-                            # Commencer avec les données MQTT (plus complètes)
-                            merged_device = mqtt_device.copy()
-                            
-                            # Ajouter les données API si disponibles
-                            if device_name in api_devices_by_name:
-                                api_device = api_devices_by_name[device_name]
-                                _LOGGER.debug("✅ Found matching API device for: %s", device_name)
-                                
-                                # Ajouter les métadonnées API manquantes
-                                merged_device.update({
-                                    "deviceShareId": api_device.get("deviceShareId"),
-                                    "fromUserName": api_device.get("fromUserName"),
-                                    "shareStatus": api_device.get("shareStatus"),
-                                })
-                                
-                                _LOGGER.debug("Merged device: %s (ID: %s, ShareID: %s, has lastStatusCmd: %s)", 
-                                            device_name, 
-                                            merged_device.get("deviceId"),
-                                            merged_device.get("deviceShareId"),
-                                            "lastStatusCmd" in merged_device)
-                            else:
-                                _LOGGER.debug("⚠️ No matching API device found for: %s", device_name)
-                            
-                            merged_devices.append(merged_device)
-                            
-                            # Sauvegarder dans le cache (par nom ET par ID)
-                            if device_name:
-                                self._merged_devices_cache[device_name] = merged_device
-                            device_id = merged_device.get("deviceId")
-                            if device_id:
-                                self._merged_devices_cache[str(device_id)] = merged_device
-                        
-                        _LOGGER.debug("✅ Fusion complete: %d merged devices", len(merged_devices))
-                        _LOGGER.debug("Merged devices: %s", [{"name": d.get("deviceName"), "id": d.get("deviceId")} for d in merged_devices])
-                        _LOGGER.debug("💾 Cached %d device mappings", len(self._merged_devices_cache))
-                        devices = merged_devices
-                    else:
-                        _LOGGER.warning("MQTT device list is empty")
-                        
-                elif "status:report" in mqtt_data.get("cmdType", ""):
-                    # Mettre à jour les données de température des appareils existants
-                    device_id = mqtt_data.get("deviceId")
-                    _LOGGER.debug("=== PROCESSING TEMPERATURE UPDATE ===")
-                    _LOGGER.debug("Status report for device ID: %s", device_id)
-                    _LOGGER.debug("Current devices: %d, Previous devices: %d", 
-                                len(devices) if devices else 0, len(previous_devices))
-                    
-                    # Utiliser les appareils précédents si l'API n'en retourne pas
-                    if not devices and previous_devices:
-                        devices = previous_devices
-                        _LOGGER.debug("Using previous device list: %d devices", len(devices))
-                    
-                    if device_id and devices:
-                        device_found = False
-                        for device in devices:
-                            device_device_id = str(device.get("deviceId"))
-                            if device_device_id == str(device_id):
-                                # Mettre à jour les données de température
-                                device["lastStatusCmd"] = mqtt_data
-                                
-                                # Extraire les données de température pour debug
-                                cmd_data = mqtt_data.get("cmdData", {})
-                                probes = cmd_data.get("probes", [])
-                                temp_str = "N/A"
-                                if probes:
-                                    probe_data = probes[0]
-                                    temp_raw = probe_data.get("curTemperature")
-                                    if temp_raw:
-                                        temp_f = temp_raw / 10.0
-                                        temp_c = (temp_f - 32) * 5/9
-                                        temp_str = f"{temp_f}°F ({round(temp_c, 1)}°C)"
-                                
-                                _LOGGER.debug("✅ Temperature updated: %s = %s", device.get("deviceName"), temp_str)
-                                device_found = True
-                                break
-                        
-                        if not device_found:
-                            _LOGGER.warning("❌ Device ID %s not found in device list", device_id)
-                            _LOGGER.debug("Available device IDs: %s", [str(d.get("deviceId")) for d in devices])
-                            
-                            # Ne créer un nouveau device que si nécessaire
-                            # D'abord vérifier si le device avec ce deviceId existe déjà
-                            # (peut avoir été restauré depuis le cache)
-                            device_exists_with_valid_id = any(
-                                str(d.get("deviceId")) == str(device_id) and 
-                                d.get("deviceId") not in [None, "None"]
-                                for d in devices
-                            )
-                            
-                            if device_exists_with_valid_id:
-                                _LOGGER.debug("ℹ️ Device %s already exists with valid ID, skipping creation", device_id)
-                                # Juste mettre à jour le lastStatusCmd du device existant
-                                for device in devices:
-                                    if str(device.get("deviceId")) == str(device_id):
-                                        device["lastStatusCmd"] = mqtt_data
-                                        _LOGGER.debug("✅ Updated existing device with temperature data")
-                                        break
-                            else:
-                                # Essayer de trouver l'appareil dans le cache d'abord
-                                cached_device = self._merged_devices_cache.get(str(device_id))
-                                
-                                if cached_device:
-                                    _LOGGER.debug("💾 Found device in cache by ID: %s", device_id)
-                                    merged_device = cached_device.copy()
-                                    merged_device["lastStatusCmd"] = mqtt_data
-                                else:
-                                    # Essayer de fusionner avec un appareil API existant par nom
-                                    device_name = None
-                                    api_device = None
-                                    for api_dev in getattr(self, '_api_devices', []):
-                                        if api_dev.get("deviceName"):
-                                            device_name = api_dev.get("deviceName")
-                                            api_device = api_dev
-                                            break
-                                    
-                                    if device_name and api_device:
-                                        _LOGGER.debug("🔧 Creating merged device with API name: %s", device_name)
-                                        merged_device = {
-                                            "deviceId": device_id,
-                                            "deviceName": device_name,
-                                            "deviceModel": mqtt_data.get("deviceModel", "Unknown"),
-                                            "deviceSn": mqtt_data.get("deviceSn"),
-                                            "lastStatusCmd": mqtt_data,
-                                            "deviceShareId": api_device.get("deviceShareId"),
-                                            "fromUserName": api_device.get("fromUserName"),
-                                            "shareStatus": api_device.get("shareStatus"),
-                                        }
-                                    else:
-                                        _LOGGER.debug("🔧 Creating device from MQTT data only")
-                                        merged_device = {
-                                            "deviceId": device_id,
-                                            "deviceName": f"ThermoMaven Device {device_id}",
-                                            "deviceModel": mqtt_data.get("deviceModel", "Unknown"),
-                                            "deviceSn": mqtt_data.get("deviceSn"),
-                                            "lastStatusCmd": mqtt_data
-                                        }
-                                    
-                                    # Sauvegarder dans le cache
-                                    if device_name:
-                                        self._merged_devices_cache[device_name] = merged_device
-                                    self._merged_devices_cache[str(device_id)] = merged_device
-                                
-                                devices.append(merged_device)
-                                _LOGGER.debug("✅ Created/Updated merged device: %s (ID: %s)", 
-                                             merged_device.get("deviceName"), merged_device.get("deviceId"))
-                    else:
-                        _LOGGER.warning("❌ Cannot update device %s: device_id=%s, devices=%s", 
-                                       device_id, device_id, len(devices) if devices else 0)
-            
-            # Si on n'a pas de données d'appareils mais qu'on en avait avant, les conserver
-            if not devices and previous_devices:
-                devices = previous_devices
-                _LOGGER.debug("No new device data, keeping previous: %d devices", len(devices))
-            
-            # Dédupliquer les appareils (par deviceId)
-            if devices:
-                seen_ids = set()
-                unique_devices = []
-                for device in devices:
-                    device_id = str(device.get("deviceId"))
-                    if device_id not in seen_ids:
-                        seen_ids.add(device_id)
-                        unique_devices.append(device)
-                    else:
-                        _LOGGER.debug("🔄 Skipping duplicate device: %s (ID: %s)", 
-                                     device.get("deviceName"), device_id)
-                
-                if len(unique_devices) != len(devices):
-                    _LOGGER.debug("🧹 Deduplicated: %d → %d devices", len(devices), len(unique_devices))
-                    devices = unique_devices
-            
-            _LOGGER.debug("=== FINAL: %d device(s) with lastStatusCmd: %s ===", 
-                        len(devices) if devices else 0,
-                        [bool(d.get("lastStatusCmd")) for d in devices] if devices else [])
-            
             # Reset auto-sync counter if devices are found
-            if devices:
+            if self._devices_by_id:
                 self._auto_sync_attempts = 0
                 self._ever_had_devices = True  # Marquer qu'on a déjà eu des devices
+                if should_fetch_api:
+                    self._async_schedule_save()
             
-            result = {
-                "devices": devices,
-                "user_info": user_info,
-            }
-            
-            _LOGGER.debug("=== COORDINATOR UPDATE COMPLETE ===")
-            return result
+            _LOGGER.debug("=== COORDINATOR UPDATE COMPLETE: %d device(s) ===", len(self._devices_by_id))
+            return self._build_data()
         except Exception as err:
             raise UpdateFailed(f"Error communicating with API: {err}")
 
@@ -0,0 +1,126 @@
+"""MQTT client certificate cache for ThermoMaven."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import timezone
+import logging
+import os
+import ssl
+import tempfile
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.serialization import pkcs12
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, MQTT_CERT_RENEW_MARGIN, STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def decode_p12(p12_data: bytes, password: str) -> dict:
+    """Decode a PKCS#12 bundle into PEM material (blocking, run in executor).
+
+    Returns a dict with `cert_pem`, `key_pem` (str) and `not_after` (epoch seconds).
+    """
+    private_key, certificate, _ = pkcs12.load_key_and_certificates(
+        p12_data, password.encode()
+    )
+    not_after = getattr(certificate, "not_valid_after_utc", None)
+    if not_after is None:  # cryptography < 42
+        not_after = certificate.not_valid_after.replace(tzinfo=timezone.utc)
+
+    return {
+        "cert_pem": certificate.public_bytes(serialization.Encoding.PEM).decode(),
+        "key_pem": private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ).decode(),
+        "not_after": not_after.timestamp(),
+    }
+
+
+@contextmanager
+def _pem_path(pem: str) -> Iterator[str]:
+    """Expose PEM data through a path for OpenSSL, without leaving it on disk.
+
+    Uses an anonymous memory file (memfd) on Linux; elsewhere a private temp
+    file that is removed as soon as OpenSSL has read it.
+    """
+    data = pem.encode()
+    if hasattr(os, "memfd_create"):
+        fd = os.memfd_create("thermomaven-mqtt", os.MFD_CLOEXEC)
+        try:
+            os.write(fd, data)
+            yield f"/proc/self/fd/{fd}"
+        finally:
+            os.close(fd)
+        return
+
+    fd, path = tempfile.mkstemp(suffix=".pem")  # 0600
+    try:
+        os.write(fd, data)
+        os.close(fd)
+        yield path
+    finally:
+        os.unlink(path)
+
+
+def build_ssl_context(material: dict) -> ssl.SSLContext:
+    """Build the MQTT TLS client context from in-memory PEM material (blocking)."""
+    context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.maximum_version = ssl.TLSVersion.TLSv1_2
+    with _pem_path(material["cert_pem"] + material["key_pem"]) as path:
+        context.load_cert_chain(path)
+    return context
+
+
+class ThermoMavenCertificateCache:
+    """Persist MQTT client certificates, keyed by clientId, in HA's private storage."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the cache."""
+        self._store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.mqtt_certificate", private=True
+        )
+        self._certificates: dict[str, dict] | None = None
+
+    async def _async_certificates(self) -> dict[str, dict]:
+        """Load the cached certificates once."""
+        if self._certificates is None:
+            stored = await self._store.async_load()
+            self._certificates = (stored or {}).get("certificates", {})
+        return self._certificates
+
+    async def async_get_valid(self) -> dict | None:
+        """Return the cached certificate furthest from expiry, if not about to expire."""
+        certificates = await self._async_certificates()
+        if not certificates:
+            return None
+        material = max(certificates.values(), key=lambda cert: cert["not_after"])
+        if material["not_after"] - time.time() < MQTT_CERT_RENEW_MARGIN:
+            _LOGGER.debug("Cached MQTT certificate %s expires soon, re-provisioning",
+                          material["client_id"])
+            return None
+        return material
+
+    async def async_save(self, material: dict) -> None:
+        """Store a freshly provisioned certificate (replaces older ones)."""
+        self._certificates = {material["client_id"]: material}
+        await self._store.async_save({"certificates": self._certificates})
+
+    async def async_invalidate(self, client_id: str) -> None:
+        """Forget a certificate rejected by the broker."""
+        certificates = await self._async_certificates()
+        if certificates.pop(client_id, None) is not None:
+            await self._store.async_save({"certificates": certificates})
+
+    async def async_remove(self) -> None:
+        """Delete the cache file."""
+        self._certificates = None
+        await self._store.async_remove()
@@ -10,12 +10,22 @@ from homeassistant.components.climate import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTemperature, ATTR_TEMPERATURE
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers import entity_registry
 
-from .const import DOMAIN, DEVICE_MODELS
+from .const import (
+    DOMAIN,
+    DEVICE_MODELS,
+    PROBE_ACTION_SET,
+    PROBE_ACTION_START,
+    PROBE_ACTION_STOP,
+    PROBE_MAX_TEMP_F,
+    PROBE_MIN_TEMP_F,
+)
+from .entity import ThermoMavenEntity
+from .models import ProbeStatus
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,50 +55,60 @@ async def async_setup_entry(
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
     api = hass.data[DOMAIN][entry.entry_id]["api"]
     
-    # Wait for coordinator data
-    if not coordinator.data or not coordinator.data.get("devices"):
-        _LOGGER.debug("⏳ Waiting for coordinator data...")
-        await asyncio.sleep(2)
-        
-        if not coordinator.data or not coordinator.data.get("devices"):
-            _LOGGER.error("❌ No devices after waiting")
-            return
+    # Sans appareil au démarrage, le listener ci-dessous crée les entités à leur arrivée
+    devices = (coordinator.data or {}).get("devices") or []
+    if not devices:
+        _LOGGER.warning("⚠️ No devices found after first refresh, waiting for the device list")
+    else:
+        _LOGGER.debug("✅ Coordinator has %d device(s), proceeding with climate setup", len(devices))
     
-    _LOGGER.debug("✅ Coordinator has %d device(s), proceeding with climate setup", 
-                 len(coordinator.data.get("devices", [])))
+    known_devices: set[str] = set()  # Appareils dont les entités existent déjà
     
-    entities_to_add = []
-    devices = coordinator.data.get("devices", [])
+    @callback
+    def async_add_new_devices() -> list[ClimateEntity]:
+        """Create the climate entities of devices not materialised yet."""
+        devices_by_id = (coordinator.data or {}).get("devices_by_id", {})
+        new_ids = devices_by_id.keys() - known_devices
+        if not new_ids:
+            return []
+        
+        entities = []
+        for device_id in new_ids:
+            device = devices_by_id[device_id]
+            _LOGGER.debug("➕ Adding climate entities for device: %s (%s)", device.get("deviceName"), device_id)
+            entities.extend(_create_device_climates(coordinator, api, device, entry.entry_id))
+            known_devices.add(device_id)
+        
+        _LOGGER.debug("🌡️ Adding %d climate entities", len(entities))
+        async_add_entities(entities, update_before_add=False)
+        return entities
     
-    for device in devices:
-        device_id = str(device.get("deviceId"))
-        
-        if not device_id or device_id == "None":
-            _LOGGER.warning("Skipping device with invalid deviceId: %s", device.get("deviceName"))
-            continue
-        
-        device_model = device.get("deviceModel", "Unknown")
-        num_probes = _get_num_probes(device_model)
-        
-        _LOGGER.debug("➕ Adding climate entities for device: %s (%s)", device.get("deviceName"), device_id)
-        
-        # Add climate entity for each probe
-        for probe_num in range(1, num_probes + 1):
-            entities_to_add.append(
-                ThermoMavenClimate(
-                    coordinator, api, device, probe_num, entry.entry_id
-                )
-            )
+    entities = async_add_new_devices()
     
-    if entities_to_add:
-        _LOGGER.debug("🌡️ Adding %d climate entities", len(entities_to_add))
-        async_add_entities(entities_to_add, update_before_add=False)
-    else:
-        _LOGGER.warning("⚠️ No climate entities to add")
+    # Même règle que les capteurs: ne retirer que les entités climate qui ne
+    # seront plus créées, et rien tant que la liste d'appareils est vide
+    wanted = {entity.unique_id for entity in entities}
+    registry = entity_registry.async_get(hass)
+    for registry_entry in entity_registry.async_entries_for_config_entry(registry, entry.entry_id):
+        if devices and registry_entry.domain == "climate" and registry_entry.unique_id not in wanted:
+            _LOGGER.debug("🗑️ Removing stale entity %s", registry_entry.entity_id)
+            registry.async_remove(registry_entry.entity_id)
+    
+    # Nouveaux appareils: diff des deviceId connus à chaque mise à jour du coordinator
+    entry.async_on_unload(coordinator.async_add_listener(async_add_new_devices))
     
     _LOGGER.debug("✅ Climate setup complete")
 
 
+def _create_device_climates(coordinator, api, device: dict, entry_id: str) -> list[ClimateEntity]:
+    """Create one climate entity per probe of a device."""
+    num_probes = _get_num_probes(device.get("deviceModel", "Unknown"))
+    return [
+        ThermoMavenClimate(coordinator, api, device, probe_num, entry_id)
+        for probe_num in range(1, num_probes + 1)
+    ]
+
+
 def _get_num_probes(device_model: str) -> int:
     """Get number of probes for a device model."""
     probe_counts = {
@@ -102,7 +122,7 @@ def _get_num_probes(device_model: str) -> int:
     return probe_counts.get(device_model, 1)
 
 
-class ThermoMavenClimate(CoordinatorEntity, ClimateEntity):
+class ThermoMavenClimate(ThermoMavenEntity, ClimateEntity):
     """Representation of a ThermoMaven Climate entity."""
 
     _attr_has_entity_name = True
@@ -115,8 +135,8 @@ class ThermoMavenClimate(CoordinatorEntity, ClimateEntity):
         ClimateEntityFeature.TURN_OFF
     )
     _attr_preset_modes = PRESET_MODES
-    _attr_min_temp = 32  # 0°C
-    _attr_max_temp = 572  # 300°C
+    _attr_min_temp = PROBE_MIN_TEMP_F
+    _attr_max_temp = PROBE_MAX_TEMP_F
     _attr_target_temperature_step = 1
 
     def __init__(self, coordinator, api, device, probe_num, entry_id):
@@ -127,8 +147,10 @@ class ThermoMavenClimate(CoordinatorEntity, ClimateEntity):
         self._probe_num = probe_num
         self._entry_id = entry_id
         self._target_temperature_override = None  # Cache local pour la température cible
+        self._command_task = None  # Commande en attente de confirmation par l'appareil
+        self._device_id = str(device.get("deviceId"))
         
-        device_id = str(device.get("deviceId"))
+        device_id = self._device_id
         device_name = device.get("deviceName", "ThermoMaven")
         device_model = device.get("deviceModel", "Unknown")
         
@@ -153,29 +175,8 @@ class ThermoMavenClimate(CoordinatorEntity, ClimateEntity):
     @property
     def current_temperature(self) -> float | None:
         """Return the current temperature."""
-        if not self.coordinator.data:
-            return None
-        
-        devices = self.coordinator.data.get("devices", [])
-        device_id = str(self._device.get("deviceId"))
-        
-        for device in devices:
-            if str(device.get("deviceId")) == device_id:
-                last_status = device.get("lastStatusCmd")
-                if not last_status:
-                    return None
-                
-                cmd_data = last_status.get("cmdData", {})
-                probes = cmd_data.get("probes", [])
-                
-                if self._probe_num <= len(probes):
-                    probe_data = probes[self._probe_num - 1]
-                    cur_temp = probe_data.get("curTemperature")
-                    if cur_temp is not None:
-                        # Temperature is in tenths of degrees F
-                        return cur_temp / 10.0
-        
-        return None
+        probe = self._get_probe_status()
+        return probe.temperature_f if probe else None
 
     @property
     def target_temperature(self) -> float | None:
@@ -185,37 +186,11 @@ class ThermoMavenClimate(CoordinatorEntity, ClimateEntity):
             return self._target_temperature_override
         
         # Sinon, lire depuis les données du coordinator
-        if not self.coordinator.data:
+        probe = self._get_probe_status()
+        if probe is None or probe.target_temperature_f is None:
             return None
         
-        devices = self.coordinator.data.get("devices", [])
-        device_id = str(self._device.get("deviceId"))
-        
-        for device in devices:
-            if str(device.get("deviceId")) == device_id:
-                last_status = device.get("lastStatusCmd")
-                if not last_status:
-                    return None
-                
-                cmd_data = last_status.get("cmdData", {})
-                probes = cmd_data.get("probes", [])
-                
-                if self._probe_num <= len(probes):
-                    probe_data = probes[self._probe_num - 1]
-                    set_params = probe_data.get("setParams", [])
-                    
-                    if set_params and len(set_params) > 0:
-                        set_temp = set_params[0].get("setTemperature")
-                        if set_temp is not None:
-                            # Temperature is in tenths of degrees F
-                            temp_from_device = set_temp / 10.0
-                            # Si la température de l'appareil correspond à notre override, effacer l'override
-                            if self._target_temperature_override is not None and abs(temp_from_device - self._target_temperature_override) < 0.5:
-                                _LOGGER.debug("Temperature confirmed by device, clearing override")
-                                self._target_temperature_override = None
-                            return temp_from_device
-        
-        return None
+        return probe.target_temperature_f
 
     @property
     def hvac_mode(self) -> HVACMode:
@@ -243,28 +218,17 @@ class ThermoMavenClimate(CoordinatorEntity, ClimateEntity):
         
         return None
 
+    def _get_probe_status(self) -> ProbeStatus | None:
+        """Get the decoded status snapshot for this probe."""
+        status = self.coordinator.get_status(self._device_id)
+        if status is None:
+            return None
+        return status.probe(self._probe_num)
+
     def _get_cooking_state(self) -> str | None:
         """Get the cooking state for this probe."""
-        if not self.coordinator.data:
-            return None
-        
-        devices = self.coordinator.data.get("devices", [])
-        device_id = str(self._device.get("deviceId"))
-        
-        for device in devices:
-            if str(device.get("deviceId")) == device_id:
-                last_status = device.get("lastStatusCmd")
-                if not last_status:
-                    return None
-                
-                cmd_data = last_status.get("cmdData", {})
-                probes = cmd_data.get("probes", [])
-                
-                if self._probe_num <= len(probes):
-                    probe_data = probes[self._probe_num - 1]
-                    return probe_data.get("cookingState")
-        
-        return None
+        probe = self._get_probe_status()
+        return probe.cooking_state if probe else None
 
     async def async_set_temperature(self, **kwargs) -> None:
         """Set new target temperature."""
@@ -279,36 +243,13 @@ class ThermoMavenClimate(CoordinatorEntity, ClimateEntity):
         # Forcer la mise à jour de l'interface
         self.async_write_ha_state()
         
-        # Get probe color (bright/dark)
-        probe_color = self._get_probe_color()
-        
-        # Convert temperature to tenths
-        temp_tenths = int(temperature * 10)
-        
-        # Send command via MQTT
-        success = await self._api.async_set_probe_temperature(
-            device_id=str(self._device.get("deviceId")),
-            device_type=self._device.get("deviceModel", "WT02"),
-            probe_color=probe_color,
-            target_temperature=temp_tenths
-        )
-        
-        if success:
-            _LOGGER.debug("✅ Temperature command sent successfully - waiting for MQTT confirmation")
-            # Pas besoin de forcer un refresh, l'appareil va répondre via MQTT automatiquement
-            # Le _on_mqtt_message va déclencher le refresh quand le status:report arrive
-        else:
-            _LOGGER.error("❌ Failed to send temperature command")
-            # Annuler l'override si la commande a échoué
-            self._target_temperature_override = None
-            self.async_write_ha_state()
+        # Send command via MQTT, l'override est effacé dès confirmation (ou échec) de l'appareil
+        self._async_send_command(PROBE_ACTION_SET, temperature)
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set new HVAC mode."""
         _LOGGER.debug("Setting HVAC mode to %s for probe %d", hvac_mode, self._probe_num)
         
-        probe_color = self._get_probe_color()
-        
         # Map HVAC mode to cooking action
         if hvac_mode == HVACMode.HEAT:
             # Start cooking avec la température cible actuelle
@@ -316,23 +257,65 @@ class ThermoMavenClimate(CoordinatorEntity, ClimateEntity):
             self._target_temperature_override = target_temp  # Sauvegarder l'override
             self.async_write_ha_state()
             
-            await self._api.async_start_cooking(
-                device_id=str(self._device.get("deviceId")),
-                device_type=self._device.get("deviceModel", "WT02"),
-                probe_color=probe_color,
-                target_temperature=int(target_temp * 10)
-            )
+            self._async_send_command(PROBE_ACTION_START, target_temp)
         elif hvac_mode == HVACMode.OFF:
-            # Stop cooking
-            await self._api.async_stop_cooking(
-                device_id=str(self._device.get("deviceId")),
-                device_type=self._device.get("deviceModel", "WT02"),
-                probe_color=probe_color
-            )
+            # Stop cooking: la cible affichée redevient celle de l'appareil
+            if self._target_temperature_override is not None:
+                self._target_temperature_override = None
+                self.async_write_ha_state()
+            self._async_send_command(PROBE_ACTION_STOP)
         
         # Pas besoin de forcer un refresh, MQTT va mettre à jour automatiquement
         _LOGGER.debug("HVAC mode command sent - waiting for MQTT confirmation")
 
+    @callback
+    def _async_send_command(self, action: str, temperature: float | None = None) -> None:
+        """Send a probe command in the background and track its confirmation."""
+        if self._command_task is not None and not self._command_task.done():
+            self._command_task.cancel()
+        self._command_task = self.hass.async_create_task(
+            self._async_run_command(action, temperature)
+        )
+
+    async def _async_run_command(self, action: str, temperature: float | None) -> None:
+        """Send a probe command and clear the target override once it is settled.
+        
+        The override is cleared however the command ends (confirmed, failed or
+        cancelled), unless a newer command has taken over this entity.
+        """
+        settled = False
+        try:
+            confirmed = await self._api.async_send_confirmed_probe_command(
+                device_id=self._device_id,
+                device_type=self._device.get("deviceModel", "WT02"),
+                probe_num=self._probe_num,
+                action=action,
+                target_temperature=int(temperature * 10) if temperature is not None else None,
+            )
+            settled = True
+            
+            if confirmed:
+                _LOGGER.debug("✅ %s command confirmed for probe %d", action, self._probe_num)
+            else:
+                _LOGGER.error("❌ %s command failed for probe %d", action, self._probe_num)
+        finally:
+            # Confirmée: la valeur vient maintenant de l'appareil; échouée: revenir à la valeur réelle
+            superseded = self._command_task is not asyncio.current_task()
+            if (
+                not superseded
+                and temperature is not None
+                and self._target_temperature_override == temperature
+            ):
+                self._target_temperature_override = None
+                if settled:
+                    self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel a command still waiting for confirmation."""
+        if self._command_task is not None and not self._command_task.done():
+            self._command_task.cancel()
+        await super().async_will_remove_from_hass()
+
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set new preset mode."""
         _LOGGER.debug("Setting preset mode to %s for probe %d", preset_mode, self._probe_num)
@@ -352,9 +335,3 @@ class ThermoMavenClimate(CoordinatorEntity, ClimateEntity):
     async def async_turn_off(self) -> None:
         """Turn the entity off."""
         await self.async_set_hvac_mode(HVACMode.OFF)
-
-    def _get_probe_color(self) -> str:
-        """Get probe color (bright/dark) based on probe number."""
-        # Odd numbered probes are "bright", even are "dark"
-        return "bright" if self._probe_num % 2 == 1 else "dark"
-
@@ -10,6 +10,12 @@ DEFAULT_APP_ID = "ap4060eff28137181bd"
 API_BASE_URL_COM = "https://api.iot.thermomaven.com"
 API_BASE_URL_DE = "https://api-de.iot.thermomaven.com"
 
+# Timeout (seconds) applied to each REST call individually
+API_REQUEST_TIMEOUT = 10
+
+# Sharing metadata only the REST device lists provide
+API_DEVICE_METADATA = ("deviceShareId", "fromUserName", "shareStatus")
+
 # Supported countries
 COUNTRIES = {
     "AT": "Austria",
@@ -58,6 +64,61 @@ MQTT_BROKERS = {
 }
 MQTT_PORT = 8883
 
+# MQTT network loop: driven by the HA event loop (asyncio) or by paho's own thread
+MQTT_MODE_ASYNCIO = "asyncio"
+MQTT_MODE_THREAD = "thread"
+MQTT_RECONNECT_MAX_DELAY = 60  # secondes
+
+# MQTT message types (cmdType); status reports are prefixed with the device model
+MQTT_CMD_DEVICE_LIST = "user:device:list"
+MQTT_CMD_STATUS_REPORT = "status:report"
+
+# Recent raw MQTT messages kept per cmdType, and 1 payload in N logged at debug level
+MQTT_TRACE_SIZE = 20
+MQTT_TRACE_SAMPLE_RATE = 50
+
+# Hot-path latency stages, from MQTT receive to entity state write
+LATENCY_STAGE_DECODE = "decode"  # json.loads du payload
+LATENCY_STAGE_DISPATCH = "dispatch"  # handler MQTT -> coordinator (saut vers la boucle HA)
+LATENCY_STAGE_MERGE = "merge"  # fusion du rapport dans la table des appareils
+LATENCY_STAGE_FANOUT = "fanout"  # appel des listeners de l'appareil (écritures d'état comprises)
+LATENCY_STAGE_STATE_WRITE = "state_write"  # async_write_ha_state d'une entité
+LATENCY_STAGES = (
+    LATENCY_STAGE_DECODE,
+    LATENCY_STAGE_DISPATCH,
+    LATENCY_STAGE_MERGE,
+    LATENCY_STAGE_FANOUT,
+    LATENCY_STAGE_STATE_WRITE,
+)
+# Upper bounds of the histogram buckets (milliseconds), plus one overflow bucket
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+LATENCY_SENSOR_INTERVAL = 60  # secondes
+
+# Probe control actions (WT:probe:control cookingAction)
+PROBE_ACTION_START = "start"
+PROBE_ACTION_STOP = "stop"
+PROBE_ACTION_SET = "set"
+PROBE_ACTIONS = {
+    PROBE_ACTION_START: 1,
+    PROBE_ACTION_STOP: 2,  # stop/pause
+    PROBE_ACTION_SET: 3,  # modify settings
+}
+PROBE_COLORS = ["bright", "dark"]
+# Target temperature range accepted by the probes (°F)
+PROBE_MIN_TEMP_F = 32  # 0°C
+PROBE_MAX_TEMP_F = 572  # 300°C
+
+# Seconds to wait for the broker acknowledgement of a command burst
+PUBLISH_ACK_TIMEOUT = 5
+
+# Seconds to wait for a status:report confirming a probe command, and retries
+COMMAND_CONFIRM_TIMEOUT = 10
+COMMAND_MAX_RETRIES = 2
+COMMAND_RETRY_BASE_DELAY = 1  # doublé à chaque nouvel essai
+
+# Re-provision the MQTT client certificate this long (seconds) before it expires
+MQTT_CERT_RENEW_MARGIN = 7 * 24 * 3600
+
 # Device models
 DEVICE_MODELS = {
     "WT02": "ThermoMaven P2",
@@ -71,3 +132,37 @@ DEVICE_MODELS = {
 # Configuration keys
 CONF_REGION = "region"
 
+# Minimum interval (seconds) between two state flushes of the same device;
+# status reports received in between are merged
+STATUS_FLUSH_WINDOW = 0.25
+
+# Minimum interval (seconds) between two device list syncs triggered by
+# status reports of unknown devices
+UNKNOWN_DEVICE_SYNC_COOLDOWN = 60
+
+# In-memory temperature history per probe (samples, trend window in seconds,
+# exponential smoothing factor)
+HISTORY_SIZE = 720
+HISTORY_RATE_WINDOW = 300
+HISTORY_SMOOTHING = 0.2
+
+# Time-to-target estimate: fit memory (seconds) and z-score of the confidence band
+ETA_FIT_TIME_CONSTANT = 600
+ETA_CONFIDENCE_Z = 1.96
+
+# Cook session recorder: area channels stored per probe, seconds between file writes
+SESSION_AREAS = 5
+SESSION_FLUSH_INTERVAL = 30
+SESSION_MAX_FILES = 200  # fichiers gardés par entrée, les plus anciens sont supprimés
+SESSION_MAX_AGE = 365 * 86400  # secondes
+
+# Cloud cooking history sync (/app/history/page)
+HISTORY_PAGE_SIZE = 20
+HISTORY_SYNC_INTERVAL = 6 * 3600  # secondes
+
+# Persistent device cache (warm restarts)
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10  # secondes, regroupe les écritures disque
+RECONCILE_RETRY_DELAY = 30  # secondes, première relance du cloud après un démarrage à chaud
+RECONCILE_RETRY_MAX_DELAY = 900  # secondes
+
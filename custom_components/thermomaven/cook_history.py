@@ -0,0 +1,165 @@
+"""Local SQLite index of the ThermoMaven cloud cooking history."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, HISTORY_PAGE_SIZE
+from .thermomaven_api import ThermoMavenAPI
+
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS cook_history (
+        record_id TEXT PRIMARY KEY,
+        device_id TEXT,
+        started_at INTEGER,
+        payload TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS cook_history_device_date ON cook_history (device_id, started_at)",
+    "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+
+def _record_id(record: dict) -> str | None:
+    """Return the identifier of a cloud history record."""
+    for key in ("historyId", "id", "cookUuid"):
+        if record.get(key) is not None:
+            return str(record[key])
+    return None
+
+
+def _record_start(record: dict) -> int | None:
+    """Return the start date of a cloud history record, as sent by the cloud."""
+    for key in ("startTime", "cookStartTime", "createTime"):
+        if record.get(key) is not None:
+            try:
+                return int(record[key])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class CookHistoryStore:
+    """SQLite store of cloud cook sessions, indexed by device and date.
+
+    Every method except the async ones is blocking and runs in the executor,
+    each with its own short-lived connection.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.path = hass.config.path(DOMAIN, f"{entry_id}_history.db")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating it if needed."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        return connection
+
+    def add_page(self, records: list[dict]) -> tuple[int, bool]:
+        """Insert the new records of a page (newest first).
+
+        Returns (new records, known record reached). Records after the first
+        known one are still inserted, which keeps an interrupted sync gapless.
+        """
+        new = []
+        reached_known = False
+        with self._connect() as connection:
+            for record in records:
+                record_id = _record_id(record)
+                if record_id is None:
+                    continue
+                if connection.execute(
+                    "SELECT 1 FROM cook_history WHERE record_id = ?", (record_id,)
+                ).fetchone():
+                    reached_known = True
+                    continue
+                new.append((
+                    record_id,
+                    str(record["deviceId"]) if record.get("deviceId") is not None else None,
+                    _record_start(record),
+                    json.dumps(record, separators=(",", ":"), ensure_ascii=False),
+                ))
+            connection.executemany(
+                "INSERT OR IGNORE INTO cook_history VALUES (?, ?, ?, ?)", new
+            )
+        connection.close()
+        return len(new), reached_known
+
+    def is_complete(self) -> bool:
+        """Return True once the whole cloud history has been stored at least once."""
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT value FROM sync_state WHERE key = 'complete'"
+            ).fetchone()
+        finally:
+            connection.close()
+        return row is not None and row[0] == "1"
+
+    def mark_complete(self) -> None:
+        """Record that the oldest page has been reached."""
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES ('complete', '1')"
+            )
+        connection.close()
+
+    def sessions(self, device_id: str, since: int | None = None, limit: int = 50) -> list[dict]:
+        """Return the stored sessions of a device, newest first."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT payload FROM cook_history WHERE device_id = ? AND started_at >= ? "
+                "ORDER BY started_at DESC LIMIT ?",
+                (device_id, since or 0, limit),
+            ).fetchall()
+        connection.close()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def remove(self) -> None:
+        """Delete the database file."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def async_sync(self, api: ThermoMavenAPI) -> int:
+        """Fetch only the history pages newer than the last stored record.
+        
+        Until a first sync has reached the oldest page (e.g. it was interrupted),
+        known records do not stop the paging, so no gap is left behind. A failed
+        page request raises, and the history is then not marked complete.
+        """
+        if api.token is None:
+            _LOGGER.debug("Not logged in, cooking history sync skipped")
+            return 0
+        complete = await self.hass.async_add_executor_job(self.is_complete)
+        total = 0
+        reached_known = False
+        last_page = None
+        pages = api.async_iter_history(HISTORY_PAGE_SIZE)
+        try:
+            async for records in pages:
+                last_page = records
+                if not records:
+                    continue  # Page vide terminale: tout l'historique est lu
+                added, reached_known = await self.hass.async_add_executor_job(
+                    self.add_page, records
+                )
+                total += added
+                if reached_known and complete:
+                    break  # Le reste de l'historique est déjà local
+            else:
+                # Complet seulement si la dernière page est réellement courte (ou vide)
+                if not complete and last_page is not None and len(last_page) < HISTORY_PAGE_SIZE:
+                    await self.hass.async_add_executor_job(self.mark_complete)
+        finally:
+            await pages.aclose()
+        _LOGGER.debug("📚 Cooking history sync: %d new session(s)", total)
+        return total
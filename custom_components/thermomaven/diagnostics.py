@@ -0,0 +1,69 @@
+"""Diagnostics support for ThermoMaven."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+# Identifiants du compte et des appareils: masqués partout (config, table, messages bruts).
+# Les topics MQTT contiennent l'identifiant du compte ou de l'appareil
+TO_REDACT = {
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    "app_key",
+    "userId",
+    "userName",
+    "accountName",
+    "nickName",
+    "nickname",
+    "avatar",
+    "phone",
+    "fromUserName",
+    "subTopics",
+    "pubTopics",
+    "topic",
+    "deviceSn",
+    "token",
+    "p12Password",
+    "p12Url",
+    "clientId",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    api = entry_data["api"]
+    coordinator = entry_data["coordinator"]
+
+    return async_redact_data(
+        {
+            "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+            "mqtt": {
+                **api.mqtt_status(),
+                "message_counts": api.message_trace.counts(),
+            },
+            "coordinator": coordinator.timing_stats(),
+            "latency_ms": api.latency.as_dict(),
+            "devices": list((coordinator.data or {}).get("devices_by_id", {}).values()),
+            "pending_commands": [
+                {
+                    "device_id": device_id,
+                    "probe": probe_num,
+                    "action": command.action,
+                    "target_temperature": command.target_temperature,
+                }
+                for (device_id, probe_num), command in api.pending_commands().items()
+            ],
+            "user_info": coordinator.user_info(),
+            "recent_messages": api.message_trace.dump(),
+        },
+        TO_REDACT,
+    )
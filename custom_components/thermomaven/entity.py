@@ -0,0 +1,34 @@
+"""Base entity for ThermoMaven."""
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import LATENCY_STAGE_STATE_WRITE
+
+
+class ThermoMavenEntity(CoordinatorEntity):
+    """Coordinator entity that also receives per-device MQTT push updates.
+
+    Subclasses must set `self._device_id` (str) in their constructor.
+    """
+
+    _device_id: str
+
+    async def async_added_to_hass(self) -> None:
+        """Register for push updates of this entity's device."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_device_listener(
+                self._device_id, self._handle_coordinator_update
+            )
+        )
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state to the state machine, timing the write."""
+        write_start = time.perf_counter()
+        super().async_write_ha_state()
+        self.coordinator.latency.record(
+            LATENCY_STAGE_STATE_WRITE, time.perf_counter() - write_start
+        )
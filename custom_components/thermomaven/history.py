@@ -0,0 +1,259 @@
+"""Rolling in-memory temperature history for ThermoMaven probes."""
+from __future__ import annotations
+
+from array import array
+import math
+
+from .const import (
+    ETA_CONFIDENCE_Z,
+    ETA_FIT_TIME_CONSTANT,
+    HISTORY_RATE_WINDOW,
+    HISTORY_SIZE,
+    HISTORY_SMOOTHING,
+)
+
+# Les températures sont stockées brutes (dixièmes de °F) sur 16 bits
+_NO_VALUE = -32768
+
+
+class RingBuffer:
+    """Fixed-size ring buffer of (timestamp, raw temperature) samples, O(1) append.
+
+    Least-squares sums of the samples within the last `rate_window` seconds are
+    kept up to date on each append, so `rate()` does not rescan the buffer.
+    """
+
+    __slots__ = (
+        "_times", "_values", "_size", "_next", "_count",
+        "_rate_window", "_start", "_in_window", "_origin", "_sx", "_sy", "_sxx", "_sxy",
+    )
+
+    def __init__(self, size: int = HISTORY_SIZE, rate_window: float = HISTORY_RATE_WINDOW) -> None:
+        """Initialize an empty buffer."""
+        self._times = array("d", bytes(8 * size))
+        self._values = array("h", [_NO_VALUE]) * size
+        self._size = size
+        self._next = 0
+        self._count = 0
+        self._rate_window = rate_window
+        # Fenêtre de pente: index du plus ancien échantillon et nombre d'échantillons
+        self._start = 0
+        self._in_window = 0
+        self._origin = 0.0  # x = timestamp - origin, recalé à chaque tour du buffer
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return self._count
+
+    def append(self, timestamp: float, raw: int) -> None:
+        """Add a sample, overwriting the oldest one when full."""
+        raw = max(-32767, min(32767, raw))
+        if self._in_window == self._size:
+            # L'échantillon écrasé est encore dans la fenêtre
+            self._drop_oldest()
+        if not self._count:
+            self._origin = timestamp
+        index = self._next
+        self._times[index] = timestamp
+        self._values[index] = raw
+        self._next = (index + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+        if not self._in_window:
+            self._start = index
+        self._in_window += 1
+        x = timestamp - self._origin
+        self._sx += x
+        self._sy += raw
+        self._sxx += x * x
+        self._sxy += x * raw
+        since = timestamp - self._rate_window
+        while self._times[self._start] < since:
+            self._drop_oldest()
+        if not self._next:
+            self._rebase()
+
+    def _drop_oldest(self) -> None:
+        """Remove the oldest sample of the rate window from the sums."""
+        x = self._times[self._start] - self._origin
+        raw = self._values[self._start]
+        self._sx -= x
+        self._sy -= raw
+        self._sxx -= x * x
+        self._sxy -= x * raw
+        self._start = (self._start + 1) % self._size
+        self._in_window -= 1
+
+    def _rebase(self) -> None:
+        """Recompute the sums from the oldest windowed sample.
+
+        Runs once per turn of the buffer: keeps x small and drops the rounding
+        error accumulated by the additions and subtractions.
+        """
+        self._origin = self._times[self._start]
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+        for offset in range(self._in_window):
+            index = (self._start + offset) % self._size
+            x = self._times[index] - self._origin
+            raw = self._values[index]
+            self._sx += x
+            self._sy += raw
+            self._sxx += x * x
+            self._sxy += x * raw
+
+    def rate(self) -> float | None:
+        """Least-squares slope over the rate window, in raw units per second."""
+        count = self._in_window
+        if count < 2:
+            return None
+        sxx = self._sxx - self._sx * self._sx / count
+        # Timestamps tous égaux: seul l'arrondi rend sxx non nul
+        if sxx <= 1e-9 * self._sxx:
+            return None
+        return (self._sxy - self._sx * self._sy / count) / sxx
+
+
+class TimeToTargetEstimator:
+    """Exponentially weighted linear fit of temperature over time, updated in O(1).
+
+    Only running weighted sums are kept; older samples fade out with the time
+    constant ETA_FIT_TIME_CONSTANT instead of being refitted.
+    """
+
+    __slots__ = ("_origin", "_last_t", "_last_y", "_w", "_wx", "_wy", "_wxx", "_wxy", "_wyy")
+
+    def __init__(self) -> None:
+        """Initialize an empty fit."""
+        self._origin: float | None = None
+        self._last_t = 0.0
+        self._last_y = 0.0
+        self._w = self._wx = self._wy = self._wxx = self._wxy = self._wyy = 0.0
+
+    def update(self, timestamp: float, raw: int) -> None:
+        """Add a sample (raw tenths of °F)."""
+        if self._origin is None:
+            self._origin = timestamp
+        x = timestamp - self._origin
+        decay = math.exp(-(x - self._last_t) / ETA_FIT_TIME_CONSTANT) if self._w else 1.0
+        self._w = self._w * decay + 1.0
+        self._wx = self._wx * decay + x
+        self._wy = self._wy * decay + raw
+        self._wxx = self._wxx * decay + x * x
+        self._wxy = self._wxy * decay + x * raw
+        self._wyy = self._wyy * decay + raw * raw
+        self._last_t = x
+        self._last_y = raw
+
+    def _fit(self) -> tuple[float, float, float] | None:
+        """Return (slope, intercept, slope standard error) of the weighted fit."""
+        sxx = self._wxx - self._wx * self._wx / self._w if self._w else 0.0
+        if self._w < 3 or sxx <= 0:
+            return None
+        sxy = self._wxy - self._wx * self._wy / self._w
+        syy = self._wyy - self._wy * self._wy / self._w
+        slope = sxy / sxx
+        intercept = (self._wy - slope * self._wx) / self._w
+        residual = max(syy - slope * sxy, 0.0) / (self._w - 2)
+        return slope, intercept, math.sqrt(residual / sxx)
+
+    def eta(self, target_raw: int) -> tuple[float, float, float | None] | None:
+        """Return (eta, eta_low, eta_high) in seconds to reach a target (raw tenths of °F).
+
+        `eta_high` is None when the pessimistic slope does not reach the target.
+        """
+        if self._last_y >= target_raw:
+            return 0.0, 0.0, 0.0
+        fit = self._fit()
+        if fit is None:
+            return None
+        slope, intercept, slope_err = fit
+        if slope <= 0:
+            return None
+        current = intercept + slope * self._last_t
+        remaining = target_raw - current
+        if remaining <= 0:
+            return 0.0, 0.0, 0.0
+        fast = slope + ETA_CONFIDENCE_Z * slope_err
+        slow = slope - ETA_CONFIDENCE_Z * slope_err
+        return remaining / slope, remaining / fast, remaining / slow if slow > 0 else None
+
+
+class ProbeHistory:
+    """History of one probe: tip temperature, each area, and a smoothed value."""
+
+    __slots__ = ("_size", "temperature", "areas", "smoothed", "estimator")
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        """Initialize the buffers."""
+        self._size = size
+        self.temperature = RingBuffer(size)
+        self.areas: list[RingBuffer] = []
+        self.smoothed: float | None = None  # moyenne exponentielle, dixièmes de °F
+        self.estimator = TimeToTargetEstimator()
+
+    def record(self, timestamp: float, raw: int | None, areas: list | tuple) -> None:
+        """Record one probe sample from a status report."""
+        if raw is not None:
+            self.temperature.append(timestamp, raw)
+            self.estimator.update(timestamp, raw)
+            self.smoothed = raw if self.smoothed is None else (
+                self.smoothed + HISTORY_SMOOTHING * (raw - self.smoothed)
+            )
+        while len(self.areas) < len(areas):
+            self.areas.append(RingBuffer(self._size))
+        for buffer, area_raw in zip(self.areas, areas):
+            if area_raw is not None:
+                buffer.append(timestamp, area_raw)
+
+    def smoothed_c(self) -> float | None:
+        """Return the smoothed tip temperature in °C."""
+        if self.smoothed is None:
+            return None
+        return round((self.smoothed / 10.0 - 32) * 5 / 9, 1)
+
+    def rate_c_per_min(self) -> float | None:
+        """Return the tip temperature trend in °C per minute."""
+        return _raw_rate_to_c_per_min(self.temperature.rate())
+
+    def area_rates_c_per_min(self) -> list[float | None]:
+        """Return the trend of each area in °C per minute."""
+        return [_raw_rate_to_c_per_min(area.rate()) for area in self.areas]
+
+
+def _raw_rate_to_c_per_min(rate: float | None) -> float | None:
+    """Convert tenths of °F per second to °C per minute."""
+    if rate is None:
+        return None
+    return round(rate / 10 * 5 / 9 * 60, 2)
+
+
+class TemperatureHistory:
+    """Per-device, per-probe rolling history fed by MQTT status reports."""
+
+    def __init__(self, size: int = HISTORY_SIZE) -> None:
+        """Initialize."""
+        self._size = size
+        self._probes: dict[tuple[str, int], ProbeHistory] = {}
+
+    def record(self, device_id: str, timestamp: float, report: dict) -> None:
+        """Append every probe of a raw status report."""
+        probes = (report.get("cmdData") or {}).get("probes") or ()
+        for index, probe in enumerate(probes, start=1):
+            history = self._probes.get((device_id, index))
+            if history is None:
+                history = self._probes[(device_id, index)] = ProbeHistory(self._size)
+            history.record(
+                timestamp, probe.get("curTemperature"), probe.get("areaTemperature") or ()
+            )
+
+    def probe(self, device_id: str, probe_num: int) -> ProbeHistory | None:
+        """Return the history of a probe (1-based)."""
+        return self._probes.get((device_id, probe_num))
+
+    def forget(self, device_id: str) -> None:
+        """Drop the history of a device."""
+        for key in [key for key in self._probes if key[0] == device_id]:
+            del self._probes[key]
+
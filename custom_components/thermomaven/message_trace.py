@@ -0,0 +1,86 @@
+"""Lazy debug formatting and recent raw MQTT messages for ThermoMaven."""
+from __future__ import annotations
+
+from collections import deque
+import json
+import logging
+import time
+
+from .const import MQTT_TRACE_SAMPLE_RATE, MQTT_TRACE_SIZE
+
+
+class LazyJSON:
+    """Log argument serialized only if the record is actually emitted.
+
+    Use as `_LOGGER.debug("...: %s", LazyJSON(data))`: with debug off the
+    logging module drops the record before calling `__str__`.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data) -> None:
+        """Wrap the data to format."""
+        self._data = data
+
+    def __str__(self) -> str:
+        """Pretty-print the data."""
+        return json.dumps(self._data, indent=2, default=str, ensure_ascii=False)
+
+
+class MessageTrace:
+    """Keep the last raw payloads of each cmdType, and sample some to the debug log.
+
+    Payloads are stored as received (bytes): nothing is decoded or serialized
+    until `dump` is called.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        size: int = MQTT_TRACE_SIZE,
+        sample_rate: int = MQTT_TRACE_SAMPLE_RATE,
+    ) -> None:
+        """Initialize the trace."""
+        self._logger = logger
+        self._size = size
+        self._sample_rate = sample_rate
+        self._messages: dict[str, deque] = {}  # cmdType -> (time, topic, payload)
+        self._counts: dict[str, int] = {}
+
+    def record(self, cmd_type: str, topic: str, payload: bytes, data: dict) -> None:
+        """Remember a raw message; log its decoded payload once every `sample_rate`."""
+        messages = self._messages.get(cmd_type)
+        if messages is None:
+            messages = self._messages[cmd_type] = deque(maxlen=self._size)
+        messages.append((time.time(), topic, payload))
+
+        count = self._counts.get(cmd_type, 0)
+        self._counts[cmd_type] = count + 1
+        if count % self._sample_rate == 0 and self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug(
+                "MQTT payload sample (%s #%d): %s", cmd_type, count + 1, LazyJSON(data)
+            )
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of messages received per cmdType."""
+        return dict(self._counts)
+
+    def dump(self, cmd_type: str | None = None) -> dict[str, list[dict]]:
+        """Decode the recent messages, oldest first (on demand, e.g. diagnostics)."""
+        cmd_types = [cmd_type] if cmd_type is not None else list(self._messages)
+        dumped = {}
+        for name in cmd_types:
+            entries = []
+            for received, topic, payload in self._messages.get(name, ()):
+                try:
+                    decoded = json.loads(payload)
+                except ValueError:
+                    decoded = payload.decode("utf-8", "replace")
+                entries.append({"received": received, "topic": topic, "payload": decoded})
+            dumped[name] = entries
+        return dumped
+
+    def clear(self) -> None:
+        """Forget every recorded message."""
+        self._messages.clear()
+        self._counts.clear()
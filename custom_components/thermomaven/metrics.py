@@ -0,0 +1,73 @@
+"""Fixed-bucket latency histograms for the ThermoMaven hot path."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+
+from .const import LATENCY_BUCKETS_MS, LATENCY_STAGES
+
+
+class LatencyHistogram:
+    """Latency histogram with fixed buckets: O(log buckets) record, constant memory."""
+
+    __slots__ = ("_bounds", "_counts", "count", "total", "max")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        """Initialize empty buckets (the last one counts values above every bound)."""
+        self._bounds = bounds
+        self._counts = array("Q", bytes(8 * (len(bounds) + 1)))
+        self.count = 0
+        self.total = 0.0  # millisecondes
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add a duration measured with time.perf_counter()."""
+        ms = seconds * 1000
+        self._counts[bisect_left(self._bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the upper bound of the bucket holding a percentile (0 < fraction <= 1)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                # Le seau de débordement n'a pas de borne: prendre le maximum observé
+                return self._bounds[index] if index < len(self._bounds) else round(self.max, 3)
+        return round(self.max, 3)
+
+    def as_dict(self) -> dict:
+        """Return the summary and the bucket counts, in milliseconds."""
+        buckets = {f"le_{bound}": count for bound, count in zip(self._bounds, self._counts)}
+        buckets["inf"] = self._counts[-1]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": round(self.max, 3),
+            "buckets": buckets,
+        }
+
+
+class LatencyStats:
+    """One histogram per hot-path stage."""
+
+    def __init__(self) -> None:
+        """Initialize the histograms."""
+        self.histograms = {stage: LatencyHistogram() for stage in LATENCY_STAGES}
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add a duration to a stage."""
+        self.histograms[stage].record(seconds)
+
+    def as_dict(self) -> dict[str, dict]:
+        """Return every stage summary (for diagnostics)."""
+        return {stage: histogram.as_dict() for stage, histogram in self.histograms.items()}
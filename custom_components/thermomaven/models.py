@@ -0,0 +1,146 @@
+"""Typed snapshots and helpers for ThermoMaven MQTT status reports."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+
+from .const import PROBE_ACTION_START, PROBE_ACTION_STOP
+
+
+def tenths_f_to_c(raw: int | None) -> float | None:
+    """Convert a raw temperature (tenths of °F) to °C rounded to 0.1."""
+    if raw is None:
+        return None
+    return round((raw / 10.0 - 32) * 5 / 9, 1)
+
+
+def tenths_f_to_f(raw: int | None) -> float | None:
+    """Convert a raw temperature (tenths of °F) to °F."""
+    if raw is None:
+        return None
+    return raw / 10.0
+
+
+def merge_status_reports(older: dict, newer: dict) -> dict:
+    """Merge two status reports of one device, newer fields winning.
+
+    `cmdData` is merged key by key and `probes` entry by entry, so a report
+    carrying only part of the fields does not erase the previous values.
+    """
+    merged = {**older, **newer}
+    old_data = older.get("cmdData") or {}
+    new_data = newer.get("cmdData") or {}
+    cmd_data = {**old_data, **new_data}
+
+    old_probes = old_data.get("probes") or []
+    new_probes = new_data.get("probes") or []
+    if old_probes or new_probes:
+        probes = [
+            {**old_probes[i], **new_probes[i]} if i < len(old_probes) else new_probes[i]
+            for i in range(len(new_probes))
+        ]
+        probes.extend(old_probes[len(new_probes):])
+        cmd_data["probes"] = probes
+
+    merged["cmdData"] = cmd_data
+    return merged
+
+
+@dataclass(slots=True, frozen=True)
+class ProbeStatus:
+    """Decoded state of a single probe."""
+
+    temperature: float | None = None  # °C
+    temperature_f: float | None = None
+    ambient_temperature: float | None = None  # °C
+    target_temperature: float | None = None  # °C
+    target_temperature_f: float | None = None
+    area_temperatures: tuple[float | None, ...] = ()  # °C, pointe -> manche
+    battery_value: int | None = None
+    cooking_state: str | None = None
+    cooking_mode: str | None = None
+    total_cook_sec: int | None = None
+    cur_cook_sec: int | None = None
+    remaining_cook_sec: int | None = None
+
+    @classmethod
+    def from_payload(cls, probe: dict) -> ProbeStatus:
+        """Build a probe snapshot from a raw `probes[n]` entry."""
+        set_params = probe.get("setParams") or []
+        set_temp = set_params[0].get("setTemperature") if set_params else None
+        cur_temp = probe.get("curTemperature")
+        return cls(
+            temperature=tenths_f_to_c(cur_temp),
+            temperature_f=tenths_f_to_f(cur_temp),
+            ambient_temperature=tenths_f_to_c(probe.get("curAmbientTemperature")),
+            target_temperature=tenths_f_to_c(set_temp),
+            target_temperature_f=tenths_f_to_f(set_temp),
+            area_temperatures=tuple(
+                tenths_f_to_c(raw) for raw in probe.get("areaTemperature") or ()
+            ),
+            battery_value=probe.get("batteryValue"),
+            cooking_state=probe.get("cookingState"),
+            cooking_mode=probe.get("cookingMode"),
+            total_cook_sec=probe.get("totalCookSec"),
+            cur_cook_sec=probe.get("curCookSec"),
+            remaining_cook_sec=probe.get("curRemainedSec"),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class DeviceStatus:
+    """Decoded `status:report` for one device."""
+
+    global_status: str = "unknown"
+    connect_status: str = "unknown"
+    battery_value: int | None = None
+    battery_status: str = "unknown"
+    wifi_rssi: int | None = None
+    probes: tuple[ProbeStatus, ...] = ()
+
+    @property
+    def online(self) -> bool:
+        """Return True if the device reports itself online."""
+        return self.global_status == "online"
+
+    def probe(self, probe_num: int) -> ProbeStatus | None:
+        """Return the snapshot of a probe (1-based) if reported."""
+        if 0 < probe_num <= len(self.probes):
+            return self.probes[probe_num - 1]
+        return None
+
+    @classmethod
+    def from_payload(cls, status_cmd: dict) -> DeviceStatus:
+        """Build a device snapshot from a raw `lastStatusCmd` / status report."""
+        cmd_data = status_cmd.get("cmdData") or {}
+        return cls(
+            global_status=cmd_data.get("globalStatus", "unknown"),
+            connect_status=cmd_data.get("connectStatus", "unknown"),
+            battery_value=cmd_data.get("batteryValue"),
+            battery_status=cmd_data.get("batteryStatus", "unknown"),
+            wifi_rssi=cmd_data.get("wifiRssi"),
+            probes=tuple(
+                ProbeStatus.from_payload(probe) for probe in cmd_data.get("probes") or ()
+            ),
+        )
+
+
+@dataclass(slots=True)
+class PendingCommand:
+    """A probe control command waiting for the device to report it applied."""
+
+    action: str
+    target_temperature: int | None  # dixièmes de °F
+    future: asyncio.Future
+
+    def matches(self, probe: dict) -> bool:
+        """Return True if a raw `probes[n]` entry reflects this command."""
+        cooking_state = probe.get("cookingState")
+        if self.action == PROBE_ACTION_STOP:
+            return cooking_state is not None and cooking_state != "cooking"
+        set_params = probe.get("setParams") or []
+        set_temp = set_params[0].get("setTemperature") if set_params else None
+        # Même tolérance que l'interface: 0.5°F
+        if set_temp is None or abs(set_temp - self.target_temperature) > 5:
+            return False
+        return self.action != PROBE_ACTION_START or cooking_state == "cooking"
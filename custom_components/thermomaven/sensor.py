@@ -1,5 +1,5 @@
 """Sensor platform for ThermoMaven."""
-import asyncio
+from datetime import timedelta
 import logging
 
 from homeassistant.components.sensor import (
@@ -9,20 +9,31 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
+    EntityCategory,
     UnitOfTemperature,
     UnitOfTime,
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers import entity_registry
 
-from .const import DOMAIN, DEVICE_MODELS
+from .const import DOMAIN, DEVICE_MODELS, LATENCY_SENSOR_INTERVAL, LATENCY_STAGES
+from .entity import ThermoMavenEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# Traduction du statut
+STATUS_TRANSLATION = {
+    "online": "En ligne",
+    "offline": "Hors ligne",
+    "unknown": "Inconnu",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -32,146 +43,135 @@ async def async_setup_entry(
     """Set up ThermoMaven sensors."""
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
     
-    # Attendre que le coordinator ait des données
-    if not coordinator.data or not coordinator.data.get("devices"):
-        _LOGGER.debug("⏳ Waiting for coordinator data...")
-        await asyncio.sleep(2)
-        
-        if not coordinator.data or not coordinator.data.get("devices"):
-            _LOGGER.error("❌ No devices after waiting")
-            return
+    # Sans appareil au démarrage, le listener ci-dessous crée les capteurs à leur arrivée
+    devices = (coordinator.data or {}).get("devices") or []
+    if not devices:
+        _LOGGER.warning("⚠️ No devices found after first refresh, waiting for the device list")
+    else:
+        _LOGGER.debug("✅ Coordinator has %d device(s), proceeding with sensor setup", len(devices))
     
-    _LOGGER.debug("✅ Coordinator has %d device(s), proceeding with sensor setup", 
-                 len(coordinator.data.get("devices", [])))
+    known_devices: set[str] = set()  # Appareils dont les entités existent déjà
+    
+    @callback
+    def async_add_new_devices() -> list[SensorEntity]:
+        """Create the sensors of devices not materialised yet."""
+        devices_by_id = (coordinator.data or {}).get("devices_by_id", {})
+        new_ids = devices_by_id.keys() - known_devices
+        if not new_ids:
+            return []
+        
+        entities = []
+        for device_id in new_ids:
+            device = devices_by_id[device_id]
+            _LOGGER.debug("➕ Adding sensors for device: %s (%s)", device.get("deviceName"), device_id)
+            entities.extend(_create_device_sensors(coordinator, device, entry.entry_id))
+            known_devices.add(device_id)
+        
+        _LOGGER.debug("➕ Adding %d new entities", len(entities))
+        async_add_entities(entities, update_before_add=False)
+        return entities
     
-    # Get entity registry
-    entity_registry_instance = entity_registry.async_get(hass)
+    # Create entities
+    entities = async_add_new_devices()
     
-    # CRITIQUE: Sauvegarder les noms personnalisés avant suppression
-    custom_names = {}
-    existing_entities_to_remove = [
-        entity_id
-        for entity_id, entity in entity_registry_instance.entities.items()
-        if entity.platform == DOMAIN and entity.config_entry_id == entry.entry_id
+    # Capteurs de diagnostic: latence par étape, un jeu par compte
+    latency_entities = [
+        ThermoMavenLatencySensor(coordinator, stage, entry.entry_id) for stage in LATENCY_STAGES
     ]
+    async_add_entities(latency_entities, update_before_add=False)
+    entities.extend(latency_entities)
     
-    if existing_entities_to_remove:
-        _LOGGER.debug("💾 Saving custom names before removing %d old entities", len(existing_entities_to_remove))
-        for entity_id in existing_entities_to_remove:
-            entity = entity_registry_instance.entities.get(entity_id)
-            if entity and entity.name:
-                custom_names[entity_id] = entity.name
-                _LOGGER.debug("Saved custom name: %s -> %s", entity_id, entity.name)
-        
-        _LOGGER.debug("🗑️ Removing %d old entities to force recreation", len(existing_entities_to_remove))
-        for entity_id in existing_entities_to_remove:
-            entity_registry_instance.async_remove(entity_id)
-        # Attendre que la suppression soit effective
-        await asyncio.sleep(0.5)
+    # Retirer du registre uniquement les capteurs qui ne seront plus créés;
+    # les autres (et leurs noms personnalisés) restent intacts. Sans liste
+    # d'appareils, rien ne dit quels capteurs sont périmés: ne rien retirer
+    wanted = {entity.unique_id for entity in entities}
+    registry = entity_registry.async_get(hass)
+    for registry_entry in entity_registry.async_entries_for_config_entry(registry, entry.entry_id):
+        if devices and registry_entry.domain == "sensor" and registry_entry.unique_id not in wanted:
+            _LOGGER.debug("🗑️ Removing stale entity %s", registry_entry.entity_id)
+            registry.async_remove(registry_entry.entity_id)
     
-    entities_to_add = []
+    # Nouveaux appareils: diff des deviceId connus à chaque mise à jour du coordinator
+    entry.async_on_unload(coordinator.async_add_listener(async_add_new_devices))
     
-    async def add_devices():
-        """Add devices."""
-        nonlocal entities_to_add
-        
-        devices = coordinator.data.get("devices", [])
-        _LOGGER.debug("🔍 Adding sensors for %d device(s)", len(devices))
-        
-        if not devices:
-            return
-        
-        for device in devices:
-            device_id = str(device.get("deviceId"))
-            
-            if not device_id or device_id == "None":
-                _LOGGER.warning("Skipping device with invalid deviceId: %s", device.get("deviceName"))
-                continue
-            
-            device_model = device.get("deviceModel", "Unknown")
-            num_probes = _get_num_probes(device_model)
-            
-            _LOGGER.debug("➕ Adding sensors for device: %s (%s)", device.get("deviceName"), device_id)
-            
-            # Add all sensors for this device
-            for probe_num in range(1, num_probes + 1):
-                entities_to_add.append(
-                    ThermoMavenTemperatureSensor(
-                        coordinator, device, probe_num, entry.entry_id
-                    )
-                )
-            
-            entities_to_add.append(
-                ThermoMavenBatterySensor(coordinator, device, entry.entry_id)
-            )
-            
-            for probe_num in range(1, num_probes + 1):
-                entities_to_add.append(
-                    ThermoMavenProbeBatterySensor(
-                        coordinator, device, probe_num, entry.entry_id
-                    )
-                )
-            
-            for area_num in range(1, 6):
-                entities_to_add.append(
-                    ThermoMavenAreaTemperatureSensor(
-                        coordinator, device, area_num, entry.entry_id
-                    )
-                )
-            
-            entities_to_add.append(
-                ThermoMavenAmbientTemperatureSensor(coordinator, device, entry.entry_id)
-            )
-            entities_to_add.append(
-                ThermoMavenTargetTemperatureSensor(coordinator, device, entry.entry_id)
-            )
-            entities_to_add.append(
-                ThermoMavenTotalCookTimeSensor(coordinator, device, entry.entry_id)
-            )
-            entities_to_add.append(
-                ThermoMavenCurrentCookTimeSensor(coordinator, device, entry.entry_id)
-            )
-            entities_to_add.append(
-                ThermoMavenRemainingCookTimeSensor(coordinator, device, entry.entry_id)
+    _LOGGER.debug("✅ Sensor setup complete")
+
+
+def _create_device_sensors(coordinator, device: dict, entry_id: str) -> list[SensorEntity]:
+    """Create all sensors of one device."""
+    entities = []
+    device_model = device.get("deviceModel", "Unknown")
+    num_probes = _get_num_probes(device_model)
+    
+    # Add all sensors for this device
+    for probe_num in range(1, num_probes + 1):
+        entities.append(
+            ThermoMavenTemperatureSensor(
+                coordinator, device, probe_num, entry_id
             )
-            entities_to_add.append(
-                ThermoMavenCookingModeSensor(coordinator, device, entry.entry_id)
+        )
+    
+    for probe_num in range(1, num_probes + 1):
+        entities.append(
+            ThermoMavenTemperatureRateSensor(
+                coordinator, device, probe_num, entry_id
             )
-            entities_to_add.append(
-                ThermoMavenCookingStateSensor(coordinator, device, entry.entry_id)
+        )
+        entities.append(
+            ThermoMavenSmoothedTemperatureSensor(
+                coordinator, device, probe_num, entry_id
             )
-            entities_to_add.append(
-                ThermoMavenWiFiRSSISensor(coordinator, device, entry.entry_id)
+        )
+        entities.append(
+            ThermoMavenTimeToTargetSensor(
+                coordinator, device, probe_num, entry_id
             )
+        )
     
-    # Create entities
-    await add_devices()
+    entities.append(
+        ThermoMavenBatterySensor(coordinator, device, entry_id)
+    )
     
-    if entities_to_add:
-        _LOGGER.debug("➕ Adding %d new entities", len(entities_to_add))
-        async_add_entities(entities_to_add, update_before_add=True)
-        
-        # Restaurer les noms personnalisés si disponibles
-        if custom_names:
-            _LOGGER.debug("🔄 Restoring %d custom names", len(custom_names))
-            await asyncio.sleep(1)  # Attendre que les entités soient créées
-            
-            for entity in entities_to_add:
-                entity_id = f"sensor.{entity.entity_id}"
-                if entity_id in custom_names:
-                    try:
-                        entity_registry_instance.async_update_entity(
-                            entity_id, 
-                            name=custom_names[entity_id]
-                        )
-                        _LOGGER.debug("Restored custom name: %s -> %s", entity_id, custom_names[entity_id])
-                    except Exception as e:
-                        _LOGGER.warning("Failed to restore custom name for %s: %s", entity_id, e)
+    for probe_num in range(1, num_probes + 1):
+        entities.append(
+            ThermoMavenProbeBatterySensor(
+                coordinator, device, probe_num, entry_id
+            )
+        )
     
-    # Register callback for future device additions
-    coordinator.async_add_listener(lambda: hass.async_create_task(add_devices()))
+    for area_num in range(1, 6):
+        entities.append(
+            ThermoMavenAreaTemperatureSensor(
+                coordinator, device, area_num, entry_id
+            )
+        )
     
-    _LOGGER.debug("✅ Sensor setup complete")
+    entities.append(
+        ThermoMavenAmbientTemperatureSensor(coordinator, device, entry_id)
+    )
+    entities.append(
+        ThermoMavenTargetTemperatureSensor(coordinator, device, entry_id)
+    )
+    entities.append(
+        ThermoMavenTotalCookTimeSensor(coordinator, device, entry_id)
+    )
+    entities.append(
+        ThermoMavenCurrentCookTimeSensor(coordinator, device, entry_id)
+    )
+    entities.append(
+        ThermoMavenRemainingCookTimeSensor(coordinator, device, entry_id)
+    )
+    entities.append(
+        ThermoMavenCookingModeSensor(coordinator, device, entry_id)
+    )
+    entities.append(
+        ThermoMavenCookingStateSensor(coordinator, device, entry_id)
+    )
+    entities.append(
+        ThermoMavenWiFiRSSISensor(coordinator, device, entry_id)
+    )
+    
+    return entities
 
 
 def _get_num_probes(model: str) -> int:
@@ -219,7 +219,7 @@ def _create_device_info(device: dict) -> DeviceInfo:
     )
 
 
-class ThermoMavenTemperatureSensor(CoordinatorEntity, SensorEntity):
+class ThermoMavenTemperatureSensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven temperature sensor."""
 
     _attr_device_class = SensorDeviceClass.TEMPERATURE
@@ -231,7 +231,7 @@ class ThermoMavenTemperatureSensor(CoordinatorEntity, SensorEntity):
         super().__init__(coordinator)
         self._device = device
         self._probe_num = probe_num
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -246,87 +246,44 @@ class ThermoMavenTemperatureSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        _LOGGER.debug("Temperature sensor %s looking for device %s", self._attr_name, self._device_id)
-        
-        for device in devices:
-            device_id = str(device.get("deviceId"))
-            _LOGGER.debug("Checking device: %s (ID: %s)", device.get("deviceName"), device_id)
-            
-            if device_id == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                
-                if not last_status:
-                    _LOGGER.warning("❌ %s: No lastStatusCmd in device data!", self._attr_name)
-                    return None
-                
-                cmd_data = last_status.get("cmdData", {})
-                if cmd_data.get("globalStatus") != "online":
-                    return None
-                
-                probes = cmd_data.get("probes", [])
-                if self._probe_num <= len(probes):
-                    probe_data = probes[self._probe_num - 1]
-                    temp_raw = probe_data.get("curTemperature")
-                    
-                    if temp_raw is not None:
-                        temp_f = temp_raw / 10.0
-                        temp_c = (temp_f - 32) * 5/9
-                        result = round(temp_c, 1)
-                        _LOGGER.debug("✅ %s = %s°C", self._attr_name, result)
-                        return result
-        
-        _LOGGER.warning("❌ %s: No data (deviceId: %s, devices: %d)", 
-                       self._attr_name, self._device_id, len(devices))
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is None:
+            _LOGGER.warning("❌ %s: No status data (deviceId: %s)", self._attr_name, self._device_id)
+            return None
+        if not status.online:
+            return None
+        probe = status.probe(self._probe_num)
+        return probe.temperature if probe else None
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
     
     @property
     def extra_state_attributes(self):
         """Return additional state attributes."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    status = cmd_data.get("globalStatus", "unknown")
-                    
-                    # Traduction du statut
-                    status_translation = {
-                        "online": "En ligne",
-                        "offline": "Hors ligne",
-                        "unknown": "Inconnu"
-                    }
-                    
-                    attributes = {
-                        "status": status_translation.get(status, status),
-                        "connection": cmd_data.get("connectStatus", "unknown"),
-                    }
-                    
-                    # Ajouter les infos de la sonde si disponible
-                    probes = cmd_data.get("probes", [])
-                    if self._probe_num <= len(probes):
-                        probe_data = probes[self._probe_num - 1]
-                        attributes["cooking_state"] = probe_data.get("cookingState", "idle")
-                        attributes["probe_battery"] = probe_data.get("batteryValue")
-                    
-                    return attributes
-        return {}
-
-
-class ThermoMavenBatterySensor(CoordinatorEntity, SensorEntity):
+        status = self.coordinator.get_status(self._device_id)
+        if status is None:
+            return {}
+        
+        attributes = {
+            "status": STATUS_TRANSLATION.get(status.global_status, status.global_status),
+            "connection": status.connect_status,
+        }
+        
+        # Ajouter les infos de la sonde si disponible
+        probe = status.probe(self._probe_num)
+        if probe:
+            attributes["cooking_state"] = probe.cooking_state or "idle"
+            attributes["probe_battery"] = probe.battery_value
+        
+        return attributes
+
+
+class ThermoMavenBatterySensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven battery sensor."""
 
     _attr_device_class = SensorDeviceClass.BATTERY
@@ -337,7 +294,7 @@ class ThermoMavenBatterySensor(CoordinatorEntity, SensorEntity):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._device = device
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -352,20 +309,15 @@ class ThermoMavenBatterySensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                # Vérifier si l'appareil est en ligne
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    # Si l'appareil est hors ligne, retourner None
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    return cmd_data.get("batteryValue")
-                # Fallback sur les données statiques
-                return device.get("batteryLevel")
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is not None:
+            # Si l'appareil est hors ligne, retourner None
+            if not status.online:
+                return None
+            return status.battery_value
+        # Fallback sur les données statiques
+        device = self.coordinator.get_device(self._device_id)
+        return device.get("batteryLevel") if device else None
 
     @property
     def available(self) -> bool:
@@ -373,53 +325,32 @@ class ThermoMavenBatterySensor(CoordinatorEntity, SensorEntity):
         # Toujours disponible si le coordinateur fonctionne et que l'appareil existe
         if not self.coordinator.last_update_success:
             return False
-        
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                # L'entité est toujours "disponible", même si l'appareil est offline
-                return True
-        return False
+        # L'entité est toujours "disponible", même si l'appareil est offline
+        return self.coordinator.get_device(self._device_id) is not None
     
     @property
     def extra_state_attributes(self):
         """Return additional state attributes."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    status = cmd_data.get("globalStatus", "unknown")
-                    
-                    # Traduction du statut
-                    status_translation = {
-                        "online": "En ligne",
-                        "offline": "Hors ligne",
-                        "unknown": "Inconnu"
-                    }
-                    
-                    # Get device info for diagnostics
-                    mqtt_device_id = device.get("deviceId")
-                    api_share_id = device.get("deviceShareId")
-                    device_sn = device.get("deviceSn")
-                    
-                    return {
-                        "status": status_translation.get(status, status),
-                        "battery_status": cmd_data.get("batteryStatus", "unknown"),
-                        "connection": cmd_data.get("connectStatus", "unknown"),
-                        "wifi_rssi": cmd_data.get("wifiRssi"),
-                        # Diagnostic info
-                        "mqtt_device_id": mqtt_device_id,
-                        "api_share_id": api_share_id,
-                        "device_serial": device_sn,
-                        "from_user": device.get("fromUserName"),
-                        "share_status": device.get("shareStatus"),
-                    }
-        return {}
-
-
-class ThermoMavenProbeBatterySensor(CoordinatorEntity, SensorEntity):
+        status = self.coordinator.get_status(self._device_id)
+        device = self.coordinator.get_device(self._device_id)
+        if status is None or device is None:
+            return {}
+        
+        return {
+            "status": STATUS_TRANSLATION.get(status.global_status, status.global_status),
+            "battery_status": status.battery_status,
+            "connection": status.connect_status,
+            "wifi_rssi": status.wifi_rssi,
+            # Diagnostic info
+            "mqtt_device_id": device.get("deviceId"),
+            "api_share_id": device.get("deviceShareId"),
+            "device_serial": device.get("deviceSn"),
+            "from_user": device.get("fromUserName"),
+            "share_status": device.get("shareStatus"),
+        }
+
+
+class ThermoMavenProbeBatterySensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven probe battery sensor."""
 
     _attr_device_class = SensorDeviceClass.BATTERY
@@ -431,7 +362,7 @@ class ThermoMavenProbeBatterySensor(CoordinatorEntity, SensorEntity):
         super().__init__(coordinator)
         self._device = device
         self._probe_num = probe_num
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -446,34 +377,21 @@ class ThermoMavenProbeBatterySensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    
-                    probes = cmd_data.get("probes", [])
-                    if self._probe_num <= len(probes):
-                        probe_data = probes[self._probe_num - 1]
-                        return probe_data.get("batteryValue")
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        probe = status.probe(self._probe_num)
+        return probe.battery_value if probe else None
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
 
 
-class ThermoMavenAreaTemperatureSensor(CoordinatorEntity, SensorEntity):
+class ThermoMavenAreaTemperatureSensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven area temperature sensor (tip to handle)."""
 
     _attr_device_class = SensorDeviceClass.TEMPERATURE
@@ -485,7 +403,7 @@ class ThermoMavenAreaTemperatureSensor(CoordinatorEntity, SensorEntity):
         super().__init__(coordinator)
         self._device = device
         self._area_num = area_num
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -501,25 +419,12 @@ class ThermoMavenAreaTemperatureSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    
-                    probes = cmd_data.get("probes", [])
-                    if probes:
-                        probe_data = probes[0]
-                        area_temps = probe_data.get("areaTemperature", [])
-                        if len(area_temps) >= self._area_num:
-                            temp_raw = area_temps[self._area_num - 1]
-                            if temp_raw is not None:
-                                temp_f = temp_raw / 10.0
-                                temp_c = (temp_f - 32) * 5/9
-                                return round(temp_c, 1)
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        probe = status.probe(1)
+        if probe and len(probe.area_temperatures) >= self._area_num:
+            return probe.area_temperatures[self._area_num - 1]
         return None
 
     @property
@@ -527,14 +432,10 @@ class ThermoMavenAreaTemperatureSensor(CoordinatorEntity, SensorEntity):
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
 
 
-class ThermoMavenAmbientTemperatureSensor(CoordinatorEntity, SensorEntity):
+class ThermoMavenAmbientTemperatureSensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven ambient temperature sensor."""
 
     _attr_device_class = SensorDeviceClass.TEMPERATURE
@@ -545,7 +446,7 @@ class ThermoMavenAmbientTemperatureSensor(CoordinatorEntity, SensorEntity):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._device = device
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -560,38 +461,21 @@ class ThermoMavenAmbientTemperatureSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    
-                    probes = cmd_data.get("probes", [])
-                    if probes:
-                        probe_data = probes[0]
-                        temp_raw = probe_data.get("curAmbientTemperature")
-                        if temp_raw is not None:
-                            temp_f = temp_raw / 10.0
-                            temp_c = (temp_f - 32) * 5/9
-                            return round(temp_c, 1)
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        probe = status.probe(1)
+        return probe.ambient_temperature if probe else None
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
 
 
-class ThermoMavenTargetTemperatureSensor(CoordinatorEntity, SensorEntity):
+class ThermoMavenTargetTemperatureSensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven target temperature sensor."""
 
     _attr_device_class = SensorDeviceClass.TEMPERATURE
@@ -602,7 +486,7 @@ class ThermoMavenTargetTemperatureSensor(CoordinatorEntity, SensorEntity):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._device = device
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -617,40 +501,21 @@ class ThermoMavenTargetTemperatureSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    
-                    probes = cmd_data.get("probes", [])
-                    if probes:
-                        probe_data = probes[0]
-                        set_params = probe_data.get("setParams", [])
-                        if set_params:
-                            temp_raw = set_params[0].get("setTemperature")
-                            if temp_raw is not None:
-                                temp_f = temp_raw / 10.0
-                                temp_c = (temp_f - 32) * 5/9
-                                return round(temp_c, 1)
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        probe = status.probe(1)
+        return probe.target_temperature if probe else None
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
 
 
-class ThermoMavenTotalCookTimeSensor(CoordinatorEntity, SensorEntity):
+class ThermoMavenTotalCookTimeSensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven total cook time sensor."""
 
     _attr_device_class = SensorDeviceClass.DURATION
@@ -661,7 +526,7 @@ class ThermoMavenTotalCookTimeSensor(CoordinatorEntity, SensorEntity):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._device = device
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -676,34 +541,21 @@ class ThermoMavenTotalCookTimeSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    
-                    probes = cmd_data.get("probes", [])
-                    if probes:
-                        probe_data = probes[0]
-                        return probe_data.get("totalCookSec")
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        probe = status.probe(1)
+        return probe.total_cook_sec if probe else None
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
 
 
-class ThermoMavenCurrentCookTimeSensor(CoordinatorEntity, SensorEntity):
+class ThermoMavenCurrentCookTimeSensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven current cook time sensor."""
 
     _attr_device_class = SensorDeviceClass.DURATION
@@ -714,7 +566,7 @@ class ThermoMavenCurrentCookTimeSensor(CoordinatorEntity, SensorEntity):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._device = device
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -729,34 +581,21 @@ class ThermoMavenCurrentCookTimeSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    
-                    probes = cmd_data.get("probes", [])
-                    if probes:
-                        probe_data = probes[0]
-                        return probe_data.get("curCookSec")
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        probe = status.probe(1)
+        return probe.cur_cook_sec if probe else None
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
 
 
-class ThermoMavenRemainingCookTimeSensor(CoordinatorEntity, SensorEntity):
+class ThermoMavenRemainingCookTimeSensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven remaining cook time sensor."""
 
     _attr_device_class = SensorDeviceClass.DURATION
@@ -767,7 +606,7 @@ class ThermoMavenRemainingCookTimeSensor(CoordinatorEntity, SensorEntity):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._device = device
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -782,41 +621,28 @@ class ThermoMavenRemainingCookTimeSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    
-                    probes = cmd_data.get("probes", [])
-                    if probes:
-                        probe_data = probes[0]
-                        return probe_data.get("curRemainedSec")
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        probe = status.probe(1)
+        return probe.remaining_cook_sec if probe else None
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
 
 
-class ThermoMavenCookingModeSensor(CoordinatorEntity, SensorEntity):
+class ThermoMavenCookingModeSensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven cooking mode sensor."""
 
     def __init__(self, coordinator, device, entry_id):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._device = device
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -831,41 +657,28 @@ class ThermoMavenCookingModeSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    
-                    probes = cmd_data.get("probes", [])
-                    if probes:
-                        probe_data = probes[0]
-                        return probe_data.get("cookingMode")
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        probe = status.probe(1)
+        return probe.cooking_mode if probe else None
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
 
 
-class ThermoMavenCookingStateSensor(CoordinatorEntity, SensorEntity):
+class ThermoMavenCookingStateSensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven cooking state sensor."""
 
     def __init__(self, coordinator, device, entry_id):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._device = device
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -881,36 +694,22 @@ class ThermoMavenCookingStateSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    
-                    probes = cmd_data.get("probes", [])
-                    if probes:
-                        probe_data = probes[0]
-                        cooking_state = probe_data.get("cookingState")
-                        # Return raw value, translation is handled by Home Assistant
-                        return cooking_state
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        probe = status.probe(1)
+        # Return raw value, translation is handled by Home Assistant
+        return probe.cooking_state if probe else None
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
 
 
-class ThermoMavenWiFiRSSISensor(CoordinatorEntity, SensorEntity):
+class ThermoMavenWiFiRSSISensor(ThermoMavenEntity, SensorEntity):
     """Representation of a ThermoMaven WiFi RSSI sensor."""
 
     _attr_device_class = SensorDeviceClass.SIGNAL_STRENGTH
@@ -921,7 +720,7 @@ class ThermoMavenWiFiRSSISensor(CoordinatorEntity, SensorEntity):
         """Initialize the sensor."""
         super().__init__(coordinator)
         self._device = device
-        self._device_id = device.get("deviceId")
+        self._device_id = str(device.get("deviceId"))
         self._device_name = device.get("deviceName", "ThermoMaven")
         self._device_model = device.get("deviceModel", "Unknown")
         
@@ -936,25 +735,219 @@ class ThermoMavenWiFiRSSISensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                last_status = device.get("lastStatusCmd", {})
-                if last_status:
-                    cmd_data = last_status.get("cmdData", {})
-                    if cmd_data.get("globalStatus") != "online":
-                        return None
-                    return cmd_data.get("wifiRssi")
-        return None
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        return status.wifi_rssi
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         if not self.coordinator.last_update_success:
             return False
-        devices = self.coordinator.data.get("devices", [])
-        for device in devices:
-            if str(device.get("deviceId")) == str(self._device_id):
-                return True
-        return False
+        return self.coordinator.get_device(self._device_id) is not None
+
+
 
+class ThermoMavenTemperatureRateSensor(ThermoMavenEntity, SensorEntity):
+    """Representation of a ThermoMaven probe temperature trend sensor (°C/min)."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "°C/min"
+    _attr_icon = "mdi:thermometer-chevron-up"
+
+    def __init__(self, coordinator, device, probe_num, entry_id):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._device = device
+        self._probe_num = probe_num
+        self._device_id = str(device.get("deviceId"))
+        self._device_name = device.get("deviceName", "ThermoMaven")
+        self._device_model = device.get("deviceModel", "Unknown")
+        
+        self._attr_has_entity_name = True
+        self._attr_name = f"Probe {probe_num} Rate"
+        self._attr_translation_key = f"probe_{probe_num}_rate"
+        self._attr_unique_id = f"{self._device_id}_probe_{probe_num}_rate"
+        
+        # Use helper function to create device info with diagnostic data
+        self._attr_device_info = _create_device_info(device)
+        self._update_rates()
+
+    def _update_rates(self) -> None:
+        """Compute the trends once per update, for the state and the attributes."""
+        history = self.coordinator.history.probe(self._device_id, self._probe_num)
+        if history is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = {}
+            return
+        self._attr_native_value = history.rate_c_per_min()
+        self._attr_extra_state_attributes = {
+            "samples": len(history.temperature),
+            "area_rates": history.area_rates_c_per_min(),
+        }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Refresh the trends, then write the state."""
+        self._update_rates()
+        super()._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        if not self.coordinator.last_update_success:
+            return False
+        return self.coordinator.get_device(self._device_id) is not None
+
+
+class ThermoMavenSmoothedTemperatureSensor(ThermoMavenEntity, SensorEntity):
+    """Representation of a ThermoMaven smoothed probe temperature sensor."""
+
+    _attr_device_class = SensorDeviceClass.TEMPERATURE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+
+    def __init__(self, coordinator, device, probe_num, entry_id):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._device = device
+        self._probe_num = probe_num
+        self._device_id = str(device.get("deviceId"))
+        self._device_name = device.get("deviceName", "ThermoMaven")
+        self._device_model = device.get("deviceModel", "Unknown")
+        
+        self._attr_has_entity_name = True
+        self._attr_name = f"Probe {probe_num} Smoothed"
+        self._attr_translation_key = f"probe_{probe_num}_smoothed"
+        self._attr_unique_id = f"{self._device_id}_probe_{probe_num}_smoothed"
+        
+        # Use helper function to create device info with diagnostic data
+        self._attr_device_info = _create_device_info(device)
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        history = self.coordinator.history.probe(self._device_id, self._probe_num)
+        return history.smoothed_c() if history else None
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        if not self.coordinator.last_update_success:
+            return False
+        return self.coordinator.get_device(self._device_id) is not None
+
+
+class ThermoMavenTimeToTargetSensor(ThermoMavenEntity, SensorEntity):
+    """Representation of a ThermoMaven estimated time-to-target sensor."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+
+    def __init__(self, coordinator, device, probe_num, entry_id):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._device = device
+        self._probe_num = probe_num
+        self._device_id = str(device.get("deviceId"))
+        self._device_name = device.get("deviceName", "ThermoMaven")
+        self._device_model = device.get("deviceModel", "Unknown")
+        
+        self._attr_has_entity_name = True
+        self._attr_name = f"Probe {probe_num} Time to Target"
+        self._attr_translation_key = f"probe_{probe_num}_time_to_target"
+        self._attr_unique_id = f"{self._device_id}_probe_{probe_num}_time_to_target"
+        
+        # Use helper function to create device info with diagnostic data
+        self._attr_device_info = _create_device_info(device)
+
+    def _estimate(self):
+        """Return (eta, eta_low, eta_high) for this probe's target, if any."""
+        status = self.coordinator.get_status(self._device_id)
+        if status is None or not status.online:
+            return None
+        probe = status.probe(self._probe_num)
+        history = self.coordinator.history.probe(self._device_id, self._probe_num)
+        if probe is None or probe.target_temperature_f is None or history is None:
+            return None
+        return history.estimator.eta(round(probe.target_temperature_f * 10))
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        estimate = self._estimate()
+        return round(estimate[0]) if estimate else None
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        if not self.coordinator.last_update_success:
+            return False
+        return self.coordinator.get_device(self._device_id) is not None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the confidence band of the estimate."""
+        estimate = self._estimate()
+        if estimate is None:
+            return {}
+        _, eta_low, eta_high = estimate
+        return {
+            "eta_low": round(eta_low),
+            "eta_high": round(eta_high) if eta_high is not None else None,
+        }
+
+
+class ThermoMavenLatencySensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor: p99 latency of one hot-path stage (MQTT receive to state write)."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+
+    def __init__(self, coordinator, stage, entry_id):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._histogram = coordinator.latency.histograms[stage]
+        
+        self._attr_has_entity_name = True
+        self._attr_name = f"Latency {stage.replace('_', ' ')}"
+        self._attr_translation_key = f"latency_{stage}"
+        self._attr_unique_id = f"{entry_id}_latency_{stage}"
+        
+        # Un appareil "service" par compte, pas par thermomètre
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry_id)},
+            name="ThermoMaven",
+            manufacturer="ThermoMaven",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Refresh periodically: the histograms change with every MQTT message."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass,
+                self._async_refresh,
+                timedelta(seconds=LATENCY_SENSOR_INTERVAL),
+            )
+        )
+
+    @callback
+    def _async_refresh(self, _now=None) -> None:
+        """Write the current histogram summary."""
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self):
+        """Return the p99 latency in milliseconds."""
+        return self._histogram.percentile(0.99)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the histogram summary and buckets."""
+        return self._histogram.as_dict()
@@ -0,0 +1,294 @@
+"""Compact binary recorder for ThermoMaven cook sessions.
+
+One file per cookUuid. After a fixed header, every record has the same width:
+
+    uint16  time since the previous record (tenths of a second)
+    int16   delta of each channel since the previous record
+
+Channels are, for each probe: tip, ambient, then SESSION_AREAS area
+temperatures, all in tenths of °F. A missing value repeats the previous one
+(delta 0). A 4-probe device costs 58 bytes per sample.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+import logging
+import mmap
+import os
+import shutil
+import struct
+import time
+import uuid
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN, SESSION_AREAS, SESSION_FLUSH_INTERVAL, SESSION_MAX_AGE, SESSION_MAX_FILES
+
+_LOGGER = logging.getLogger(__name__)
+
+SESSION_MAGIC = b"TMCS"
+SESSION_VERSION = 1
+# magic, version, probes, areas per probe, reserved, start time (epoch seconds)
+_HEADER = struct.Struct("<4sBBBxd")
+_MAX_DT = 0xFFFF
+
+
+def _record_struct(probes: int, areas: int) -> struct.Struct:
+    """Return the fixed-width record layout of a session."""
+    return struct.Struct(f"<H{probes * (2 + areas)}h")
+
+
+def _clamp16(value: int) -> int:
+    """Clamp a delta into int16."""
+    return max(-32768, min(32767, value))
+
+
+def read_session(path: str) -> Iterator[tuple[float, tuple[int, ...]]]:
+    """Replay a session file through a memory map (blocking, run in executor).
+
+    Yields (epoch timestamp, absolute channel values in tenths of °F).
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size <= _HEADER.size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, version, probes, areas, start = _HEADER.unpack_from(mapped)
+            if magic != SESSION_MAGIC or version != SESSION_VERSION:
+                raise ValueError(f"Not a ThermoMaven session file: {path}")
+            record = _record_struct(probes, areas)
+            body = memoryview(mapped)[_HEADER.size:]
+            usable = len(body) - len(body) % record.size  # ignorer un enregistrement tronqué
+            timestamp = start
+            values = [0] * (probes * (2 + areas))
+            try:
+                for dt, *deltas in record.iter_unpack(body[:usable]):
+                    timestamp += dt / 10
+                    for index, delta in enumerate(deltas):
+                        values[index] += delta
+                    yield timestamp, tuple(values)
+            finally:
+                body.release()
+
+
+class _SessionWriter:
+    """Delta-encode samples of one session and buffer them for the file."""
+
+    def __init__(self, path: str, probes: int, start: float) -> None:
+        """Initialize the writer; the header is written with the first flush."""
+        self.path = path
+        self.created = False
+        self._record = _record_struct(probes, SESSION_AREAS)
+        self._probes = probes
+        self._last_time = start
+        self._last_values = [0] * (probes * (2 + SESSION_AREAS))
+        self._buffer = bytearray(_HEADER.pack(SESSION_MAGIC, SESSION_VERSION, probes, SESSION_AREAS, start))
+
+    def add(self, timestamp: float, probes: list[dict]) -> None:
+        """Encode one sample from the raw `probes` of a status report."""
+        values = []
+        for index in range(self._probes):
+            probe = probes[index] if index < len(probes) else {}
+            areas = list(probe.get("areaTemperature") or ())[:SESSION_AREAS]
+            areas += [None] * (SESSION_AREAS - len(areas))
+            values.append(probe.get("curTemperature"))
+            values.append(probe.get("curAmbientTemperature"))
+            values.extend(areas)
+
+        deltas = []
+        for index, value in enumerate(values):
+            if value is None:
+                deltas.append(0)
+                continue
+            delta = _clamp16(value - self._last_values[index])
+            self._last_values[index] += delta
+            deltas.append(delta)
+
+        dt = min(_MAX_DT, max(0, round((timestamp - self._last_time) * 10)))
+        self._last_time += dt / 10
+        self._buffer += self._record.pack(dt, *deltas)
+
+    def take(self) -> bytes:
+        """Return and clear the bytes not yet written."""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _write(path: str, data: bytes, create: bool) -> str:
+    """Write session bytes (blocking), return the file actually used.
+
+    A new session never appends to an existing file (e.g. a cook resumed after
+    a restart): it gets a numbered file instead.
+    """
+    if not create:
+        with open(path, "ab") as file:
+            file.write(data)
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    base, ext = os.path.splitext(path)
+    candidate, number = path, 1
+    while True:
+        try:
+            with open(candidate, "xb") as file:
+                file.write(data)
+            return candidate
+        except FileExistsError:
+            candidate = f"{base}.{number}{ext}"
+            number += 1
+
+
+def _prune(directory: str, keep: set[str], now: float) -> list[str]:
+    """Delete old session files (blocking), return the removed paths.
+
+    Files older than SESSION_MAX_AGE go, then the oldest beyond
+    SESSION_MAX_FILES. Files in `keep` (running sessions) are never removed.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            files = sorted(
+                (
+                    (entry.stat().st_mtime, entry.path)
+                    for entry in entries
+                    if entry.name.endswith(".tmcs") and entry.path not in keep
+                ),
+                reverse=True,
+            )
+    except FileNotFoundError:
+        return []
+    limit = max(0, SESSION_MAX_FILES - len(keep))
+    removed = []
+    for index, (mtime, path) in enumerate(files):
+        if index < limit and now - mtime <= SESSION_MAX_AGE:
+            continue
+        try:
+            os.remove(path)
+            removed.append(path)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+class CookSessionRecorder:
+    """Record cook sessions from MQTT status reports, one file per cookUuid."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the recorder."""
+        self.hass = hass
+        self.directory = hass.config.path(DOMAIN, "sessions", entry_id)
+        self._writers: dict[str, tuple[str, _SessionWriter]] = {}  # deviceId -> (cookUuid, writer)
+        self._cook_uuids: dict[str, str] = {}  # deviceId -> cookUuid envoyé par l'intégration
+        self._flush_unsub = None
+        self._write_lock = asyncio.Lock()
+
+    def session_path(self, cook_uuid: str) -> str:
+        """Return the file of a session."""
+        return os.path.join(self.directory, f"{cook_uuid}.tmcs")
+
+    @callback
+    def async_set_cook_uuid(self, device_id: str, cook_uuid: str) -> None:
+        """Remember the cookUuid of a cook started from Home Assistant."""
+        self._cook_uuids[device_id] = cook_uuid
+
+    @callback
+    def async_record(self, device_id: str, report: dict) -> None:
+        """Append a raw status report to the device's running session, if cooking."""
+        probes = (report.get("cmdData") or {}).get("probes") or []
+        cooking = [probe for probe in probes if probe.get("cookingState") == "cooking"]
+        current = self._writers.get(device_id)
+
+        if not cooking:
+            # Fin de session seulement sur un état explicite (les rapports partiels n'en ont pas)
+            if current is not None and any(probe.get("cookingState") for probe in probes):
+                self._async_close(device_id)
+            return
+
+        if current is None:
+            cook_uuid = (
+                cooking[0].get("cookUuid")
+                or self._cook_uuids.pop(device_id, None)
+                or uuid.uuid4().hex  # Cuisson lancée depuis l'application
+            )
+            current = (
+                cook_uuid,
+                _SessionWriter(self.session_path(cook_uuid), len(probes), time.time()),
+            )
+            self._writers[device_id] = current
+            _LOGGER.debug("🍳 Recording cook session %s for device %s", cook_uuid, device_id)
+
+        current[1].add(time.time(), probes)
+        if self._flush_unsub is None:
+            self._flush_unsub = async_call_later(
+                self.hass, SESSION_FLUSH_INTERVAL, self._async_flush
+            )
+
+    @callback
+    def _async_close(self, device_id: str) -> None:
+        """End the session of a device and write what remains."""
+        cook_uuid, writer = self._writers.pop(device_id)
+        _LOGGER.debug("🏁 Cook session %s ended", cook_uuid)
+        self._async_write(writer)
+
+    @callback
+    def _async_write(self, writer: _SessionWriter) -> None:
+        """Hand the buffered records of a writer to the executor."""
+        data = writer.take()
+        if data:
+            self.hass.async_create_task(self._async_write_data(writer, data))
+
+    async def _async_write_data(self, writer: _SessionWriter, data: bytes) -> None:
+        """Write records in order (the lock keeps executor writes sequential)."""
+        async with self._write_lock:
+            created = not writer.created
+            try:
+                writer.path = await self.hass.async_add_executor_job(
+                    _write, writer.path, data, created
+                )
+                writer.created = True
+            except OSError as err:
+                _LOGGER.error("Failed to write cook session %s: %s", writer.path, err)
+                return
+            if created:
+                # Un fichier de plus: appliquer la rétention
+                await self._async_prune()
+
+    async def _async_prune(self) -> None:
+        """Remove the session files past the retention limits."""
+        keep = {writer.path for _, writer in self._writers.values()}
+        try:
+            removed = await self.hass.async_add_executor_job(_prune, self.directory, keep, time.time())
+        except OSError as err:
+            _LOGGER.error("Failed to prune cook sessions in %s: %s", self.directory, err)
+            return
+        if removed:
+            _LOGGER.debug("🗑️ Removed %d old cook session file(s)", len(removed))
+
+    @callback
+    def _async_flush(self, _now=None) -> None:
+        """Write the buffered records of all running sessions."""
+        self._flush_unsub = None
+        for _, writer in self._writers.values():
+            self._async_write(writer)
+
+    async def async_stop(self) -> None:
+        """Flush every running session (on unload)."""
+        if self._flush_unsub is not None:
+            self._flush_unsub()
+            self._flush_unsub = None
+        for _, writer in self._writers.values():
+            data = writer.take()
+            if data:
+                await self._async_write_data(writer, data)
+        self._writers.clear()
+
+    def remove(self) -> None:
+        """Delete the session files of the entry (blocking)."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    async def async_replay(self, cook_uuid: str) -> list[tuple[float, tuple[int, ...]]]:
+        """Load a recorded session."""
+        return await self.hass.async_add_executor_job(
+            lambda: list(read_session(self.session_path(cook_uuid)))
+        )
@@ -5,19 +5,49 @@ import json
 import logging
 import random
 import ssl
-import tempfile
 import time
 import uuid
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from types import MappingProxyType
 from typing import Any
 
 import aiohttp
 import paho.mqtt.client as mqtt
-from cryptography.hazmat.primitives.serialization import pkcs12
-from cryptography.hazmat.primitives import serialization
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_interval
 
-from .const import API_BASE_URL_COM, API_BASE_URL_DE, EUROPEAN_COUNTRIES, MQTT_BROKERS, MQTT_PORT
+from .certificates import ThermoMavenCertificateCache, build_ssl_context, decode_p12
+from .const import (
+    API_BASE_URL_COM,
+    API_BASE_URL_DE,
+    API_REQUEST_TIMEOUT,
+    COMMAND_CONFIRM_TIMEOUT,
+    COMMAND_MAX_RETRIES,
+    COMMAND_RETRY_BASE_DELAY,
+    DEVICE_MODELS,
+    EUROPEAN_COUNTRIES,
+    HISTORY_PAGE_SIZE,
+    LATENCY_STAGE_DECODE,
+    MQTT_BROKERS,
+    MQTT_CMD_DEVICE_LIST,
+    MQTT_CMD_STATUS_REPORT,
+    MQTT_MODE_ASYNCIO,
+    MQTT_MODE_THREAD,
+    MQTT_PORT,
+    MQTT_RECONNECT_MAX_DELAY,
+    PROBE_ACTION_SET,
+    PROBE_ACTION_START,
+    PROBE_ACTION_STOP,
+    PROBE_ACTIONS,
+    PROBE_COLORS,
+    PUBLISH_ACK_TIMEOUT,
+)
+from .message_trace import LazyJSON, MessageTrace
+from .metrics import LatencyStats
+from .models import PendingCommand
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,9 +63,30 @@ class ThermoMavenAPI:
         app_key: str,
         app_id: str,
         region: str = "US",
+        session: aiohttp.ClientSession | None = None,
+        cert_cache: ThermoMavenCertificateCache | None = None,
+        mqtt_mode: str = MQTT_MODE_ASYNCIO,
     ):
-        """Initialize the API."""
+        """Initialize the API.
+        
+        If `session` is given, it is owned by the API and closed by `async_close`.
+        Otherwise Home Assistant's shared (pooled) session is used.
+        
+        `mqtt_mode` selects how the MQTT socket is driven: MQTT_MODE_ASYNCIO runs
+        it on the HA event loop, MQTT_MODE_THREAD uses paho's own network thread.
+        """
         self.hass = hass
+        self._session = session
+        self._cert_cache = cert_cache
+        self._mqtt_cert_from_cache = False
+        self._mqtt_mode = mqtt_mode
+        self._mqtt_misc_unsub = None  # Timer loop_misc (keepalive) en mode asyncio
+        self._mqtt_connecting = False  # connect()/reconnect() en cours dans l'executor
+        self._mqtt_sock = None  # Socket ouvert par paho (on_socket_open)
+        self._mqtt_sock_want_write = False  # paho a des paquets en attente d'écriture
+        self._mqtt_watched = None  # (socket, fd, écriture) enregistré dans la boucle
+        self._mqtt_reconnect_task = None
+        self._mqtt_stopping = False
         self.email = email
         self.password = password
         self.app_key = app_key
@@ -45,6 +96,7 @@ class ThermoMavenAPI:
         self.user_id = None
         self.device_sn = "".join(random.choices("0123456789abcdef", k=16))
         self._mqtt_device_list_received = False  # Flag pour savoir si on a reçu la liste MQTT
+        self._mqtt_device_list_event = asyncio.Event()  # Signalé dès réception de user:device:list
         
         # Determine API base URL based on region
         if region in EUROPEAN_COUNTRIES:
@@ -57,10 +109,33 @@ class ThermoMavenAPI:
         self.mqtt_client = None
         self.mqtt_config = None
         self.coordinator = None
-        self._latest_mqtt_data = None
-        
-        # Fichiers temporaires pour les certificats
-        self.cert_files = []
+        self._latest_mqtt_messages = {}  # cmdType -> dernier message reçu de ce type
+        self.message_trace = MessageTrace(_LOGGER)  # Derniers messages bruts, décodés à la demande
+        self.latency = LatencyStats()  # Histogrammes par étape, de la réception MQTT à l'état HA
+        # Handlers par cmdType exact; les types inconnus sont résolus une fois puis mis en cache
+        self._mqtt_handlers = {
+            MQTT_CMD_DEVICE_LIST: self._handle_mqtt_device_list,
+            **{
+                f"{model}:{MQTT_CMD_STATUS_REPORT}": self._handle_mqtt_status_report
+                for model in DEVICE_MODELS
+            },
+        }
+        self._device_sub_topics = set()  # Topics des appareils, ré-abonnés à chaque connexion
+        self._device_pub_topics = {}  # deviceId -> topic de commande (pubTopic)
+        self._pending_publishes = {}  # mid -> future résolu au PUBACK
+        self._pending_commands = {}  # (deviceId, numéro de sonde) -> PendingCommand
+
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled HTTP session used for all REST calls."""
+        if self._session is not None:
+            return self._session
+        return async_get_clientsession(self.hass)
+
+    async def async_close(self) -> None:
+        """Close the API's own HTTP session (the shared HA session is left open)."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
 
     def _generate_sign(self, params_str: str, body_str: str = "") -> str:
         """Generate MD5 signature."""
@@ -118,42 +193,59 @@ class ThermoMavenAPI:
         headers = self._build_headers(payload)
         body_str = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                endpoint, data=body_str, headers=headers
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("code") == "0":
-                        self.token = data["data"]["token"]
-                        self.user_id = data["data"]["userId"]
-                        _LOGGER.debug("Login successful for user %s", self.email)
-                        return data
-                raise Exception(f"Login failed: {await response.text()}")
+        async with self._get_session().post(
+            endpoint,
+            data=body_str,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=API_REQUEST_TIMEOUT),
+        ) as response:
+            if response.status == 200:
+                data = await response.json()
+                if data.get("code") == "0":
+                    self.token = data["data"]["token"]
+                    self.user_id = data["data"]["userId"]
+                    _LOGGER.debug("Login successful for user %s", self.email)
+                    return data
+            raise Exception(f"Login failed: {await response.text()}")
 
     async def async_get_devices(self) -> list[dict]:
-        """Get list of devices."""
+        """Get list of devices.
+        
+        My-devices and shared-devices are fetched concurrently. If one of the
+        calls fails, the devices of the other one are still returned.
+        """
         _LOGGER.debug("=== API DEVICE REQUEST ===")
         
-        my_devices = await self._async_request("POST", "/app/device/share/my/device/list", {})
-        shared_devices = await self._async_request("POST", "/app/device/share/shared/device/list", {})
+        endpoints = (
+            "/app/device/share/my/device/list",
+            "/app/device/share/shared/device/list",
+        )
+        results = await asyncio.gather(
+            *(self._async_request("POST", endpoint, {}) for endpoint in endpoints),
+            return_exceptions=True,
+        )
         
-        _LOGGER.debug("My devices response: %s", json.dumps(my_devices, indent=2))
-        _LOGGER.debug("Shared devices response: %s", json.dumps(shared_devices, indent=2))
+        _LOGGER.debug("My devices response: %s", LazyJSON(results[0]))
+        _LOGGER.debug("Shared devices response: %s", LazyJSON(results[1]))
         
+        errors = []
+        counts = []
         devices = []
-        if my_devices and my_devices.get("code") == "0":
-            my_data = my_devices.get("data", [])
-            devices.extend(my_data)
-            
-        if shared_devices and shared_devices.get("code") == "0":
-            shared_data = shared_devices.get("data", [])
-            devices.extend(shared_data)
+        for endpoint, result in zip(endpoints, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Request to %s failed: %s", endpoint, result)
+                errors.append(result)
+                counts.append(0)
+                continue
+            data = result.get("data", []) if result and result.get("code") == "0" else []
+            devices.extend(data)
+            counts.append(len(data))
+        
+        if len(errors) == len(endpoints):
+            raise errors[0]
         
         _LOGGER.debug("API returned: %d devices (My: %d, Shared: %d)", 
-                    len(devices),
-                    len(my_data) if my_devices and my_devices.get("code") == "0" else 0,
-                    len(shared_data) if shared_devices and shared_devices.get("code") == "0" else 0)
+                    len(devices), counts[0], counts[1])
             
         return devices
 
@@ -164,6 +256,38 @@ class ThermoMavenAPI:
             return result.get("data", {})
         return {}
 
+    async def async_get_history_page(self, current: int = 1, size: int = HISTORY_PAGE_SIZE) -> list[dict]:
+        """Get one page of the cloud cooking history (newest first).
+        
+        Raises on an error response: an empty list always means no more records.
+        """
+        result = await self._async_request(
+            "POST", "/app/history/page", {"current": current, "size": size}
+        )
+        if not result or result.get("code") != "0":
+            raise Exception(
+                f"History page {current} request failed: {result.get('msg') if result else 'no response'}"
+            )
+        data = result.get("data") or {}
+        # Réponse paginée ({"records": [...], "total": ...}) ou liste directe
+        return data.get("records", []) if isinstance(data, dict) else data
+
+    async def async_iter_history(self, size: int = HISTORY_PAGE_SIZE) -> AsyncIterator[list[dict]]:
+        """Yield cloud history pages, newest first, until the last page.
+        
+        The last page yielded is always short or empty (an exact multiple of
+        `size` records ends with an empty page): a caller that sees it knows the
+        whole history was read. Stop iterating (break) as soon as a page reaches
+        already known records, no further page is then requested.
+        """
+        current = 1
+        while True:
+            records = await self.async_get_history_page(current, size)
+            yield records
+            if len(records) < size:
+                return
+            current += 1
+
     async def async_get_mqtt_certificate(self) -> dict:
         """Get MQTT certificate configuration."""
         result = await self._async_request("POST", "/app/mqtt/cert/apply", {})
@@ -171,7 +295,9 @@ class ThermoMavenAPI:
             return result.get("data", {})
         return {}
 
-    async def _async_request(self, method: str, endpoint: str, body: dict) -> dict:
+    async def _async_request(
+        self, method: str, endpoint: str, body: dict, timeout: float = API_REQUEST_TIMEOUT
+    ) -> dict:
         """Make an authenticated request."""
         url = f"{self.api_base_url}{endpoint}"
         headers = self._build_headers(body)
@@ -181,33 +307,38 @@ class ThermoMavenAPI:
         else:
             body_str = ""
 
-        async with aiohttp.ClientSession() as session:
-            async with session.request(
-                method, url, data=body_str if body else None, headers=headers
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                _LOGGER.error(
-                    "Request to %s failed: %s", endpoint, await response.text()
-                )
-                return {}
+        async with self._get_session().request(
+            method,
+            url,
+            data=body_str if body else None,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            if response.status == 200:
+                return await response.json()
+            _LOGGER.error(
+                "Request to %s failed: %s", endpoint, await response.text()
+            )
+            return {}
+
+    def restore_device_topics(self, devices: list[dict]) -> None:
+        """Remember the MQTT topics of devices restored from the disk cache."""
+        self._index_device_topics(devices)
 
     async def async_wait_for_mqtt_device_list(self, timeout=10):
         """Wait for MQTT to receive the device list."""
         _LOGGER.debug("⏳ Waiting for MQTT device list (timeout: %ds)...", timeout)
-        start_time = time.time()
-        
-        # Vérifier aussi que c'est bien un user:device:list et pas un status:report
-        while not self._mqtt_device_list_received or \
-              self._latest_mqtt_data.get("cmdType") != "user:device:list":
-            if time.time() - start_time > timeout:
-                _LOGGER.warning("⚠️ Timeout waiting for MQTT device list after %ds", timeout)
-                _LOGGER.warning("Last MQTT cmdType: %s", 
-                              self._latest_mqtt_data.get("cmdType") if self._latest_mqtt_data else "None")
-                return False
-            await asyncio.sleep(0.5)  # Check every 500ms
+        start_time = time.monotonic()
+        
+        try:
+            await asyncio.wait_for(self._mqtt_device_list_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            _LOGGER.warning("⚠️ Timeout waiting for MQTT device list after %ds", timeout)
+            _LOGGER.warning("MQTT cmdTypes received so far: %s",
+                          list(self._latest_mqtt_messages) or "None")
+            return False
         
-        _LOGGER.debug("✅ MQTT device list received in %.1fs", time.time() - start_time)
+        _LOGGER.debug("✅ MQTT device list received in %.2fs", time.monotonic() - start_time)
         return True
     
     async def async_setup_mqtt(self, coordinator):
@@ -216,71 +347,237 @@ class ThermoMavenAPI:
         
         # Reset flag and latest data to wait for fresh device list
         self._mqtt_device_list_received = False
-        self._latest_mqtt_data = None  # Effacer les anciennes données MQTT
+        self._mqtt_device_list_event.clear()
+        self._latest_mqtt_messages.clear()  # Effacer les anciennes données MQTT
         _LOGGER.debug("🔄 Reset MQTT flag and data, waiting for fresh device list...")
         
         # Check if MQTT is already running (reload case)
-        mqtt_already_running = self.mqtt_client is not None and hasattr(self.mqtt_client, '_thread') and self.mqtt_client._thread is not None
+        mqtt_already_running = self.mqtt_client is not None and self.mqtt_client.is_connected()
         
         if mqtt_already_running:
             _LOGGER.debug("♻️ MQTT already running, no need to re-setup")
             # MQTT est déjà connecté, pas besoin de refaire le sync
             # Les mises à jour arrivent déjà automatiquement
         else:
-            # Get MQTT certificate
-            self.mqtt_config = await self.async_get_mqtt_certificate()
-            if not self.mqtt_config:
-                _LOGGER.error("Failed to get MQTT certificate")
+            material = await self._async_get_mqtt_certificate_material()
+            if not material:
                 return False
 
-            # Download and convert certificate in executor
-            await self.hass.async_add_executor_job(self._setup_mqtt_sync)
+            try:
+                await self._async_start_mqtt(material)
+            except ssl.SSLError as err:
+                if not self._mqtt_cert_from_cache:
+                    raise
+                # Certificat en cache refusé: en demander un nouveau une seule fois
+                _LOGGER.warning("Cached MQTT certificate rejected (%s), re-provisioning", err)
+                await self._cert_cache.async_invalidate(material["client_id"])
+                material = await self._async_provision_mqtt_certificate()
+                if not material:
+                    return False
+                await self._async_start_mqtt(material)
             
             # Le on_connect callback va trigger le sync automatiquement
             # Pas besoin de le faire ici
         
         return True
 
-    def _setup_mqtt_sync(self):
-        """Setup MQTT synchronously (runs in executor)."""
-        import requests
+    async def _async_get_mqtt_certificate_material(self) -> dict | None:
+        """Return MQTT certificate material, from the cache if still valid."""
+        if self._cert_cache is not None:
+            material = await self._cert_cache.async_get_valid()
+            if material:
+                _LOGGER.debug("Reusing cached MQTT certificate for %s", material["client_id"])
+                self._mqtt_cert_from_cache = True
+                self.mqtt_config = {
+                    "clientId": material["client_id"],
+                    "subTopics": material["sub_topics"],
+                }
+                return material
+        return await self._async_provision_mqtt_certificate()
+
+    async def _async_provision_mqtt_certificate(self) -> dict | None:
+        """Apply for a new MQTT certificate, download and decode its P12 bundle."""
+        self._mqtt_cert_from_cache = False
+        self.mqtt_config = await self.async_get_mqtt_certificate()
+        if not self.mqtt_config:
+            _LOGGER.error("Failed to get MQTT certificate")
+            return None
         
         # Download P12 certificate
-        response = requests.get(self.mqtt_config["p12Url"])
-        if response.status_code != 200:
-            _LOGGER.error("Failed to download P12 certificate")
-            return False
+        async with self._get_session().get(
+            self.mqtt_config["p12Url"],
+            timeout=aiohttp.ClientTimeout(total=API_REQUEST_TIMEOUT),
+        ) as response:
+            if response.status != 200:
+                _LOGGER.error("Failed to download P12 certificate")
+                return None
+            p12_data = await response.read()
         
-        p12_file = tempfile.NamedTemporaryFile(delete=False, suffix=".p12")
-        p12_file.write(response.content)
-        p12_file.close()
-        self.cert_files.append(p12_file.name)
+        # Convert P12 to PEM (CPU-bound crypto, executor)
+        material = await self.hass.async_add_executor_job(
+            decode_p12, p12_data, self.mqtt_config["p12Password"]
+        )
+        material["client_id"] = self.mqtt_config["clientId"]
+        material["sub_topics"] = self.mqtt_config.get("subTopics", [])
         
-        # Convert P12 to PEM
-        with open(p12_file.name, "rb") as f:
-            p12_data = f.read()
+        if self._cert_cache is not None:
+            await self._cert_cache.async_save(material)
+        return material
+
+    async def _async_reprovision_mqtt(self) -> None:
+        """Replace a cached certificate the broker refused and reconnect."""
+        _LOGGER.warning("MQTT broker refused cached certificate, re-provisioning")
+        client_id = self.mqtt_config["clientId"]
+        await self.async_disconnect_mqtt()
+        self.mqtt_client = None
+        await self._cert_cache.async_invalidate(client_id)
         
-        private_key, certificate, _ = pkcs12.load_key_and_certificates(
-            p12_data, self.mqtt_config["p12Password"].encode()
-        )
+        material = await self._async_provision_mqtt_certificate()
+        if material:
+            await self._async_start_mqtt(material)
+
+    async def _async_start_mqtt(self, material: dict) -> None:
+        """Create and connect the MQTT client, then start its network loop."""
+        self._mqtt_stopping = False
+        # Création du contexte TLS et connexion (DNS + handshake) bloquantes: executor
+        self._mqtt_connecting = True
+        try:
+            await self.hass.async_add_executor_job(self._setup_mqtt_sync, material)
+        finally:
+            self._mqtt_connecting = False
+        
+        if self._mqtt_mode == MQTT_MODE_ASYNCIO:
+            self._async_sync_mqtt_watchers()
+            if self._mqtt_misc_unsub is None:
+                self._mqtt_misc_unsub = async_track_time_interval(
+                    self.hass, self._async_mqtt_misc, timedelta(seconds=1)
+                )
+        else:
+            self.mqtt_client.loop_start()
+
+    def _on_mqtt_socket_open(self, client, userdata, sock):
+        """Watch the socket paho just opened."""
+        self._mqtt_sock = sock
+        self._mqtt_sock_want_write = False
+        self._mqtt_socket_changed()
+
+    def _on_mqtt_socket_close(self, client, userdata, sock):
+        """Stop watching a socket paho is about to close."""
+        if self._mqtt_sock is sock:
+            self._mqtt_sock = None
+            self._mqtt_sock_want_write = False
+        self._mqtt_socket_changed()
+
+    def _on_mqtt_socket_register_write(self, client, userdata, sock):
+        """Watch the MQTT socket for writability while packets are queued."""
+        self._mqtt_sock_want_write = True
+        self._mqtt_socket_changed()
+
+    def _on_mqtt_socket_unregister_write(self, client, userdata, sock):
+        """Stop watching the MQTT socket for writability."""
+        self._mqtt_sock_want_write = False
+        self._mqtt_socket_changed()
+
+    def _mqtt_socket_changed(self) -> None:
+        """Apply paho's socket state to the loop, unless connect() runs in the executor."""
+        # Pendant connect()/reconnect() on ne fait que noter l'état: la boucle le
+        # rattrape dans _async_sync_mqtt_watchers une fois le job terminé
+        if not self._mqtt_connecting:
+            self._async_sync_mqtt_watchers()
+
+    @callback
+    def _async_sync_mqtt_watchers(self) -> None:
+        """Make the loop's reader/writer match the socket state paho reported."""
+        loop = self.hass.loop
+        sock = None if self._mqtt_connecting else self._mqtt_sock
+        watched = self._mqtt_watched
+        if watched is not None and watched[0] is not sock:
+            loop.remove_reader(watched[1])
+            loop.remove_writer(watched[1])
+            watched = None
+        if sock is None:
+            self._mqtt_watched = None
+            return
+        
+        fd = sock.fileno()
+        writing = watched[2] if watched is not None else False
+        if watched is None:
+            loop.add_reader(fd, self._async_mqtt_read)
+        want_write = self._mqtt_sock_want_write
+        if want_write and not writing:
+            loop.add_writer(fd, self.mqtt_client.loop_write)
+        elif writing and not want_write:
+            loop.remove_writer(fd)
+        self._mqtt_watched = (sock, fd, want_write)
+
+    @callback
+    def _async_mqtt_read(self) -> None:
+        """Read everything available on the MQTT socket."""
+        client = self.mqtt_client
+        client.loop_read()
+        # Les octets déjà déchiffrés restent dans le tampon SSL: le fd ne redeviendra
+        # pas lisible pour eux, il faut les lire maintenant
+        sock = client.socket()
+        while sock is not None and getattr(sock, "pending", None) and sock.pending():
+            client.loop_read()
+            sock = client.socket()
+
+    @callback
+    def _async_mqtt_misc(self, _now=None) -> None:
+        """Run paho's periodic housekeeping (keepalive pings, retries)."""
+        # Pas de loop_misc() pendant que reconnect() manipule le client dans l'executor
+        if self.mqtt_client is not None and not self._mqtt_connecting:
+            self.mqtt_client.loop_misc()
+
+    async def _async_mqtt_reconnect(self) -> None:
+        """Reconnect the asyncio-driven MQTT client with exponential backoff."""
+        delay = 1
+        while not self._mqtt_stopping:
+            await asyncio.sleep(delay)
+            # reconnect() tourne dans l'executor: la boucle lâche le socket et le timer
+            # loop_misc jusqu'à la fin du job
+            self._mqtt_connecting = True
+            self._async_sync_mqtt_watchers()
+            try:
+                await self.hass.async_add_executor_job(self.mqtt_client.reconnect)
+            except (OSError, ssl.SSLError) as err:
+                _LOGGER.debug("MQTT reconnect failed (%s), retrying in %ds", err, delay)
+                delay = min(delay * 2, MQTT_RECONNECT_MAX_DELAY)
+                continue
+            finally:
+                self._mqtt_connecting = False
+                self._async_sync_mqtt_watchers()
+            _LOGGER.debug("MQTT reconnected")
+            return
+
+    def _run_in_loop(self, target, *args) -> None:
+        """Run a callback or coroutine in the HA event loop.
         
-        # Save certificate
-        cert_pem = certificate.public_bytes(serialization.Encoding.PEM)
-        cert_file = tempfile.NamedTemporaryFile(delete=False, suffix=".crt", mode="wb")
-        cert_file.write(cert_pem)
-        cert_file.close()
-        self.cert_files.append(cert_file.name)
-        
-        # Save private key
-        key_pem = private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption(),
+        MQTT callbacks already run in the event loop in asyncio mode, so no
+        cross-thread hop is needed there.
+        """
+        if self._mqtt_mode == MQTT_MODE_THREAD:
+            if asyncio.iscoroutine(target):
+                self.hass.add_job(target)
+            else:
+                self.hass.loop.call_soon_threadsafe(target, *args)
+        elif asyncio.iscoroutine(target):
+            self.hass.async_create_task(target)
+        else:
+            target(*args)
+
+    async def _async_publish(self, topic: str, payload: str, qos: int = 1):
+        """Publish a message, without an executor hop in asyncio mode."""
+        if self._mqtt_mode == MQTT_MODE_ASYNCIO:
+            return self.mqtt_client.publish(topic, payload, qos)
+        return await self.hass.async_add_executor_job(
+            self.mqtt_client.publish, topic, payload, qos
         )
-        key_file = tempfile.NamedTemporaryFile(delete=False, suffix=".key", mode="wb")
-        key_file.write(key_pem)
-        key_file.close()
-        self.cert_files.append(key_file.name)
+
+    def _setup_mqtt_sync(self, material: dict):
+        """Setup MQTT synchronously (runs in executor)."""
+        # TLS context built from memory: no certificate or key written to disk
+        ssl_context = build_ssl_context(material)
         
         # Setup MQTT client
         client_id = self.mqtt_config["clientId"]
@@ -296,20 +593,22 @@ class ThermoMavenAPI:
         self.mqtt_client.on_connect = self._on_mqtt_connect
         self.mqtt_client.on_message = self._on_mqtt_message
         self.mqtt_client.on_disconnect = self._on_mqtt_disconnect
+        self.mqtt_client.on_publish = self._on_mqtt_publish
+        if self._mqtt_mode == MQTT_MODE_ASYNCIO:
+            # Callbacks socket posés avant connect(), comme l'exemple de boucle externe
+            # de paho: l'enregistrement en écriture passe toujours par paho
+            self.mqtt_client.on_socket_open = self._on_mqtt_socket_open
+            self.mqtt_client.on_socket_close = self._on_mqtt_socket_close
+            self.mqtt_client.on_socket_register_write = self._on_mqtt_socket_register_write
+            self.mqtt_client.on_socket_unregister_write = self._on_mqtt_socket_unregister_write
         
         # Configure TLS
-        self.mqtt_client.tls_set(
-            certfile=cert_file.name,
-            keyfile=key_file.name,
-            cert_reqs=ssl.CERT_REQUIRED,
-            tls_version=ssl.PROTOCOL_TLSv1_2,
-        )
+        self.mqtt_client.tls_set_context(ssl_context)
         
-        # Connect
+        # Connect (la boucle réseau est démarrée par _async_start_mqtt)
         self.mqtt_client.connect(broker, MQTT_PORT, keepalive=60)
-        self.mqtt_client.loop_start()
         
-        _LOGGER.debug("MQTT client started for region %s", region)
+        _LOGGER.debug("MQTT client started for region %s (%s mode)", region, self._mqtt_mode)
         return True
 
     def _on_mqtt_connect(self, client, userdata, flags, rc):
@@ -321,93 +620,150 @@ class ThermoMavenAPI:
                 client.subscribe(topic)
                 _LOGGER.debug("Subscribed to %s", topic)
             
+            # Topics des appareils connus (cache ou liste précédente): les status:report
+            # arrivent sans attendre une nouvelle liste d'appareils
+            for topic in self._device_sub_topics:
+                client.subscribe(topic)
+                _LOGGER.debug("Subscribed to known device topic %s", topic)
+            
             # Trigger device list sync SEULEMENT lors de la première connexion
             # Le message MQTT user:device:list sera publié par le broker
             if not self._mqtt_device_list_received:
                 _LOGGER.debug("Triggering initial device list synchronization via API")
-                self.hass.add_job(self._trigger_device_sync())
+                self._run_in_loop(self._trigger_device_sync())
             else:
                 _LOGGER.debug("Device list already received, skipping API sync")
+        elif rc in (4, 5) and self._mqtt_cert_from_cache:
+            # 4 = bad credentials, 5 = not authorized: le certificat en cache n'est plus valide
+            self._mqtt_cert_from_cache = False
+            self._run_in_loop(self._async_reprovision_mqtt())
         else:
             _LOGGER.error("Failed to connect to MQTT broker: %s", rc)
 
+    def mqtt_status(self) -> dict[str, Any]:
+        """Return the MQTT connection state, for diagnostics."""
+        return {
+            "mode": self._mqtt_mode,
+            "connected": self.mqtt_client is not None and self.mqtt_client.is_connected(),
+            "device_list_received": self._mqtt_device_list_received,
+            "device_topics": len(self._device_pub_topics),
+        }
+
+    def pending_commands(self) -> MappingProxyType:
+        """Return a read-only view of the unconfirmed probe commands.
+        
+        Keys are (deviceId, probe number), values PendingCommand.
+        """
+        return MappingProxyType(self._pending_commands)
+
+    def latest_mqtt_message(self, cmd_type: str) -> dict | None:
+        """Return the last MQTT message received for a cmdType, if any."""
+        return self._latest_mqtt_messages.get(cmd_type)
+
+    def _resolve_mqtt_handler(self, cmd_type: str):
+        """Find the handler of a cmdType not in the table (e.g. a new device model)."""
+        if cmd_type.endswith(f":{MQTT_CMD_STATUS_REPORT}"):
+            handler = self._handle_mqtt_status_report
+        else:
+            handler = None
+            _LOGGER.debug("No handler for MQTT cmdType %s", cmd_type)
+        self._mqtt_handlers[cmd_type] = handler
+        return handler
+
     def _on_mqtt_message(self, client, userdata, msg):
         """Handle MQTT message."""
         try:
-            data = json.loads(msg.payload.decode("utf-8"))
+            decode_start = time.perf_counter()
+            data = json.loads(msg.payload)
+            self.latency.record(LATENCY_STAGE_DECODE, time.perf_counter() - decode_start)
             cmd_type = data.get("cmdType", "")
             
             # Log compact header
             _LOGGER.debug("📨 MQTT: %s on %s", cmd_type, msg.topic)
             
-            # Full message only at debug level
-            _LOGGER.debug("Full message: %s", json.dumps(data, indent=2))
+            # Payload brut conservé tel quel; le message complet n'est logué qu'en échantillon
+            self.message_trace.record(cmd_type, msg.topic, msg.payload, data)
             
-            # Store the latest message data for coordinator
-            self._latest_mqtt_data = data
-            
-            # Trigger coordinator update on device list changes
-            if cmd_type == "user:device:list":
-                # Log the device data for debugging
-                cmd_data = data.get("cmdData", {})
-                devices = cmd_data.get("devices", [])
-                _LOGGER.debug("Device list updated via MQTT: %d devices found", len(devices))
-                
-                # Marquer que la liste MQTT a été reçue
-                self._mqtt_device_list_received = True
-                _LOGGER.debug("✅ MQTT device list received and processed")
-                
-                # Log device details for debugging
-                for device in devices:
-                    device_id = device.get("deviceId")
-                    device_name = device.get("deviceName", "Unknown")
-                    device_sn = device.get("deviceSn", "Unknown")
-                    _LOGGER.debug("MQTT Device: %s, ID: %s, SN: %s", device_name, device_id, device_sn)
-                
-                _LOGGER.debug("Full MQTT device data: %s", json.dumps(devices, indent=2))
-                
-                # Subscribe to each device's topic for real-time updates
-                for device in devices:
-                    device_topics = device.get("subTopics", [])
-                    for topic in device_topics:
-                        _LOGGER.debug("Subscribing to device topic: %s", topic)
-                        self.mqtt_client.subscribe(topic)
-                
-                if self.coordinator:
-                    self.hass.add_job(self.coordinator.async_request_refresh())
+            # Un emplacement par type de message: un status:report n'écrase plus la liste d'appareils
+            self._latest_mqtt_messages[cmd_type] = data
             
-            # Handle temperature updates
-            elif "status:report" in cmd_type:
-                _LOGGER.debug("=== TEMPERATURE UPDATE VIA MQTT ===")
-                device_id = data.get("deviceId")
-                cmd_data = data.get("cmdData", {})
-                
-                # Log compact info instead of full JSON
-                temp = "N/A"
-                probes = cmd_data.get("probes", [])
-                if probes:
-                    cur_temp = probes[0].get("curTemperature")
-                    if cur_temp:
-                        temp_f = cur_temp / 10.0
-                        temp = f"{temp_f}°F"
-                
-                _LOGGER.debug("🌡️ Temperature update: Device %s = %s (Battery: %s%%)", 
-                           device_id, temp, cmd_data.get("batteryValue", "?"))
-                
-                # Store the status report data for the coordinator to use
-                if self.coordinator:
-                    _LOGGER.debug("Triggering coordinator refresh for temperature update")
-                    self.hass.add_job(self.coordinator.async_request_refresh())
-                else:
-                    _LOGGER.warning("No coordinator available for temperature update")
+            try:
+                handler = self._mqtt_handlers[cmd_type]
+            except KeyError:
+                handler = self._resolve_mqtt_handler(cmd_type)
+            if handler is not None:
+                handler(data)
                     
         except Exception as err:
             _LOGGER.error("Error processing MQTT message: %s", err)
 
+    def _handle_mqtt_device_list(self, data: dict) -> None:
+        """Handle a user:device:list message."""
+        # Log the device data for debugging
+        cmd_data = data.get("cmdData", {})
+        devices = cmd_data.get("devices", [])
+        _LOGGER.debug("Device list updated via MQTT: %d devices found", len(devices))
+        
+        # Marquer que la liste MQTT a été reçue (réveille async_wait_for_mqtt_device_list)
+        self._mqtt_device_list_received = True
+        self._run_in_loop(self._mqtt_device_list_event.set)
+        _LOGGER.debug("✅ MQTT device list received and processed")
+        
+        # Log device details for debugging
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            for device in devices:
+                _LOGGER.debug("MQTT Device: %s, ID: %s, SN: %s",
+                              device.get("deviceName", "Unknown"), device.get("deviceId"),
+                              device.get("deviceSn", "Unknown"))
+            _LOGGER.debug("Full MQTT device data: %s", LazyJSON(devices))
+        
+        # Subscribe to each device's topic for real-time updates
+        for device in devices:
+            device_topics = device.get("subTopics", [])
+            for topic in device_topics:
+                _LOGGER.debug("Subscribing to device topic: %s", topic)
+                self.mqtt_client.subscribe(topic)
+        
+        # Index des topics de commande, persisté avec la table des appareils
+        self._index_device_topics(devices)
+        
+        if self.coordinator:
+            # Mise à jour incrémentale de la table, sans refaire la fusion API
+            self._run_in_loop(self.coordinator.async_apply_device_list, devices)
+
+    def _handle_mqtt_status_report(self, data: dict) -> None:
+        """Handle a <model>:status:report message (temperature update)."""
+        dispatch_start = time.perf_counter()
+        
+        # Log compact info instead of full JSON (computed only if debug is on)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            cmd_data = data.get("cmdData", {})
+            temp = "N/A"
+            probes = cmd_data.get("probes", [])
+            if probes:
+                cur_temp = probes[0].get("curTemperature")
+                if cur_temp:
+                    temp = f"{cur_temp / 10.0}°F"
+            _LOGGER.debug("🌡️ Temperature update: Device %s = %s (Battery: %s%%)",
+                          data.get("deviceId"), temp, cmd_data.get("batteryValue", "?"))
+        
+        # Push the report to the coordinator, only this device's entities are updated
+        if self.coordinator:
+            self._run_in_loop(self.coordinator.async_handle_status_report, data, dispatch_start)
+        else:
+            _LOGGER.warning("No coordinator available for temperature update")
+
     def _on_mqtt_disconnect(self, client, userdata, rc):
         """Handle MQTT disconnection."""
         if rc != 0:
             _LOGGER.warning("Unexpected MQTT disconnection: %s", rc)
+            # En mode thread, paho se reconnecte tout seul
+            if self._mqtt_mode == MQTT_MODE_ASYNCIO and not self._mqtt_stopping and (
+                self._mqtt_reconnect_task is None or self._mqtt_reconnect_task.done()
+            ):
+                self._mqtt_reconnect_task = self.hass.async_create_task(
+                    self._async_mqtt_reconnect()
+                )
 
     async def _trigger_device_sync(self):
         """Trigger device synchronization by calling API endpoints.
@@ -426,70 +782,119 @@ class ThermoMavenAPI:
         except Exception as err:
             _LOGGER.error("Failed to trigger device sync: %s", err)
 
-    async def async_set_probe_temperature(
-        self, device_id: str, device_type: str, probe_color: str, target_temperature: int
-    ) -> bool:
-        """Set target temperature for a probe via MQTT.
+    def _build_probe_control(
+        self,
+        device_id: str,
+        device_type: str,
+        probe_color: str,
+        action: str,
+        target_temperature: int | None = None,
+    ) -> dict:
+        """Build a WT:probe:control message.
         
         Args:
             device_id: Device ID
             device_type: Device model (e.g., "WT02")
             probe_color: Probe color ("bright" or "dark")
-            target_temperature: Target temperature in tenths of degrees F (e.g., 650 = 65.0°F)
-        
-        Returns:
-            True if command was published successfully
+            action: One of PROBE_ACTIONS ("start", "stop", "set")
+            target_temperature: Target temperature in tenths of degrees F (start/set)
         """
-        if not self.mqtt_client:
-            _LOGGER.error("MQTT client not initialized")
-            return False
-        
-        # Get device topics from latest MQTT data
-        pub_topic = self._get_device_pub_topic(device_id)
-        if not pub_topic:
-            _LOGGER.error("No publish topic found for device %s", device_id)
-            return False
-        
-        # Build command
         cmd_data = {
             "probeColor": probe_color,
-            "cookingAction": 3,  # 3 = modify settings
-            "setParams": [
+            "cookingAction": PROBE_ACTIONS[action],
+        }
+        if action == PROBE_ACTION_START:
+            cook_uuid = str(uuid.uuid4())
+            if self.coordinator:
+                # La session enregistrée porte le cookUuid envoyé à l'appareil
+                self.coordinator.sessions.async_set_cook_uuid(str(device_id), cook_uuid)
+            cmd_data.update({
+                "cookUuid": cook_uuid,
+                "startClient": "android",
+                "cookingState": "cooking",
+            })
+        elif action == PROBE_ACTION_STOP:
+            cmd_data["cookingState"] = "ready"
+        if action != PROBE_ACTION_STOP:
+            cmd_data["setParams"] = [
                 {
                     "setTemperature": target_temperature
                 }
             ]
-        }
         
-        message = {
+        return {
             "cmdType": "WT:probe:control",
             "cmdData": cmd_data,
-            "cmdId": str(uuid.uuid4()).replace("-", ""),
+            "cmdId": uuid.uuid4().hex,
             "deviceId": device_id,
             "deviceType": device_type,
             "userId": str(self.user_id),
             "appVersion": "1804"
         }
+
+    async def _async_send_probe_control(
+        self,
+        device_id: str,
+        device_type: str,
+        probe_color: str,
+        action: str,
+        target_temperature: int | None = None,
+    ) -> bool:
+        """Publish a single probe control command, True if published."""
+        if not self.mqtt_client:
+            _LOGGER.error("MQTT client not initialized")
+            return False
+        
+        message = self._build_probe_control(
+            device_id, device_type, probe_color, action, target_temperature
+        )
+        return await self._async_publish_probe_control(device_id, action, message)
+
+    async def _async_publish_probe_control(self, device_id: str, action: str, message: dict) -> bool:
+        """Publish an already built probe control message, True if published."""
+        if not self.mqtt_client:
+            _LOGGER.error("MQTT client not initialized")
+            return False
+        
+        pub_topic = self._get_device_pub_topic(device_id)
+        if not pub_topic:
+            _LOGGER.error("No publish topic found for device %s", device_id)
+            return False
         
-        # Publish to MQTT
         try:
             payload = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
-            _LOGGER.debug("Publishing temperature command to %s: %s", pub_topic, payload)
+            _LOGGER.debug("Publishing %s command to %s: %s", action, pub_topic, payload)
             
-            result = await self.hass.async_add_executor_job(
-                self.mqtt_client.publish, pub_topic, payload, 1
-            )
+            result = await self._async_publish(pub_topic, payload)
             
             if result.rc == 0:
-                _LOGGER.debug("✅ Temperature command published successfully")
+                _LOGGER.debug("✅ %s command published successfully", action)
                 return True
             else:
-                _LOGGER.error("❌ Failed to publish temperature command: %s", result.rc)
+                _LOGGER.error("❌ Failed to publish %s command: %s", action, result.rc)
                 return False
         except Exception as err:
-            _LOGGER.error("Error publishing temperature command: %s", err)
+            _LOGGER.error("Error publishing %s command: %s", action, err)
             return False
 
+    async def async_set_probe_temperature(
+        self, device_id: str, device_type: str, probe_color: str, target_temperature: int
+    ) -> bool:
+        """Set target temperature for a probe via MQTT.
+        
+        Args:
+            device_id: Device ID
+            device_type: Device model (e.g., "WT02")
+            probe_color: Probe color ("bright" or "dark")
+            target_temperature: Target temperature in tenths of degrees F (e.g., 650 = 65.0°F)
+        
+        Returns:
+            True if command was published successfully
+        """
+        return await self._async_send_probe_control(
+            device_id, device_type, probe_color, PROBE_ACTION_SET, target_temperature
+        )
+
     async def async_start_cooking(
         self, device_id: str, device_type: str, probe_color: str, target_temperature: int
     ) -> bool:
@@ -504,58 +909,9 @@ class ThermoMavenAPI:
         Returns:
             True if command was published successfully
         """
-        if not self.mqtt_client:
-            _LOGGER.error("MQTT client not initialized")
-            return False
-        
-        pub_topic = self._get_device_pub_topic(device_id)
-        if not pub_topic:
-            _LOGGER.error("No publish topic found for device %s", device_id)
-            return False
-        
-        # Generate cook UUID
-        cook_uuid = str(uuid.uuid4())
-        
-        cmd_data = {
-            "probeColor": probe_color,
-            "cookingAction": 1,  # 1 = start
-            "cookUuid": cook_uuid,
-            "startClient": "android",
-            "cookingState": "cooking",
-            "setParams": [
-                {
-                    "setTemperature": target_temperature
-                }
-            ]
-        }
-        
-        message = {
-            "cmdType": "WT:probe:control",
-            "cmdData": cmd_data,
-            "cmdId": str(uuid.uuid4()).replace("-", ""),
-            "deviceId": device_id,
-            "deviceType": device_type,
-            "userId": str(self.user_id),
-            "appVersion": "1804"
-        }
-        
-        try:
-            payload = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
-            _LOGGER.debug("Publishing start cooking command to %s", pub_topic)
-            
-            result = await self.hass.async_add_executor_job(
-                self.mqtt_client.publish, pub_topic, payload, 1
-            )
-            
-            if result.rc == 0:
-                _LOGGER.debug("✅ Start cooking command published successfully")
-                return True
-            else:
-                _LOGGER.error("❌ Failed to publish start cooking command: %s", result.rc)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error publishing start cooking command: %s", err)
-            return False
+        return await self._async_send_probe_control(
+            device_id, device_type, probe_color, PROBE_ACTION_START, target_temperature
+        )
 
     async def async_stop_cooking(
         self, device_id: str, device_type: str, probe_color: str
@@ -570,51 +926,181 @@ class ThermoMavenAPI:
         Returns:
             True if command was published successfully
         """
-        if not self.mqtt_client:
-            _LOGGER.error("MQTT client not initialized")
-            return False
+        return await self._async_send_probe_control(
+            device_id, device_type, probe_color, PROBE_ACTION_STOP
+        )
+
+    async def async_send_confirmed_probe_command(
+        self,
+        device_id: str,
+        device_type: str,
+        probe_num: int,
+        action: str,
+        target_temperature: int | None = None,
+        timeout: float = COMMAND_CONFIRM_TIMEOUT,
+        retries: int = COMMAND_MAX_RETRIES,
+    ) -> bool:
+        """Send a probe control command and wait until the device reports it applied.
         
-        pub_topic = self._get_device_pub_topic(device_id)
-        if not pub_topic:
-            _LOGGER.error("No publish topic found for device %s", device_id)
-            return False
+        The command is re-sent with exponential backoff if no matching status:report
+        arrives within `timeout`. A newer command for the same probe supersedes it.
         
-        cmd_data = {
-            "probeColor": probe_color,
-            "cookingAction": 2,  # 2 = stop/pause
-            "cookingState": "ready"
-        }
+        Args:
+            probe_num: Probe number (1-based); odd probes are "bright", even "dark"
         
-        message = {
-            "cmdType": "WT:probe:control",
-            "cmdData": cmd_data,
-            "cmdId": str(uuid.uuid4()).replace("-", ""),
-            "deviceId": device_id,
-            "deviceType": device_type,
-            "userId": str(self.user_id),
-            "appVersion": "1804"
-        }
+        Returns:
+            True if the device confirmed the command, False on failure or supersession
+        """
+        device_id = str(device_id)
+        # La commande ne porte que la couleur: les sondes 1 et 3 d'un WT09 la partagent
+        probe_color = PROBE_COLORS[(probe_num - 1) % 2]
+        key = (device_id, probe_num)
+        previous = self._pending_commands.get(key)
+        if previous is not None and not previous.future.done():
+            previous.future.set_result(False)  # Remplacée par la nouvelle commande
         
+        pending = PendingCommand(
+            action=action,
+            target_temperature=target_temperature,
+            future=self.hass.loop.create_future(),
+        )
+        self._pending_commands[key] = pending
+        # Message construit une seule fois: les renvois gardent le même cmdId (et cookUuid)
+        message = self._build_probe_control(
+            device_id, device_type, probe_color, action, target_temperature
+        )
         try:
-            payload = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
-            _LOGGER.debug("Publishing stop cooking command to %s", pub_topic)
+            for attempt in range(retries + 1):
+                if not await self._async_publish_probe_control(device_id, action, message):
+                    return False
+                
+                try:
+                    return await asyncio.wait_for(asyncio.shield(pending.future), timeout)
+                except asyncio.TimeoutError:
+                    if attempt == retries:
+                        break
+                    delay = COMMAND_RETRY_BASE_DELAY * 2 ** attempt
+                    _LOGGER.warning(
+                        "No confirmation of %s command for device %s (probe %d) after %ss, retrying in %ss",
+                        action, device_id, probe_num, timeout, delay,
+                    )
+                    await asyncio.sleep(delay)
+                    if pending.future.done():
+                        return pending.future.result()
             
-            result = await self.hass.async_add_executor_job(
-                self.mqtt_client.publish, pub_topic, payload, 1
+            _LOGGER.error(
+                "❌ %s command for device %s (probe %d) not confirmed after %d attempts",
+                action, device_id, probe_num, retries + 1,
             )
-            
-            if result.rc == 0:
-                _LOGGER.debug("✅ Stop cooking command published successfully")
-                return True
-            else:
-                _LOGGER.error("❌ Failed to publish stop cooking command: %s", result.rc)
-                return False
-        except Exception as err:
-            _LOGGER.error("Error publishing stop cooking command: %s", err)
             return False
+        finally:
+            if self._pending_commands.get(key) is pending:
+                del self._pending_commands[key]
+
+    @callback
+    def async_confirm_probe_commands(self, device_id: str, report: dict) -> None:
+        """Resolve the pending commands of a device that a status:report confirms."""
+        if not self._pending_commands:
+            return
+        probes = (report.get("cmdData") or {}).get("probes") or ()
+        for probe_num, probe in enumerate(probes, start=1):
+            pending = self._pending_commands.get((device_id, probe_num))
+            if pending is not None and not pending.future.done() and pending.matches(probe):
+                _LOGGER.debug("✅ %s command confirmed by device %s (probe %d)",
+                              pending.action, device_id, probe_num)
+                pending.future.set_result(True)
+
+    async def async_send_probe_commands(
+        self, commands: list[tuple[str, str, str, int | None]], timeout: float = PUBLISH_ACK_TIMEOUT
+    ) -> list[bool]:
+        """Send several probe control commands in one publish burst.
+        
+        Args:
+            commands: (device_id, probe_color, action, setTemperature) tuples, the
+                temperature in tenths of degrees F (ignored for "stop")
+            timeout: Seconds to wait for the broker acknowledgements (PUBACK)
+        
+        Returns:
+            One result per command, True once the broker acknowledged it
+        """
+        if not self.mqtt_client:
+            _LOGGER.error("MQTT client not initialized")
+            return [False] * len(commands)
+        
+        # Construire tous les messages avant de publier (aucune attente entre deux publications)
+        results = [False] * len(commands)
+        outgoing = []  # (index, topic, payload)
+        for index, (device_id, probe_color, action, target_temperature) in enumerate(commands):
+            device_id = str(device_id)
+            pub_topic = self._get_device_pub_topic(device_id)
+            if not pub_topic:
+                _LOGGER.error("No publish topic found for device %s", device_id)
+                continue
+            device = self.coordinator.get_device(device_id) if self.coordinator else None
+            device_type = (device or {}).get("deviceModel", "WT02")
+            message = self._build_probe_control(
+                device_id, device_type, probe_color, action, target_temperature
+            )
+            outgoing.append(
+                (index, pub_topic, json.dumps(message, separators=(",", ":"), ensure_ascii=False))
+            )
+        
+        if not outgoing:
+            return results
+        
+        _LOGGER.debug("Publishing %d probe commands in one burst", len(outgoing))
+        infos = await self._async_publish_many([(topic, payload) for _, topic, payload in outgoing])
+        
+        acks = await self._async_wait_for_publish_acks(infos, timeout)
+        for (index, _, _), acked in zip(outgoing, acks):
+            results[index] = acked
+            if not acked:
+                _LOGGER.error("❌ Probe command %d (%s) not acknowledged by the broker",
+                              index, commands[index][2])
+        return results
+
+    async def _async_publish_many(self, messages: list[tuple[str, str]], qos: int = 1):
+        """Publish several messages back to back, return their MQTTMessageInfo."""
+        if self._mqtt_mode == MQTT_MODE_ASYNCIO:
+            return [self.mqtt_client.publish(topic, payload, qos) for topic, payload in messages]
+        return await self.hass.async_add_executor_job(
+            lambda: [self.mqtt_client.publish(topic, payload, qos) for topic, payload in messages]
+        )
+
+    async def _async_wait_for_publish_acks(self, infos, timeout: float) -> list[bool]:
+        """Wait (at most `timeout` for the whole batch) for the PUBACK of each publish."""
+        waiting = {}
+        for info in infos:
+            if info.rc == mqtt.MQTT_ERR_SUCCESS and not info.is_published():
+                future = self.hass.loop.create_future()
+                self._pending_publishes[info.mid] = future
+                waiting[info.mid] = future
+        
+        if waiting:
+            await asyncio.wait(waiting.values(), timeout=timeout)
+            for mid in waiting:
+                self._pending_publishes.pop(mid, None)
+        
+        # is_published() couvre un PUBACK traité par le thread paho avant l'enregistrement du future
+        return [
+            info.rc == mqtt.MQTT_ERR_SUCCESS
+            and (info.is_published() or (info.mid in waiting and waiting[info.mid].done()))
+            for info in infos
+        ]
+
+    def _on_mqtt_publish(self, client, userdata, mid):
+        """Handle a broker acknowledgement (PUBACK) of a QoS 1 publish."""
+        self._run_in_loop(self._async_resolve_publish, mid)
+
+    @callback
+    def _async_resolve_publish(self, mid: int) -> None:
+        """Resolve the future waiting for a publish acknowledgement."""
+        future = self._pending_publishes.pop(mid, None)
+        if future is not None and not future.done():
+            future.set_result(True)
 
     def _get_device_pub_topic(self, device_id: str) -> str | None:
-        """Get the publish topic for a device from MQTT device list.
+        """Get the publish topic for a device from the topic index.
         
         Args:
             device_id: Device ID
@@ -622,55 +1108,62 @@ class ThermoMavenAPI:
         Returns:
             Publish topic string or None if not found
         """
-        if not self._latest_mqtt_data:
-            _LOGGER.warning("No MQTT data available for pub topic detection")
-            return None
+        pub_topic = self._device_pub_topics.get(str(device_id))
+        if pub_topic is None:
+            _LOGGER.warning("No pubTopic known for device %s (device list not received yet)", device_id)
+        return pub_topic
+
+    @staticmethod
+    def _derive_pub_topic(device: dict) -> str | None:
+        """Return the command topic of a device entry from the device list."""
+        # Check for pubTopics first
+        pub_topics = device.get("pubTopics")
+        if pub_topics:
+            return pub_topics[0]
         
-        # Check if we have device list data
-        if self._latest_mqtt_data.get("cmdType") == "user:device:list":
-            cmd_data = self._latest_mqtt_data.get("cmdData", {})
-            devices = cmd_data.get("devices", [])
-            
-            for device in devices:
-                if str(device.get("deviceId")) == str(device_id):
-                    # Check for pubTopics first
-                    pub_topics = device.get("pubTopics", [])
-                    if pub_topics:
-                        _LOGGER.debug("Found pubTopic for device %s: %s", device_id, pub_topics[0])
-                        return pub_topics[0]
-                    
-                    # Fallback: construct from subTopic pattern
-                    sub_topics = device.get("subTopics", [])
-                    if sub_topics:
-                        # Format: app/WT10/216510650012434433/sub → app/WT10/216510650012434433/pub
-                        sub_topic = sub_topics[0]
-                        pub_topic = sub_topic.replace("/sub", "/pub")
-                        _LOGGER.debug("Constructed pubTopic from subTopic for device %s: %s", device_id, pub_topic)
-                        return pub_topic
-                    
-                    # Last fallback: device model pattern
-                    device_model = device.get("deviceModel")
-                    if device_model:
-                        pub_topic = f"app/{device_model}/{device_id}/pub"
-                        _LOGGER.debug("Constructed pubTopic from model for device %s: %s", device_id, pub_topic)
-                        return pub_topic
-        
-        # Ultimate fallback: standard format (may not work for all models)
-        fallback_topic = f"app/device/{device_id}/pub"
-        _LOGGER.warning("Using fallback pubTopic for device %s: %s", device_id, fallback_topic)
-        return fallback_topic
+        # Fallback: construct from subTopic pattern
+        # Format: app/WT10/216510650012434433/sub → app/WT10/216510650012434433/pub
+        sub_topics = device.get("subTopics")
+        if sub_topics:
+            return sub_topics[0].replace("/sub", "/pub")
+        
+        # Last fallback: device model pattern
+        device_id = device.get("deviceId")
+        device_model = device.get("deviceModel")
+        if device_id and device_model:
+            return f"app/{device_model}/{device_id}/pub"
+        return None
+
+    def _index_device_topics(self, devices: list[dict]) -> None:
+        """Record the sub topics and the deviceId -> pubTopic index of devices."""
+        for device in devices:
+            self._device_sub_topics.update(device.get("subTopics") or ())
+            device_id = device.get("deviceId")
+            pub_topic = self._derive_pub_topic(device)
+            if device_id and pub_topic:
+                self._device_pub_topics[str(device_id)] = pub_topic
 
     async def async_disconnect_mqtt(self):
         """Disconnect MQTT client."""
-        if self.mqtt_client:
-            await self.hass.async_add_executor_job(self.mqtt_client.disconnect)
-            await self.hass.async_add_executor_job(self.mqtt_client.loop_stop)
+        self._mqtt_stopping = True
+        for pending in self._pending_commands.values():
+            if not pending.future.done():
+                pending.future.set_result(False)
+        if self._mqtt_reconnect_task is not None:
+            self._mqtt_reconnect_task.cancel()
+            self._mqtt_reconnect_task = None
+        if self._mqtt_misc_unsub is not None:
+            self._mqtt_misc_unsub()
+            self._mqtt_misc_unsub = None
         
-        # Clean up certificate files
-        for file_path in self.cert_files:
-            try:
-                import os
-                os.unlink(file_path)
-            except Exception:
-                pass
+        if self.mqtt_client:
+            if self._mqtt_mode == MQTT_MODE_ASYNCIO:
+                self.mqtt_client.disconnect()
+                # Envoyer le DISCONNECT tout de suite, paho ferme ensuite le socket
+                self.mqtt_client.loop_write()
+                self._mqtt_sock = None
+                self._async_sync_mqtt_watchers()
+            else:
+                await self.hass.async_add_executor_job(self.mqtt_client.disconnect)
+                await self.hass.async_add_executor_job(self.mqtt_client.loop_stop)
 
@@ -0,0 +1,11 @@
+"""Shared test setup: Home Assistant is replaced by the benchmarks' stub."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, os.path.join(ROOT, "custom_components"))
+
+import ha_stub  # noqa: E402
+
+ha_stub.install()
@@ -0,0 +1,115 @@
+"""Tests for the local cooking history index."""
+import asyncio
+
+import ha_stub
+import pytest
+
+from thermomaven.const import HISTORY_PAGE_SIZE
+from thermomaven.cook_history import CookHistoryStore
+from thermomaven.thermomaven_api import ThermoMavenAPI
+
+
+def _api(records: list[dict], fail_at: int | None = None, token: str | None = "token") -> ThermoMavenAPI:
+    """Real API whose /app/history/page requests are served from `records` (newest first).
+
+    `fail_at` makes that page number get an error response. `api.requested`
+    lists the page numbers requested.
+    """
+    api = ThermoMavenAPI(None, "test@example.com", "test", "app_key", "app_id")
+    api.token = token
+    api.requested = []
+
+    async def _async_request(method, endpoint, body, timeout=None):
+        assert endpoint == "/app/history/page"
+        current, size = body["current"], body["size"]
+        api.requested.append(current)
+        if current == fail_at:
+            return {"code": "500", "msg": "server error"}
+        page = records[(current - 1) * size:current * size]
+        return {"code": "0", "data": {"records": page, "total": len(records)}}
+
+    api._async_request = _async_request
+    return api
+
+
+def _records(first: int, count: int) -> list[dict]:
+    """Records numbered `first` down, newest first."""
+    return [
+        {"historyId": number, "deviceId": 1, "startTime": 1_700_000_000 + number}
+        for number in range(first, first - count, -1)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    hass = ha_stub.HomeAssistant(None, str(tmp_path))
+    return CookHistoryStore(hass, "entry")
+
+
+def _sync(store: CookHistoryStore, api: ThermoMavenAPI) -> int:
+    """Run one sync on a fresh event loop."""
+    async def run():
+        store.hass.loop = asyncio.get_running_loop()
+        return await store.async_sync(api)
+
+    return asyncio.run(run())
+
+
+def test_short_last_page_marks_complete(store):
+    assert _sync(store, _api(_records(30, 30))) == 30
+    assert store.is_complete()
+    assert len(store.sessions("1")) == 30
+
+
+def test_exact_multiple_of_the_page_size_marks_complete(store):
+    # 40 enregistrements: deux pages pleines puis une page vide terminale
+    api = _api(_records(2 * HISTORY_PAGE_SIZE, 2 * HISTORY_PAGE_SIZE))
+    assert _sync(store, api) == 40
+    assert api.requested == [1, 2, 3]
+    assert store.is_complete()
+
+    # Synchronisations suivantes: seule la première page est relue
+    api = _api(_records(2 * HISTORY_PAGE_SIZE, 2 * HISTORY_PAGE_SIZE))
+    assert _sync(store, api) == 0
+    assert api.requested == [1]
+
+
+def test_sync_stopped_on_a_full_page_is_not_complete(store):
+    # Erreur sur la page vide terminale: rien ne prouve que la page 2 était la dernière
+    with pytest.raises(Exception, match="page 3"):
+        _sync(store, _api(_records(40, 40), fail_at=3))
+    assert not store.is_complete()
+
+
+def test_empty_history_marks_complete(store):
+    assert _sync(store, _api([])) == 0
+    assert store.is_complete()
+
+
+def test_failed_page_is_not_complete(store):
+    with pytest.raises(Exception, match="page 2"):
+        _sync(store, _api(_records(30, 30), fail_at=2))
+    assert not store.is_complete()
+    assert len(store.sessions("1")) == HISTORY_PAGE_SIZE
+
+
+def test_not_logged_in_skips_the_sync(store):
+    api = _api(_records(5, 5), token=None)
+    assert _sync(store, api) == 0
+    assert api.requested == []
+    assert not store.is_complete()
+
+
+def test_incomplete_history_pages_past_known_records(store):
+    with pytest.raises(Exception):
+        _sync(store, _api(_records(30, 30), fail_at=2))
+    # Relance: la première page est connue mais la suite manque encore
+    assert _sync(store, _api(_records(30, 30))) == 10
+    assert store.is_complete()
+
+
+def test_complete_history_stops_at_the_first_known_record(store):
+    _sync(store, _api(_records(30, 30)))
+    api = _api(_records(35, 35))
+    assert _sync(store, api) == 5
+    assert api.requested == [1]
@@ -0,0 +1,147 @@
+"""Tests for the coordinator's incremental device table."""
+import asyncio
+
+import ha_stub
+
+from thermomaven import ThermoMavenDataUpdateCoordinator, _async_try_reconcile
+from thermomaven.thermomaven_api import ThermoMavenAPI
+
+
+def _device(device_id: str, name: str, **fields) -> dict:
+    return {"deviceId": device_id, "deviceName": name, "deviceModel": "WT09", **fields}
+
+
+def _report(device_id: str, tip: int) -> dict:
+    return {
+        "cmdType": "WT09:status:report",
+        "deviceId": device_id,
+        "cmdData": {"globalStatus": "online", "probes": [{"curTemperature": tip}]},
+    }
+
+
+def _run(tmp_path, test):
+    """Run `test(coordinator, api)` with a coordinator on a stub Home Assistant."""
+    async def run():
+        hass = ha_stub.HomeAssistant(asyncio.get_running_loop(), str(tmp_path))
+        api = ThermoMavenAPI(hass, "test@example.com", "test", "app_key", "app_id")
+        coordinator = ThermoMavenDataUpdateCoordinator(hass, api, "entry", flush_window=0)
+        api.coordinator = coordinator
+        try:
+            await test(coordinator, api)
+        finally:
+            coordinator.async_cancel_pending_reports()
+            await coordinator.sessions.async_stop()
+            await hass.async_block_till_done()
+
+    asyncio.run(run())
+
+
+def test_device_list_merges_rows_in_place(tmp_path):
+    async def test(coordinator, api):
+        coordinator.async_apply_device_list([_device("1", "Grill", firmwareVersion="1.0")])
+        row = coordinator.get_device("1")
+        coordinator.async_apply_device_list([_device("1", "Grill", firmwareVersion="1.1")])
+        assert coordinator.get_device("1") is row
+        assert row["firmwareVersion"] == "1.1"
+        assert coordinator.data["devices_by_id"]["1"] is row
+
+    _run(tmp_path, test)
+
+
+def test_unlisted_devices_are_removed(tmp_path):
+    async def test(coordinator, api):
+        coordinator.async_apply_device_list([_device("1", "Grill"), _device("2", "Smoker")])
+        coordinator.async_handle_status_report(_report("2", 700))
+        assert coordinator.history.probe("2", 1) is not None
+
+        coordinator.async_apply_device_list([_device("1", "Grill")])
+        assert set(coordinator.data["devices_by_id"]) == {"1"}
+        assert coordinator.get_status("2") is None
+        assert coordinator.history.probe("2", 1) is None
+
+    _run(tmp_path, test)
+
+
+def test_pushed_report_wins_over_the_listed_status(tmp_path):
+    async def test(coordinator, api):
+        coordinator.async_apply_device_list([_device("1", "Grill", lastStatusCmd=_report("1", 700))])
+        assert coordinator.get_status("1").probe(1).temperature_f == 70.0
+
+        coordinator.async_handle_status_report(_report("1", 900))
+        assert coordinator.get_status("1").probe(1).temperature_f == 90.0
+        # Liste plus ancienne que le rapport reçu en direct
+        coordinator.async_apply_device_list([_device("1", "Grill", lastStatusCmd=_report("1", 700))])
+        assert coordinator.get_status("1").probe(1).temperature_f == 90.0
+
+    _run(tmp_path, test)
+
+
+def test_api_devices_without_id_matched_by_name(tmp_path):
+    async def test(coordinator, api):
+        coordinator.async_apply_device_list([_device("1", "Grill")])
+        coordinator._apply_api_devices([
+            {"deviceId": None, "deviceName": "Grill", "deviceShareId": "s1", "fromUserName": "bob"},
+            {"deviceId": None, "deviceName": "Unknown"},
+        ])
+        row = coordinator.get_device("1")
+        assert row["deviceShareId"] == "s1"
+        assert row["fromUserName"] == "bob"
+        assert set(coordinator.data["devices_by_id"]) == {"1"}
+
+    _run(tmp_path, test)
+
+
+def test_api_metadata_applied_to_devices_listed_later(tmp_path):
+    async def test(coordinator, api):
+        coordinator._apply_api_devices([{"deviceId": None, "deviceName": "Smoker", "shareStatus": 1}])
+        coordinator.async_apply_device_list([_device("2", "Smoker")])
+        assert coordinator.get_device("2")["shareStatus"] == 1
+
+    _run(tmp_path, test)
+
+
+def test_unknown_device_report_syncs_the_device_list_once(tmp_path):
+    async def test(coordinator, api):
+        calls = []
+
+        async def async_get_devices():
+            calls.append(1)
+            return [_device("3", "New")]
+
+        api.async_get_devices = async_get_devices
+        for tip in range(5):
+            coordinator.async_handle_status_report(_report("3", 700 + tip))
+        await coordinator.hass.async_block_till_done()
+
+        assert calls == [1]
+        assert coordinator.get_device("3") is not None
+
+    _run(tmp_path, test)
+
+
+def test_reconcile_retry_skips_mqtt_when_already_connected(tmp_path):
+    async def test(coordinator, api):
+        calls = []
+
+        async def login():
+            calls.append("login")
+
+        async def setup_mqtt(coordinator):
+            raise AssertionError("MQTT set up again")
+
+        async def refresh():
+            calls.append("refresh")
+            coordinator.last_update_success = True
+
+        api.async_login = login
+        api.async_setup_mqtt = setup_mqtt
+        api.mqtt_client = type("Client", (), {"is_connected": lambda self: True})()
+        api._mqtt_device_list_event.set()
+        coordinator.async_refresh = refresh
+
+        assert await _async_try_reconcile(api, coordinator, 0.0) is True
+        assert calls == ["login", "refresh"]
+        # L'attente de la liste d'appareils n'a pas été réarmée
+        assert api._mqtt_device_list_event.is_set()
+
+    _run(tmp_path, test)
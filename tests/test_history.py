@@ -0,0 +1,96 @@
+"""Tests for the rolling temperature history."""
+import random
+
+import pytest
+
+from thermomaven.history import RingBuffer, TemperatureHistory
+
+
+def _least_squares(times: list[float], values: list[int]) -> float | None:
+    count = len(times)
+    if count < 2:
+        return None
+    mean_x = sum(times) / count
+    mean_y = sum(values) / count
+    var_x = sum((x - mean_x) ** 2 for x in times)
+    if not var_x:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(times, values)) / var_x
+
+
+def _samples(buffer: RingBuffer, since: float = float("-inf")) -> tuple[list[float], list[int]]:
+    """Return the samples newer than `since`, oldest first."""
+    size = len(buffer._times)
+    indexes = [(buffer._next - len(buffer) + offset) % size for offset in range(len(buffer))]
+    indexes = [index for index in indexes if buffer._times[index] >= since]
+    return [buffer._times[index] for index in indexes], [buffer._values[index] for index in indexes]
+
+
+def test_empty_buffer():
+    buffer = RingBuffer(4)
+    assert len(buffer) == 0
+    assert _samples(buffer) == ([], [])
+    assert buffer.rate() is None
+
+
+def test_wrap_around_keeps_newest_samples_in_order():
+    buffer = RingBuffer(4)
+    for second in range(10):
+        buffer.append(float(second), second * 10)
+    assert len(buffer) == 4
+    assert _samples(buffer) == ([6.0, 7.0, 8.0, 9.0], [60, 70, 80, 90])
+
+
+def test_values_clamped_to_int16():
+    buffer = RingBuffer(2)
+    buffer.append(0.0, 100000)
+    buffer.append(1.0, -100000)
+    assert _samples(buffer)[1] == [32767, -32767]
+
+
+def test_rate_of_a_linear_ramp():
+    buffer = RingBuffer(10, rate_window=100)
+    for second in range(5):
+        buffer.append(1000.0 + second, 700 + 3 * second)
+    assert buffer.rate() == pytest.approx(3.0)
+
+
+def test_rate_with_identical_timestamps():
+    buffer = RingBuffer(10)
+    buffer.append(5.0, 700)
+    buffer.append(5.0, 710)
+    assert buffer.rate() is None
+
+
+@pytest.mark.parametrize("size, rate_window", [(8, 5), (50, 30), (20, 1000)])
+def test_running_rate_matches_a_full_fit(size, rate_window):
+    rng = random.Random(size)
+    buffer = RingBuffer(size, rate_window=rate_window)
+    timestamp = 1.7e9
+    for _ in range(500):
+        timestamp += rng.choice([0.5, 1, 2, 7])
+        buffer.append(timestamp, rng.randint(-500, 3000))
+        expected = _least_squares(*_samples(buffer, timestamp - rate_window))
+        if expected is None:
+            assert buffer.rate() is None
+        else:
+            assert buffer.rate() == pytest.approx(expected, rel=1e-6, abs=1e-9)
+
+
+def test_temperature_history_record_and_forget():
+    history = TemperatureHistory(size=8)
+    report = {"cmdData": {"probes": [
+        {"curTemperature": 700, "areaTemperature": [700, 800]},
+        {"curTemperature": None, "areaTemperature": []},
+    ]}}
+    history.record("1", 10.0, report)
+    history.record("2", 10.0, report)
+
+    probe = history.probe("1", 1)
+    assert _samples(probe.temperature) == ([10.0], [700])
+    assert [len(area) for area in probe.areas] == [1, 1]
+    assert len(history.probe("1", 2).temperature) == 0
+
+    history.forget("1")
+    assert history.probe("1", 1) is None
+    assert history.probe("2", 1) is not None
@@ -0,0 +1,49 @@
+"""Tests for the status report helpers."""
+from thermomaven.models import merge_status_reports
+
+
+def _report(cmd_data: dict, **fields) -> dict:
+    return {"cmdType": "WT09:status:report", "deviceId": "1", **fields, "cmdData": cmd_data}
+
+
+def test_newer_fields_win():
+    merged = merge_status_reports(
+        _report({"batteryValue": 90, "wifiRssi": -60}, seq=1),
+        _report({"batteryValue": 85}, seq=2),
+    )
+    assert merged["seq"] == 2
+    assert merged["cmdData"] == {"batteryValue": 85, "wifiRssi": -60}
+
+
+def test_probes_merged_entry_by_entry():
+    older = _report({"probes": [
+        {"curTemperature": 700, "batteryValue": 90},
+        {"curTemperature": 800, "batteryValue": 80},
+    ]})
+    newer = _report({"probes": [{"curTemperature": 710}]})
+    probes = merge_status_reports(older, newer)["cmdData"]["probes"]
+    assert probes == [
+        {"curTemperature": 710, "batteryValue": 90},
+        {"curTemperature": 800, "batteryValue": 80},
+    ]
+
+
+def test_new_probes_appended():
+    older = _report({"probes": [{"curTemperature": 700}]})
+    newer = _report({"probes": [{"curTemperature": 701}, {"curTemperature": 900}]})
+    probes = merge_status_reports(older, newer)["cmdData"]["probes"]
+    assert probes == [{"curTemperature": 701}, {"curTemperature": 900}]
+
+
+def test_missing_cmd_data_keeps_previous_values():
+    older = _report({"globalStatus": "online", "probes": [{"curTemperature": 700}]})
+    merged = merge_status_reports(older, {"deviceId": "1"})
+    assert merged["cmdData"] == older["cmdData"]
+
+
+def test_inputs_not_modified():
+    older = _report({"probes": [{"curTemperature": 700}]})
+    newer = _report({"probes": [{"curTemperature": 710}]})
+    merge_status_reports(older, newer)
+    assert older["cmdData"]["probes"] == [{"curTemperature": 700}]
+    assert newer["cmdData"]["probes"] == [{"curTemperature": 710}]
@@ -0,0 +1,188 @@
+"""Tests for the MQTT socket driving, over a loopback broker or a fake client."""
+import asyncio
+import json
+import socket
+import time
+
+import ha_stub
+import pytest
+from mqtt_broker import LoopbackBroker
+from traffic import Traffic
+
+from thermomaven import ThermoMavenDataUpdateCoordinator, thermomaven_api
+from thermomaven.const import MQTT_MODE_ASYNCIO, MQTT_MODE_THREAD, MQTT_RECONNECT_MAX_DELAY
+from thermomaven.models import DeviceStatus
+from thermomaven.thermomaven_api import ThermoMavenAPI
+
+
+class _FlakyClient:
+    """paho client whose reconnect() fails `failures` times, then opens `sock`."""
+
+    def __init__(self, api: ThermoMavenAPI, failures: int, sock: socket.socket) -> None:
+        self.api = api
+        self.failures = failures
+        self.sock = sock
+        self.calls = 0
+        self.watched_during = []
+
+    def reconnect(self):
+        self.calls += 1
+        self.watched_during.append(self.api._mqtt_watched)
+        if self.calls <= self.failures:
+            raise OSError("Connection refused")
+        self.api._on_mqtt_socket_open(self, None, self.sock)
+
+    def disconnect(self):
+        pass
+
+    def loop_write(self):
+        pass
+
+
+async def _wait_for(predicate, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+def _api(tmp_path, mqtt_mode: str = MQTT_MODE_ASYNCIO) -> ThermoMavenAPI:
+    hass = ha_stub.HomeAssistant(asyncio.get_running_loop(), str(tmp_path))
+    return ThermoMavenAPI(hass, "test@example.com", "test", "app_key", "app_id", mqtt_mode=mqtt_mode)
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    with LoopbackBroker() as broker:
+        broker.patch_api(thermomaven_api, monkeypatch.setattr)
+        yield broker
+
+
+async def _async_connect(api: ThermoMavenAPI, broker: LoopbackBroker) -> None:
+    api.mqtt_config = {"clientId": "test", "subTopics": ["app/user/sub"]}
+    api._mqtt_device_list_received = True  # pas de synchro REST à la connexion
+    await api._async_start_mqtt(broker.client_material)
+    await _wait_for(api.mqtt_client.is_connected)
+
+
+def test_reconnect_backs_off_exponentially_up_to_the_cap(tmp_path, monkeypatch):
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        api = _api(tmp_path)
+        old, old_peer = socket.socketpair()
+        new, new_peer = socket.socketpair()
+        try:
+            api.mqtt_client = client = _FlakyClient(api, failures=8, sock=new)
+            api._on_mqtt_socket_open(client, None, old)
+            assert api._mqtt_watched[0] is old
+
+            monkeypatch.setattr(asyncio, "sleep", sleep)
+            await api._async_mqtt_reconnect()
+            monkeypatch.undo()
+
+            assert delays == [1, 2, 4, 8, 16, 32, MQTT_RECONNECT_MAX_DELAY,
+                              MQTT_RECONNECT_MAX_DELAY, MQTT_RECONNECT_MAX_DELAY]
+            assert client.calls == 9
+            # La boucle lâche le socket pendant chaque reconnect() dans l'executor
+            assert client.watched_during == [None] * 9
+            assert not api._mqtt_connecting
+            assert api._mqtt_watched[0] is new
+            assert not loop.remove_reader(old.fileno())
+            assert loop.remove_reader(new.fileno())
+        finally:
+            for sock in (old, old_peer, new, new_peer):
+                sock.close()
+
+    asyncio.run(run())
+
+
+def test_disconnect_stops_the_reconnect_backoff(tmp_path, monkeypatch):
+    real_sleep = asyncio.sleep
+
+    async def run():
+        monkeypatch.setattr(asyncio, "sleep", lambda delay: real_sleep(0))
+        api = _api(tmp_path)
+        sock, peer = socket.socketpair()
+        try:
+            api.mqtt_client = client = _FlakyClient(api, failures=1000, sock=sock)
+            api._on_mqtt_disconnect(client, None, 7)
+            task = api._mqtt_reconnect_task
+            await _wait_for(lambda: client.calls >= 3)
+
+            await api.async_disconnect_mqtt()
+            await asyncio.wait([task])
+            monkeypatch.undo()
+
+            assert task.cancelled()
+            assert api._mqtt_reconnect_task is None
+            calls = client.calls
+            await real_sleep(0.05)
+            assert client.calls == calls
+            # Plus de nouvelle tentative après un arrêt demandé
+            api._on_mqtt_disconnect(client, None, 7)
+            assert api._mqtt_reconnect_task is None
+        finally:
+            sock.close()
+            peer.close()
+
+    asyncio.run(run())
+
+
+def test_disconnect_removes_the_socket_watchers(tmp_path, broker):
+    async def run():
+        loop = asyncio.get_running_loop()
+        api = _api(tmp_path)
+        await _async_connect(api, broker)
+        sock, fd, _writing = api._mqtt_watched
+        assert sock is api.mqtt_client.socket()
+        assert api._mqtt_misc_unsub is not None
+
+        await api.async_disconnect_mqtt()
+
+        assert api._mqtt_watched is None
+        assert api._mqtt_misc_unsub is None
+        assert not loop.remove_reader(fd)
+        assert not loop.remove_writer(fd)
+        assert api.mqtt_client.socket() is None
+        await _wait_for(lambda: broker.clients == 0)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("mqtt_mode", [MQTT_MODE_ASYNCIO, MQTT_MODE_THREAD])
+def test_reports_reach_the_coordinator_over_the_socket(tmp_path, broker, mqtt_mode):
+    async def run():
+        api = _api(tmp_path, mqtt_mode)
+        coordinator = ThermoMavenDataUpdateCoordinator(api.hass, api, "entry", flush_window=0)
+        api.coordinator = coordinator
+        traffic = Traffic(2)
+        try:
+            await _async_connect(api, broker)
+            await broker.async_publish(*traffic.device_list())
+            await _wait_for(lambda: coordinator.get_device(traffic.devices[1]["deviceId"]) is not None)
+            # Les topics des appareils sont souscrits à la réception de la liste
+            await _wait_for(lambda: {
+                topic for device in traffic.devices for topic in device["subTopics"]
+            } <= broker.subscriptions)
+
+            reports = list(traffic.status_reports(20))
+            await broker.async_publish_many(reports)
+            last = {json.loads(payload)["deviceId"]: json.loads(payload) for _topic, payload in reports}
+            for device_id, report in last.items():
+                expected = DeviceStatus.from_payload(report)
+                await _wait_for(lambda: coordinator.get_status(device_id) == expected)
+        finally:
+            await api.async_disconnect_mqtt()
+            coordinator.async_cancel_pending_reports()
+            await coordinator.sessions.async_stop()
+            await api.hass.async_block_till_done()
+        await _wait_for(lambda: broker.clients == 0)
+
+    asyncio.run(run())
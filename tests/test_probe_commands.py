@@ -0,0 +1,94 @@
+"""Tests for the confirmed probe control commands."""
+import asyncio
+import json
+import types
+
+import ha_stub
+
+from thermomaven.const import PROBE_ACTION_SET
+from thermomaven.thermomaven_api import ThermoMavenAPI
+
+DEVICE_ID = "216510650012434433"
+
+
+class _MqttClient:
+    """Records the published payloads."""
+
+    def __init__(self) -> None:
+        self.published = []
+
+    def publish(self, topic, payload, qos=0):
+        self.published.append(json.loads(payload))
+        return types.SimpleNamespace(rc=0, mid=len(self.published))
+
+
+def _api(tmp_path) -> ThermoMavenAPI:
+    hass = ha_stub.HomeAssistant(asyncio.get_running_loop(), str(tmp_path))
+    api = ThermoMavenAPI(hass, "test@example.com", "test", "app_key", "app_id")
+    api.mqtt_client = _MqttClient()
+    api._index_device_topics([{"deviceId": DEVICE_ID, "pubTopics": [f"app/WT09/{DEVICE_ID}/pub"]}])
+    return api
+
+
+def _report(*set_temperatures) -> dict:
+    probes = [{"cookingState": "cooking", "setParams": [{"setTemperature": temperature}]}
+              for temperature in set_temperatures]
+    return {"deviceId": DEVICE_ID, "cmdData": {"probes": probes}}
+
+
+def _send(api: ThermoMavenAPI, probe_num: int, target: int) -> asyncio.Task:
+    return asyncio.get_running_loop().create_task(api.async_send_confirmed_probe_command(
+        DEVICE_ID, "WT09", probe_num, PROBE_ACTION_SET, target, timeout=5, retries=0,
+    ))
+
+
+def test_probes_sharing_a_color_do_not_supersede_each_other(tmp_path):
+    async def run():
+        api = _api(tmp_path)
+        probe_1 = _send(api, 1, 1500)
+        probe_3 = _send(api, 3, 1650)
+        await asyncio.sleep(0)
+        # Les deux sont "bright": seule la clé par numéro de sonde les distingue
+        assert [message["cmdData"]["probeColor"] for message in api.mqtt_client.published] == [
+            "bright", "bright",
+        ]
+        assert set(api.pending_commands()) == {(DEVICE_ID, 1), (DEVICE_ID, 3)}
+
+        api.async_confirm_probe_commands(DEVICE_ID, _report(1500, 700, 1650, 700))
+        assert await probe_1 is True
+        assert await probe_3 is True
+        assert not api.pending_commands()
+
+    asyncio.run(run())
+
+
+def test_report_confirms_only_the_probe_it_matches(tmp_path):
+    async def run():
+        api = _api(tmp_path)
+        probe_1 = _send(api, 1, 1500)
+        probe_3 = _send(api, 3, 1650)
+        await asyncio.sleep(0)
+
+        # La sonde 1 affiche la consigne envoyée à la sonde 3: rien n'est confirmé pour elle
+        api.async_confirm_probe_commands(DEVICE_ID, _report(1650, 700, 1650, 700))
+        assert await probe_3 is True
+        assert not probe_1.done()
+
+        api.async_confirm_probe_commands(DEVICE_ID, _report(1500, 700, 1650, 700))
+        assert await probe_1 is True
+
+    asyncio.run(run())
+
+
+def test_newer_command_for_the_same_probe_supersedes(tmp_path):
+    async def run():
+        api = _api(tmp_path)
+        first = _send(api, 3, 1500)
+        await asyncio.sleep(0)
+        second = _send(api, 3, 1650)
+        assert await first is False
+
+        api.async_confirm_probe_commands(DEVICE_ID, _report(700, 700, 1650, 700))
+        assert await second is True
+
+    asyncio.run(run())
@@ -0,0 +1,30 @@
+"""Tests for the set_probes service schema."""
+import pytest
+import voluptuous as vol
+
+from thermomaven import SET_PROBES_SCHEMA
+
+
+def _command(**fields) -> dict:
+    return {"device_id": "1", "probe_color": "bright", **fields}
+
+
+def test_valid_commands():
+    data = SET_PROBES_SCHEMA({"commands": [
+        _command(action="set", temperature="165"),
+        _command(action="stop"),
+    ]})
+    assert data["commands"][0]["temperature"] == 165.0
+    assert "temperature" not in data["commands"][1]
+
+
+@pytest.mark.parametrize("temperature", [31.9, 572.1, -40, 10000])
+def test_temperature_out_of_range(temperature):
+    with pytest.raises(vol.Invalid):
+        SET_PROBES_SCHEMA({"commands": [_command(action="start", temperature=temperature)]})
+
+
+@pytest.mark.parametrize("action", ["start", "set"])
+def test_temperature_required_by_start_and_set(action):
+    with pytest.raises(vol.Invalid):
+        SET_PROBES_SCHEMA({"commands": [_command(action=action)]})
@@ -0,0 +1,119 @@
+"""Tests for the binary cook session format."""
+import os
+
+import pytest
+
+from thermomaven import sessions
+from thermomaven.const import SESSION_AREAS, SESSION_MAX_AGE
+from thermomaven.sessions import _SessionWriter, _prune, _write, read_session
+
+START = 1_700_000_000.0
+
+
+def _probe(tip, ambient=None, areas=()):
+    return {"curTemperature": tip, "curAmbientTemperature": ambient, "areaTemperature": list(areas)}
+
+
+def _channels(tip, ambient, areas):
+    return [tip, ambient, *areas, *[0] * (SESSION_AREAS - len(areas))]
+
+
+def _save(tmp_path, writer) -> str:
+    return _write(str(tmp_path / "session.tmcs"), writer.take(), create=True)
+
+
+def test_round_trip(tmp_path):
+    writer = _SessionWriter(str(tmp_path / "session.tmcs"), 2, START)
+    writer.add(START + 1.0, [_probe(700, 2250, [700, 800, 900, 1000, 1100]), _probe(650, 2240)])
+    writer.add(START + 6.5, [_probe(-400, 2260, [710, 810, 910, 1010, 1110]), _probe(900, 2230)])
+
+    samples = list(read_session(_save(tmp_path, writer)))
+    assert [timestamp for timestamp, _ in samples] == [START + 1.0, START + 6.5]
+    assert samples[0][1] == tuple(
+        _channels(700, 2250, [700, 800, 900, 1000, 1100]) + _channels(650, 2240, [])
+    )
+    assert samples[1][1] == tuple(
+        _channels(-400, 2260, [710, 810, 910, 1010, 1110]) + _channels(900, 2230, [])
+    )
+
+
+def test_missing_values_repeat_the_previous_one(tmp_path):
+    writer = _SessionWriter(str(tmp_path / "session.tmcs"), 1, START)
+    writer.add(START + 1, [_probe(700, 2250, [700])])
+    writer.add(START + 2, [_probe(None, None, [])])
+    writer.add(START + 3, [])  # sonde absente du rapport
+
+    values = [channels for _, channels in read_session(_save(tmp_path, writer))]
+    assert values == [tuple(_channels(700, 2250, [700]))] * 3
+
+
+def test_large_jump_catches_up_on_the_next_sample(tmp_path):
+    writer = _SessionWriter(str(tmp_path / "session.tmcs"), 1, START)
+    writer.add(START + 1, [_probe(-30000)])
+    writer.add(START + 2, [_probe(30000)])  # delta hors int16: rattrapé au suivant
+    writer.add(START + 3, [_probe(30000)])
+
+    tips = [channels[0] for _, channels in read_session(_save(tmp_path, writer))]
+    assert tips == [-30000, 2767, 30000]
+
+
+def test_appended_flushes_and_truncated_record(tmp_path):
+    writer = _SessionWriter(str(tmp_path / "session.tmcs"), 1, START)
+    writer.add(START + 1, [_probe(700)])
+    path = _save(tmp_path, writer)
+    writer.add(START + 2, [_probe(710)])
+    _write(path, writer.take(), create=False)
+    _write(path, b"\x01\x02\x03", create=False)  # écriture interrompue
+
+    tips = [channels[0] for _, channels in read_session(path)]
+    assert tips == [700, 710]
+
+
+def test_new_session_never_overwrites_a_file(tmp_path):
+    path = str(tmp_path / "session.tmcs")
+    first = _save(tmp_path, _SessionWriter(path, 1, START))
+    second = _save(tmp_path, _SessionWriter(path, 1, START))
+    assert first == path
+    assert second == str(tmp_path / "session.1.tmcs")
+
+
+def test_header_only_file_is_empty(tmp_path):
+    path = _save(tmp_path, _SessionWriter(str(tmp_path / "session.tmcs"), 1, START))
+    assert list(read_session(path)) == []
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"NOPE" + bytes(64))
+    with pytest.raises(ValueError):
+        list(read_session(str(path)))
+
+
+def _session_files(tmp_path, count: int) -> list[str]:
+    """Create `count` session files, oldest first, one minute apart."""
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"{index}.tmcs"
+        path.write_bytes(b"TMCS")
+        os.utime(path, (START + index * 60, START + index * 60))
+        paths.append(str(path))
+    return paths
+
+
+def test_prune_keeps_the_newest_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_MAX_FILES", 3)
+    paths = _session_files(tmp_path, 5)
+    (tmp_path / "notes.txt").write_text("pas une session")
+
+    assert sorted(_prune(str(tmp_path), set(), START + 300)) == paths[:2]
+    assert sorted(os.listdir(tmp_path)) == ["2.tmcs", "3.tmcs", "4.tmcs", "notes.txt"]
+
+
+def test_prune_removes_old_files_but_never_running_sessions(tmp_path):
+    paths = _session_files(tmp_path, 4)
+
+    # La session en cours est aussi ancienne, mais n'est jamais supprimée
+    now = START + 60 + SESSION_MAX_AGE + 1
+    assert sorted(_prune(str(tmp_path), {paths[0]}, now)) == paths[1:2]
+    assert sorted(os.listdir(tmp_path)) == ["0.tmcs", "2.tmcs", "3.tmcs"]
+    assert _prune(str(tmp_path / "missing"), set(), now) == []